@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Armazém endereçado por conteúdo
+Cada conteúdo extraído é guardado uma única vez, com o nome igual ao seu
+hash (BLAKE3 se instalado, senão SHA-256) e compressão opcional; um
+manifesto SQLite liga cada URL + data ao hash, e a coleta de lixo apaga os
+conteúdos que nenhuma entrada usa mais
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from arquivamento import COMPRESSAO_GZIP, COMPRESSAO_ZSTD, zstd_disponivel
+from cache_http import normalizar_url
+from metricas import medir_fase
+
+DIRETORIO_PADRAO = 'armazem_extrator'
+
+SEM_COMPRESSAO = 'none'
+COMPRESSOES_ARMAZEM = (SEM_COMPRESSAO, COMPRESSAO_GZIP, COMPRESSAO_ZSTD)
+
+ALGORITMO_BLAKE3 = 'blake3'  # Requer o pacote blake3
+ALGORITMO_SHA256 = 'sha256'
+
+_EXTENSOES = {SEM_COMPRESSAO: '', COMPRESSAO_GZIP: '.gz', COMPRESSAO_ZSTD: '.zst'}
+
+TAMANHO_BLOCO = 64 * 1024
+
+def blake3_disponivel():
+    """True se o pacote blake3 estiver instalado"""
+    try:
+        import blake3  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _novo_hash(algoritmo):
+    if algoritmo == ALGORITMO_BLAKE3:
+        import blake3
+        return blake3.blake3()
+    return hashlib.sha256()
+
+def _blocos(dados):
+    """Itera bytes ou um arquivo binário em blocos"""
+    if isinstance(dados, (bytes, bytearray, memoryview)):
+        dados = memoryview(dados)
+        for inicio in range(0, len(dados), TAMANHO_BLOCO):
+            yield dados[inicio:inicio + TAMANHO_BLOCO]
+        return
+    dados.seek(0)
+    while True:
+        bloco = dados.read(TAMANHO_BLOCO)
+        if not bloco:
+            return
+        yield bloco
+
+def _abrir_escrita(caminho, compressao):
+    if compressao == COMPRESSAO_GZIP:
+        return gzip.open(caminho, 'wb', compresslevel=6)
+    if compressao == COMPRESSAO_ZSTD:
+        import zstandard
+        return zstandard.ZstdCompressor().stream_writer(open(caminho, 'wb'), closefd=True)
+    return open(caminho, 'wb')
+
+def _abrir_leitura(caminho, compressao):
+    if compressao == COMPRESSAO_GZIP:
+        return gzip.open(caminho, 'rb')
+    if compressao == COMPRESSAO_ZSTD:
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb'), closefd=True)
+    return open(caminho, 'rb')
+
+class ArmazemConteudo:
+    """
+    Armazém de conteúdos deduplicados por hash
+
+    O hash é calculado antes de qualquer escrita: um conteúdo que já está
+    no armazém só ganha uma linha no manifesto, sem gravar nada em disco.
+    O algoritmo escolhido na criação fica registrado no manifesto e é
+    mantido nas aberturas seguintes. Pode ser usado por várias threads ao
+    mesmo tempo e como destino de extrair_html()/extrair_lote() no lugar de
+    um Arquivador.
+    """
+
+    # Como destino das extrações, recebe o HTML já no modo de saída
+    usa_conteudo = True
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, compressao=COMPRESSAO_GZIP):
+        """
+        Args:
+            diretorio (str): Diretório dos conteúdos e do manifesto
+            compressao (str): 'none', 'gzip' ou 'zstd' para os conteúdos novos
+
+        Raises:
+            ValueError: Compressão desconhecida
+            ImportError: zstd pedido sem zstandard, ou armazém BLAKE3 sem blake3
+        """
+        if compressao not in COMPRESSOES_ARMAZEM:
+            raise ValueError(f"Compressão desconhecida: '{compressao}'")
+        if compressao == COMPRESSAO_ZSTD and not zstd_disponivel():
+            raise ImportError("Compressão zstd requer o pacote zstandard (pip install zstandard)")
+
+        self.diretorio = os.path.abspath(diretorio)
+        self.compressao = compressao
+        os.makedirs(os.path.join(self.diretorio, 'objetos'), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._banco = sqlite3.connect(os.path.join(self.diretorio, 'manifesto.sqlite3'), check_same_thread=False)
+        self._banco.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS config (
+                nome TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                armazenado INTEGER NOT NULL,
+                compressao TEXT NOT NULL,
+                criado_em REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entradas (
+                id INTEGER PRIMARY KEY,
+                chave TEXT NOT NULL,
+                url TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                status INTEGER,
+                extraido_em REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entradas_chave ON entradas (chave, extraido_em);
+            CREATE INDEX IF NOT EXISTS idx_entradas_hash ON entradas (hash);
+            """
+        )
+        linha = self._banco.execute("SELECT valor FROM config WHERE nome = 'algoritmo'").fetchone()
+        if linha is None:
+            self.algoritmo = ALGORITMO_BLAKE3 if blake3_disponivel() else ALGORITMO_SHA256
+            self._banco.execute("INSERT INTO config VALUES ('algoritmo', ?)", (self.algoritmo,))
+        else:
+            self.algoritmo = linha[0]
+            if self.algoritmo == ALGORITMO_BLAKE3 and not blake3_disponivel():
+                raise ImportError("Este armazém usa BLAKE3: instale o pacote blake3 (pip install blake3)")
+        self._banco.commit()
+
+    def _caminho(self, resumo, compressao):
+        return os.path.join(self.diretorio, 'objetos', resumo[:2], resumo + _EXTENSOES[compressao])
+
+    def calcular_hash(self, dados):
+        """Hash (hexadecimal) de bytes ou de um arquivo binário, no algoritmo do armazém"""
+        resumo = _novo_hash(self.algoritmo)
+        for bloco in _blocos(dados):
+            resumo.update(bloco)
+        return resumo.hexdigest()
+
+    def guardar(self, url, dados, status=None):
+        """
+        Registra uma extração, gravando o conteúdo só se ele ainda não existir
+
+        Args:
+            url (str): URL extraída
+            dados (bytes | str | arquivo): Conteúdo (str é gravado em UTF-8)
+            status (int): Status HTTP da resposta
+
+        Returns:
+            dict: hash, arquivo (caminho do conteúdo), tamanho (bytes do
+            conteúdo), gravado (bytes escritos em disco; 0 = deduplicado)
+        """
+        if isinstance(dados, str):
+            dados = dados.encode('utf-8')
+        resumo = self.calcular_hash(dados)
+        chave = normalizar_url(url)
+
+        with self._lock:
+            local = self._reaproveitar(resumo, chave, url, status)
+        if local is not None:
+            return local
+
+        # Conteúdo novo: comprime para um temporário fora do lock e só o
+        # publica (rename) junto com o registro no manifesto
+        temporario, tamanho = self._gravar_temporario(resumo, dados)
+        with self._lock:
+            local = self._reaproveitar(resumo, chave, url, status)
+            if local is not None:
+                # Outra thread gravou o mesmo conteúdo enquanto este comprimia
+                os.remove(temporario)
+                return local
+            caminho = self._caminho(resumo, self.compressao)
+            os.replace(temporario, caminho)
+            gravado = os.path.getsize(caminho)
+            self._banco.execute(
+                'INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)',
+                (resumo, tamanho, gravado, self.compressao, time.time())
+            )
+            self._registrar_entrada(resumo, chave, url, status)
+        return {'hash': resumo, 'arquivo': caminho, 'tamanho': tamanho, 'gravado': gravado}
+
+    def _reaproveitar(self, resumo, chave, url, status):
+        """Registra a entrada se o conteúdo já está guardado (chamar com o lock)"""
+        linha = self._banco.execute('SELECT tamanho, compressao FROM blobs WHERE hash = ?', (resumo,)).fetchone()
+        if linha is None or not os.path.exists(self._caminho(resumo, linha[1])):
+            return None
+        self._registrar_entrada(resumo, chave, url, status)
+        return {'hash': resumo, 'arquivo': self._caminho(resumo, linha[1]), 'tamanho': linha[0], 'gravado': 0}
+
+    def _registrar_entrada(self, resumo, chave, url, status):
+        self._banco.execute(
+            'INSERT INTO entradas (chave, url, hash, status, extraido_em) VALUES (?, ?, ?, ?, ?)',
+            (chave, url, resumo, status, time.time())
+        )
+        self._banco.commit()
+
+    def _gravar_temporario(self, resumo, dados):
+        """Grava o conteúdo (comprimido) ao lado do destino; devolve (caminho, bytes originais)"""
+        caminho = self._caminho(resumo, self.compressao)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        tamanho = 0
+        with medir_fase('gravacao'):
+            with _abrir_escrita(temporario, self.compressao) as f:
+                for bloco in _blocos(dados):
+                    f.write(bloco)
+                    tamanho += len(bloco)
+        return temporario, tamanho
+
+    def gravar(self, url, response, corpo, conteudo=None):
+        """
+        Destino das extrações (mesma assinatura de Arquivador.gravar)
+
+        Guarda ``conteudo`` (HTML no modo de saída) ou, no modo raw, o corpo
+        original da resposta.
+
+        Returns:
+            dict: arquivo, posicao (None), tamanho (bytes escritos) e hash
+        """
+        dados = conteudo if conteudo is not None else corpo.abrir()
+        local = self.guardar(url, dados, response.status_code)
+        return {'arquivo': local['arquivo'], 'posicao': None, 'tamanho': local['gravado'], 'hash': local['hash']}
+
+    def ler(self, resumo):
+        """
+        Conteúdo guardado com esse hash
+
+        Returns:
+            bytes: Conteúdo descompactado, ou None se não existir
+        """
+        with self._lock:
+            linha = self._banco.execute('SELECT compressao FROM blobs WHERE hash = ?', (resumo,)).fetchone()
+        if linha is None:
+            return None
+        with _abrir_leitura(self._caminho(resumo, linha[0]), linha[0]) as f:
+            return f.read()
+
+    def historico(self, url):
+        """
+        Extrações registradas para a URL, da mais recente para a mais antiga
+
+        Returns:
+            list: Tuplas (extraido_em, hash, status)
+        """
+        with self._lock:
+            return self._banco.execute(
+                'SELECT extraido_em, hash, status FROM entradas WHERE chave = ? ORDER BY extraido_em DESC, id DESC',
+                (normalizar_url(url),)
+            ).fetchall()
+
+    def ler_url(self, url):
+        """Conteúdo da extração mais recente da URL (ou None)"""
+        historico = self.historico(url)
+        return self.ler(historico[0][1]) if historico else None
+
+    def podar(self, manter=1, antes_de=None):
+        """
+        Remove entradas antigas do manifesto (os conteúdos ficam para a coleta de lixo)
+
+        Args:
+            manter (int): Versões mais recentes mantidas por URL (None = todas)
+            antes_de (float): Remove também entradas anteriores a esse timestamp
+
+        Returns:
+            int: Entradas removidas
+        """
+        with self._lock:
+            removidas = 0
+            if manter is not None:
+                removidas += self._banco.execute(
+                    """
+                    DELETE FROM entradas WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY chave ORDER BY extraido_em DESC, id DESC
+                            ) AS ordem FROM entradas
+                        ) WHERE ordem > ?
+                    )
+                    """,
+                    (max(0, manter),)
+                ).rowcount
+            if antes_de is not None:
+                removidas += self._banco.execute('DELETE FROM entradas WHERE extraido_em < ?', (antes_de,)).rowcount
+            self._banco.commit()
+        return removidas
+
+    def coletar_lixo(self):
+        """
+        Apaga os conteúdos que nenhuma entrada do manifesto usa
+
+        Roda com o lock do armazém, então um guardar() em outra thread nunca
+        perde o conteúdo que acabou de reaproveitar.
+
+        Returns:
+            dict: removidos (conteúdos apagados) e liberados (bytes em disco)
+        """
+        with self._lock:
+            orfaos = self._banco.execute(
+                'SELECT hash, armazenado, compressao FROM blobs '
+                'WHERE NOT EXISTS (SELECT 1 FROM entradas WHERE entradas.hash = blobs.hash)'
+            ).fetchall()
+            liberados = 0
+            for resumo, armazenado, compressao in orfaos:
+                try:
+                    os.remove(self._caminho(resumo, compressao))
+                    liberados += armazenado
+                except OSError:
+                    pass
+            self._banco.executemany('DELETE FROM blobs WHERE hash = ?', [(resumo,) for resumo, _, _ in orfaos])
+            self._banco.commit()
+        self._remover_temporarios()
+        return {'removidos': len(orfaos), 'liberados': liberados}
+
+    def _remover_temporarios(self):
+        # Sobras de gravações interrompidas (processo morto no meio)
+        limite = time.time() - 3600
+        for raiz, _, arquivos in os.walk(os.path.join(self.diretorio, 'objetos')):
+            for nome in arquivos:
+                caminho = os.path.join(raiz, nome)
+                if nome.endswith('.tmp') and os.path.getmtime(caminho) < limite:
+                    try:
+                        os.remove(caminho)
+                    except OSError:
+                        pass
+
+    def estatisticas(self):
+        """
+        Ocupação do armazém
+
+        Returns:
+            dict: entradas, urls, conteudos, bytes_originais (soma de todas as
+            extrações), bytes_unicos (conteúdos distintos) e bytes_disco
+        """
+        with self._lock:
+            entradas, urls, originais = self._banco.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT chave), COALESCE(SUM(blobs.tamanho), 0) '
+                'FROM entradas JOIN blobs ON blobs.hash = entradas.hash'
+            ).fetchone()
+            conteudos, unicos, disco = self._banco.execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamanho), 0), COALESCE(SUM(armazenado), 0) FROM blobs'
+            ).fetchone()
+        return {
+            'entradas': entradas,
+            'urls': urls,
+            'conteudos': conteudos,
+            'bytes_originais': originais,
+            'bytes_unicos': unicos,
+            'bytes_disco': disco,
+        }
+
+    def fechar(self):
+        """Fecha o manifesto"""
+        with self._lock:
+            self._banco.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def mostrar_estatisticas_armazem(estatisticas):
+    """Mostra no console a economia do armazém"""
+    mb = 1024 * 1024
+    print(
+        f"🗃️ Armazém: {estatisticas['entradas']:,} extrações de {estatisticas['urls']:,} URL(s) | "
+        f"{estatisticas['conteudos']:,} conteúdos distintos"
+    )
+    print(
+        f"   {estatisticas['bytes_originais'] / mb:,.1f} MB extraídos → {estatisticas['bytes_unicos'] / mb:,.1f} MB "
+        f"únicos → {estatisticas['bytes_disco'] / mb:,.1f} MB em disco"
+    )
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Arquivamento compactado
+Grava as páginas extraídas em poucos arquivos grandes e compactados (WARC
+ou JSON lines), com rotação por tamanho e índice de posições para ler um
+registro sem descompactar o arquivo inteiro
+"""
+
+import base64
+import codecs
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+from cache_http import normalizar_url
+from metricas import medir_fase
+
+DIRETORIO_PADRAO = 'arquivo_extrator'
+TAMANHO_MAXIMO_PADRAO = 1024 * 1024 * 1024  # 1 GB por arquivo
+
+FORMATO_WARC = 'warc'    # WARC/1.1 com a resposta HTTP como foi recebida
+FORMATO_JSONL = 'jsonl'  # Um JSON por linha com o HTML no modo de saída
+FORMATOS_ARQUIVO = (FORMATO_WARC, FORMATO_JSONL)
+
+COMPRESSAO_GZIP = 'gzip'
+COMPRESSAO_ZSTD = 'zstd'  # Requer o pacote zstandard (só JSON lines)
+COMPRESSOES = (COMPRESSAO_GZIP, COMPRESSAO_ZSTD)
+
+_EXTENSOES = {
+    (FORMATO_WARC, COMPRESSAO_GZIP): '.warc.gz',
+    (FORMATO_JSONL, COMPRESSAO_GZIP): '.jsonl.gz',
+    (FORMATO_JSONL, COMPRESSAO_ZSTD): '.jsonl.zst',
+}
+
+TAMANHO_BLOCO = 64 * 1024
+# Registro compactado guardado em memória antes da escrita; acima disso vai para um arquivo temporário
+LIMITE_REGISTRO_MEMORIA = 4 * 1024 * 1024
+# Corpo bruto (sem modo de saída) posto no campo 'html' do JSON lines; o
+# resto é descartado e o registro ganha "truncado": true
+LIMITE_CORPO_JSONL = 64 * 1024 * 1024
+# Registros gravados entre dois commits do índice
+COMMIT_A_CADA = 100
+
+# Headers que deixam de valer depois que o requests descompacta o corpo
+_HEADERS_DESCARTADOS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+def zstd_disponivel():
+    """True se o pacote zstandard estiver instalado"""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _compactador(compressao):
+    """Objeto com compress()/flush() que gera um membro gzip ou um frame zstd"""
+    if compressao == COMPRESSAO_ZSTD:
+        import zstandard
+        return zstandard.ZstdCompressor().compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+def _descompactador(compressao):
+    if compressao == COMPRESSAO_ZSTD:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(zlib.MAX_WBITS | 16)
+
+def _compressao_do_arquivo(caminho):
+    return COMPRESSAO_ZSTD if caminho.endswith('.zst') else COMPRESSAO_GZIP
+
+def _data_warc(momento):
+    return momento.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _cabecalho_warc(campos):
+    linhas = ['WARC/1.1'] + [f'{nome}: {valor}' for nome, valor in campos]
+    return ('\r\n'.join(linhas) + '\r\n\r\n').encode('utf-8')
+
+class Arquivador:
+    """
+    Grava as extrações em arquivos compactados com rotação por tamanho
+
+    Cada registro é compactado como um membro gzip (ou frame zstd)
+    independente, então o índice (SQLite, no mesmo diretório) guarda o
+    arquivo, a posição e o tamanho compactado de cada URL e um registro pode
+    ser lido sozinho. A compactação acontece fora do lock, em blocos, para um
+    SpooledTemporaryFile (corpos grandes não ficam inteiros na memória); só a
+    cópia para o arquivo é serializada. Pode ser usado por várias threads ao
+    mesmo tempo.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, formato=FORMATO_WARC, compressao=COMPRESSAO_GZIP,
+                 tamanho_maximo=TAMANHO_MAXIMO_PADRAO, prefixo='extrator'):
+        """
+        Args:
+            diretorio (str): Diretório dos arquivos e do índice
+            formato (str): 'warc' ou 'jsonl'
+            compressao (str): 'gzip' ou 'zstd' (zstd só com JSON lines)
+            tamanho_maximo (int): Bytes por arquivo antes de abrir o próximo
+            prefixo (str): Início do nome dos arquivos
+
+        Raises:
+            ValueError: Combinação de formato e compressão não suportada
+            ImportError: zstd pedido sem o pacote zstandard instalado
+        """
+        if (formato, compressao) not in _EXTENSOES:
+            raise ValueError(f"Formato '{formato}' não suporta compressão '{compressao}'")
+        if compressao == COMPRESSAO_ZSTD and not zstd_disponivel():
+            raise ImportError("Compressão zstd requer o pacote zstandard (pip install zstandard)")
+
+        self.diretorio = os.path.abspath(diretorio)
+        self.formato = formato
+        self.compressao = compressao
+        self.tamanho_maximo = tamanho_maximo
+        self.prefixo = prefixo
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._arquivo = None
+        self._caminho = None
+        self._sequencia = 0
+        self._pendentes = 0
+        self.registros = 0
+
+        self._banco = sqlite3.connect(os.path.join(self.diretorio, 'indice.sqlite3'), check_same_thread=False)
+        self._banco.execute(
+            """
+            CREATE TABLE IF NOT EXISTS registros (
+                id INTEGER PRIMARY KEY,
+                chave TEXT NOT NULL,
+                url TEXT NOT NULL,
+                arquivo TEXT NOT NULL,
+                posicao INTEGER NOT NULL,
+                tamanho INTEGER NOT NULL,
+                status INTEGER,
+                gravado_em REAL NOT NULL
+            )
+            """
+        )
+        self._banco.execute('CREATE INDEX IF NOT EXISTS idx_chave ON registros (chave)')
+        self._banco.commit()
+
+    @property
+    def usa_conteudo(self):
+        """True se gravar() espera o HTML já no modo de saída (JSON lines)"""
+        return self.formato == FORMATO_JSONL
+
+    def _novo_arquivo(self):
+        """Fecha o arquivo atual e abre o próximo (nome único por processo)"""
+        if self._arquivo is not None:
+            self._arquivo.close()
+        self._sequencia += 1
+        carimbo = datetime.now().strftime("%Y%m%d_%H%M%S")
+        nome = f"{self.prefixo}-{carimbo}-{os.getpid()}-{self._sequencia:05d}{_EXTENSOES[(self.formato, self.compressao)]}"
+        self._caminho = os.path.join(self.diretorio, nome)
+        self._arquivo = open(self._caminho, 'xb')
+        if self.formato == FORMATO_WARC:
+            self._compactar([self._registro_warcinfo(nome)], self._arquivo)
+
+    def _compactar(self, partes, destino):
+        """Compacta as partes como um membro (ou frame) e escreve no destino, bloco a bloco"""
+        compactador = _compactador(self.compressao)
+        for parte in partes:
+            destino.write(compactador.compress(parte))
+        destino.write(compactador.flush())
+
+    def _registro_warcinfo(self, nome):
+        conteudo = b'software: Extrator HTML v1.0.0\r\nformat: WARC File Format 1.1\r\n'
+        return _cabecalho_warc([
+            ('WARC-Type', 'warcinfo'),
+            ('WARC-Record-ID', f'<urn:uuid:{uuid.uuid4()}>'),
+            ('WARC-Date', _data_warc(datetime.now())),
+            ('WARC-Filename', nome),
+            ('Content-Type', 'application/warc-fields'),
+            ('Content-Length', len(conteudo)),
+        ]) + conteudo + b'\r\n\r\n'
+
+    def _partes_warc(self, url, response, corpo):
+        """Registro WARC 'response' em pedaços (o corpo vem do arquivo, em blocos)"""
+        reason = response.reason or ''
+        linhas = [f'HTTP/1.1 {response.status_code} {reason}'.rstrip()]
+        for nome, valor in response.headers.items():
+            if nome.lower() not in _HEADERS_DESCARTADOS:
+                linhas.append(f'{nome}: {valor}')
+        linhas.append(f'Content-Length: {corpo.tamanho}')
+        cabecalho_http = ('\r\n'.join(linhas) + '\r\n\r\n').encode('utf-8', errors='replace')
+
+        digest = hashlib.sha1()
+        for bloco in corpo.iterar():
+            digest.update(bloco)
+        campos = [
+            ('WARC-Type', 'response'),
+            ('WARC-Record-ID', f'<urn:uuid:{uuid.uuid4()}>'),
+            ('WARC-Date', _data_warc(datetime.now())),
+            ('WARC-Target-URI', url),
+            ('WARC-Payload-Digest', 'sha1:' + base64.b32encode(digest.digest()).decode('ascii')),
+            ('Content-Type', 'application/http;msgtype=response'),
+            ('Content-Length', len(cabecalho_http) + corpo.tamanho),
+        ]
+        yield _cabecalho_warc(campos) + cabecalho_http
+        yield from corpo.iterar()
+        yield b'\r\n\r\n'
+
+    def _partes_jsonl(self, url, response, corpo, conteudo):
+        """Linha JSON em pedaços: o campo 'html' é escapado bloco a bloco, sem juntar o corpo"""
+        registro = {
+            'url': url,
+            'url_final': response.url or url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'data': datetime.now().isoformat(timespec='seconds'),
+        }
+        yield (json.dumps(registro, ensure_ascii=False)[:-1] + ', "html": "').encode('utf-8')
+
+        truncado = False
+        if conteudo is not None:
+            for inicio in range(0, len(conteudo), TAMANHO_BLOCO):
+                yield json.dumps(conteudo[inicio:inicio + TAMANHO_BLOCO], ensure_ascii=False)[1:-1].encode('utf-8')
+        else:
+            decodificador = codecs.getincrementaldecoder(corpo.codificacao())(errors='replace')
+            restante = LIMITE_CORPO_JSONL
+            for bloco in corpo.iterar():
+                if len(bloco) > restante:
+                    bloco, truncado = bloco[:restante], True
+                restante -= len(bloco)
+                texto = decodificador.decode(bloco, final=truncado)
+                yield json.dumps(texto, ensure_ascii=False)[1:-1].encode('utf-8')
+                if truncado:
+                    break
+            else:
+                yield json.dumps(decodificador.decode(b'', final=True), ensure_ascii=False)[1:-1].encode('utf-8')
+        yield ('", "truncado": true}\n' if truncado else '"}\n').encode('utf-8')
+
+    def gravar(self, url, response, corpo, conteudo=None):
+        """
+        Acrescenta uma extração ao arquivo atual
+
+        Args:
+            url (str): URL pedida
+            response (requests.Response): Resposta (status e headers)
+            corpo (CorpoBaixado): Corpo da resposta
+            conteudo (str): HTML já processado, gravado no lugar do corpo no
+                formato JSON lines (ignorado no WARC, que guarda a resposta)
+
+        Returns:
+            dict: arquivo, posicao e tamanho (compactado) do registro
+        """
+        with medir_fase('gravacao'), tempfile.SpooledTemporaryFile(LIMITE_REGISTRO_MEMORIA) as compactado:
+            if self.formato == FORMATO_WARC:
+                self._compactar(self._partes_warc(url, response, corpo), compactado)
+            else:
+                self._compactar(self._partes_jsonl(url, response, corpo, conteudo), compactado)
+            tamanho_registro = compactado.tell()
+            compactado.seek(0)
+
+            with self._lock:
+                if self._arquivo is None or (self._arquivo.tell() and self._arquivo.tell() + tamanho_registro > self.tamanho_maximo):
+                    self._novo_arquivo()
+                    self._banco.commit()
+                    self._pendentes = 0
+                posicao = self._arquivo.tell()
+                shutil.copyfileobj(compactado, self._arquivo, TAMANHO_BLOCO)
+                tamanho = self._arquivo.tell() - posicao
+                self._banco.execute(
+                    'INSERT INTO registros (chave, url, arquivo, posicao, tamanho, status, gravado_em) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (normalizar_url(url), url, os.path.basename(self._caminho), posicao, tamanho,
+                     response.status_code, time.time())
+                )
+                self.registros += 1
+                self._pendentes += 1
+                if self._pendentes >= COMMIT_A_CADA:
+                    self._arquivo.flush()
+                    self._banco.commit()
+                    self._pendentes = 0
+                caminho = self._caminho
+
+        return {'arquivo': caminho, 'posicao': posicao, 'tamanho': tamanho}
+
+    def localizar(self, url):
+        """
+        Registros gravados para a URL, do mais recente para o mais antigo
+
+        Returns:
+            list: Dicionários com arquivo, posicao, tamanho, status e gravado_em
+        """
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.flush()
+            self._banco.commit()
+            linhas = self._banco.execute(
+                'SELECT arquivo, posicao, tamanho, status, gravado_em FROM registros '
+                'WHERE chave = ? ORDER BY id DESC',
+                (normalizar_url(url),)
+            ).fetchall()
+        return [
+            {'arquivo': os.path.join(self.diretorio, a), 'posicao': p, 'tamanho': t, 'status': s, 'gravado_em': g}
+            for a, p, t, s, g in linhas
+        ]
+
+    def ler(self, url):
+        """
+        Lê o registro mais recente da URL (só aquele trecho do arquivo)
+
+        Returns:
+            dict: Registro (ver ler_registro) ou None se a URL não foi arquivada
+        """
+        encontrados = self.localizar(url)
+        if not encontrados:
+            return None
+        registro = encontrados[0]
+        return ler_registro(registro['arquivo'], registro['posicao'], registro['tamanho'])
+
+    def fechar(self):
+        """Grava o índice e fecha o arquivo atual"""
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            self._banco.commit()
+            self._banco.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def _interpretar(dados, caminho):
+    """Converte os bytes descompactados de um registro em dicionário"""
+    if '.warc' not in os.path.basename(caminho):
+        return json.loads(dados)
+
+    cabecalho, _, resto = dados.partition(b'\r\n\r\n')
+    campos = dict(
+        linha.split(': ', 1) for linha in cabecalho.decode('utf-8').split('\r\n')[1:] if ': ' in linha
+    )
+    registro = {'tipo': campos.get('WARC-Type'), 'url': campos.get('WARC-Target-URI'), 'warc': campos}
+    if campos.get('WARC-Type') != 'response':
+        registro['conteudo'] = resto[:int(campos.get('Content-Length', len(resto)))]
+        return registro
+
+    http, _, corpo = resto.partition(b'\r\n\r\n')
+    linhas = http.decode('iso-8859-1').split('\r\n')
+    registro['status'] = int(linhas[0].split()[1])
+    registro['headers'] = dict(linha.split(': ', 1) for linha in linhas[1:] if ': ' in linha)
+    tamanho = int(registro['headers'].get('Content-Length', len(corpo)))
+    registro['corpo'] = corpo[:tamanho]
+    return registro
+
+def ler_registro(caminho, posicao, tamanho):
+    """
+    Lê um registro direto da posição indicada no índice
+
+    Returns:
+        dict: JSON lines: o objeto gravado. WARC: tipo, url, status,
+        headers, corpo (bytes) e os campos WARC
+    """
+    with open(caminho, 'rb') as f:
+        f.seek(posicao)
+        dados = f.read(tamanho)
+    descompactador = _descompactador(_compressao_do_arquivo(caminho))
+    return _interpretar(descompactador.decompress(dados), caminho)
+
+def percorrer(caminho):
+    """
+    Lê um arquivo inteiro em sequência, registro a registro
+
+    Útil para processamento em massa e para refazer o índice.
+
+    Yields:
+        tuple: (posicao, tamanho compactado, registro)
+    """
+    compressao = _compressao_do_arquivo(caminho)
+    with open(caminho, 'rb') as f:
+        posicao = 0
+        sobra = b''
+        while True:
+            dados = sobra or f.read(TAMANHO_BLOCO)
+            if not dados:
+                return
+            descompactador = _descompactador(compressao)
+            partes = []
+            consumido = 0
+            while True:
+                partes.append(descompactador.decompress(dados))
+                if descompactador.eof:
+                    sobra = descompactador.unused_data
+                    consumido += len(dados) - len(sobra)
+                    break
+                consumido += len(dados)
+                dados = f.read(TAMANHO_BLOCO)
+                if not dados:
+                    raise ValueError(f"Arquivo truncado na posição {posicao}: {caminho}")
+            yield posicao, consumido, _interpretar(b''.join(partes), caminho)
+            posicao += consumido
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Artefatos
+Texto visível, links, metadados (<meta>, OpenGraph, JSON-LD) e tabelas de
+uma página em uma única passada pelos eventos do parser, sem montar árvore
+nenhuma, prontos para JSON e CSV
+"""
+
+import csv
+import json
+from urllib.parse import urljoin
+
+from selecao_html import links_absolutos
+
+TAMANHO_BLOCO_PARSE = 64 * 1024
+
+# Conteúdo que o navegador não mostra como texto
+TAGS_INVISIVEIS = frozenset(('script', 'style', 'noscript', 'template', 'title', 'svg', 'math',
+                             'iframe', 'object', 'canvas'))
+# Elementos que começam/terminam uma linha no texto
+TAGS_BLOCO = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd', 'details', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+    'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table', 'tr', 'ul',
+))
+TIPO_JSON_LD = 'application/ld+json'
+
+class ArtefatosHTML:
+    """
+    Resultado de extrair_artefatos()
+
+    ``tabelas`` é uma lista de {'legenda': str ou None, 'linhas': [[str]]};
+    células com colspan são seguidas de células vazias, para as colunas
+    baterem no CSV (rowspan não é expandido).
+    """
+
+    def __init__(self):
+        self.texto = ''
+        self.links = []
+        self.metadados = {}
+        self.tabelas = []
+
+    def como_dict(self):
+        """Dicionário pronto para JSON"""
+        return {
+            'texto': self.texto,
+            'links': self.links,
+            'metadados': self.metadados,
+            'tabelas': self.tabelas,
+        }
+
+    def como_json(self):
+        return json.dumps(self.como_dict(), ensure_ascii=False, indent=2)
+
+    def __repr__(self):
+        return (f"<ArtefatosHTML {len(self.texto):,} caracteres, {len(self.links):,} links, "
+                f"{len(self.tabelas):,} tabelas>")
+
+class ColetorArtefatos:
+    """
+    Alvo (target) do parser do lxml: recebe os eventos de abertura,
+    fechamento e texto e vai preenchendo os artefatos
+
+    Não depende de o HTML fechar as tags direitinho: abrir uma <tr> fecha a
+    linha anterior, abrir uma <td> fecha a célula anterior e assim por diante,
+    então o mesmo coletor serve para o html.parser da biblioteca padrão, que
+    não completa as tags implícitas como o lxml.
+    """
+
+    def __init__(self, url_base):
+        self.url_base = url_base
+        self._base = ''
+        self._hrefs = []
+        self._texto = []
+        self._invisiveis = []
+        self._titulo = None
+        self._json_ld = None
+        self._metadados = {'titulo': None, 'idioma': None, 'canonica': None, 'meta': {},
+                           'opengraph': {}, 'json_ld': [], 'json_ld_invalidos': 0}
+        self._tabelas = []
+        self._abertas = []
+
+    def start(self, tag, atributos):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in TAGS_BLOCO:
+            self._texto.append('\n')
+        if tag in ('a', 'area'):
+            href = atributos.get('href')
+            if href:
+                self._hrefs.append(href)
+        elif tag == 'meta':
+            self._meta(atributos)
+        elif tag == 'link':
+            if 'canonical' in (atributos.get('rel') or '').lower().split() and atributos.get('href'):
+                self._metadados['canonica'] = atributos['href'].strip()
+        elif tag == 'base':
+            if atributos.get('href') and not self._base:
+                self._base = atributos['href'].strip()
+        elif tag == 'html':
+            self._metadados['idioma'] = atributos.get('lang') or None
+        elif tag == 'body':
+            # Sem </title> ou </script> fechando, nada do corpo apareceria
+            self._invisiveis = []
+        elif tag == 'title' and self._titulo is None:
+            self._titulo = []
+        elif tag == 'script' and (atributos.get('type') or '').strip().lower() == TIPO_JSON_LD:
+            self._json_ld = []
+        elif tag in ('table', 'tr', 'td', 'th', 'caption'):
+            self._tabela_inicio(tag, atributos)
+        if tag in TAGS_INVISIVEIS:
+            self._invisiveis.append(tag)
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in self._invisiveis:
+            # Fecha a última aberta com esse nome (e o que ficou aberto dentro dela)
+            posicao = len(self._invisiveis) - 1 - self._invisiveis[::-1].index(tag)
+            del self._invisiveis[posicao:]
+            if tag == 'title' and isinstance(self._titulo, list):
+                self._metadados['titulo'] = ' '.join(''.join(self._titulo).split()) or None
+                self._titulo = ''
+            elif tag == 'script' and self._json_ld is not None:
+                self._guardar_json_ld(''.join(self._json_ld))
+                self._json_ld = None
+        if tag in TAGS_BLOCO:
+            self._texto.append('\n')
+        if tag in ('table', 'tr', 'td', 'th', 'caption'):
+            self._tabela_fim(tag)
+
+    def data(self, texto):
+        if self._invisiveis:
+            if self._invisiveis[-1] == 'title' and isinstance(self._titulo, list):
+                self._titulo.append(texto)
+            elif self._json_ld is not None:
+                self._json_ld.append(texto)
+            return
+        self._texto.append(texto)
+        if self._abertas:
+            tabela = self._abertas[-1]
+            if tabela['celula'] is not None:
+                tabela['celula'].append(texto)
+            elif tabela['legenda'] is not None:
+                tabela['legenda'].append(texto)
+
+    def close(self):
+        """Fim do documento: monta e devolve o ArtefatosHTML"""
+        while self._abertas:
+            self._tabela_fim('table')
+        base = urljoin(self.url_base, self._base) if self._base else self.url_base
+        artefatos = ArtefatosHTML()
+        artefatos.links = links_absolutos(self._hrefs, base)
+        linhas = (' '.join(linha.split()) for linha in ''.join(self._texto).split('\n'))
+        artefatos.texto = '\n'.join(linha for linha in linhas if linha)
+        if self._metadados['canonica']:
+            self._metadados['canonica'] = urljoin(base, self._metadados['canonica'])
+        artefatos.metadados = self._metadados
+        # Tabelas de layout sem nenhuma célula não interessam
+        artefatos.tabelas = [tabela for tabela in self._tabelas if tabela['linhas']]
+        return artefatos
+
+    def _meta(self, atributos):
+        conteudo = atributos.get('content')
+        if conteudo is None:
+            return
+        propriedade = (atributos.get('property') or '').strip()
+        nome = (atributos.get('name') or '').strip().lower()
+        # OpenGraph (og:, article:, fb:...) usa property; alguns sites usam name="og:..."
+        if propriedade or nome.startswith('og:'):
+            _acrescentar(self._metadados['opengraph'], propriedade or nome, conteudo)
+        elif nome:
+            _acrescentar(self._metadados['meta'], nome, conteudo)
+
+    def _guardar_json_ld(self, texto):
+        try:
+            dados = json.loads(texto)
+        except ValueError:
+            self._metadados['json_ld_invalidos'] += 1
+            return
+        # Um bloco com lista vale por vários objetos
+        if isinstance(dados, list):
+            self._metadados['json_ld'].extend(dados)
+        else:
+            self._metadados['json_ld'].append(dados)
+
+    def _tabela_inicio(self, tag, atributos):
+        if tag == 'table':
+            # Entra na lista já na abertura: tabelas aninhadas ficam depois da de fora
+            resultado = {'legenda': None, 'linhas': []}
+            self._tabelas.append(resultado)
+            self._abertas.append({'resultado': resultado, 'linha': None, 'celula': None, 'colspan': 1,
+                                  'legenda': None})
+            return
+        if not self._abertas:
+            return
+        tabela = self._abertas[-1]
+        if tag == 'caption':
+            tabela['legenda'] = []
+            return
+        self._fechar_celula(tabela)
+        if tag == 'tr':
+            self._fechar_linha(tabela)
+            tabela['linha'] = []
+            return
+        if tabela['linha'] is None:
+            tabela['linha'] = []
+        tabela['celula'] = []
+        # Células vizinhas não grudam no texto ("A12" em vez de "A 1 2")
+        self._texto.append(' ')
+        colspan = str(atributos.get('colspan') or '1').strip()
+        tabela['colspan'] = min(int(colspan), 1000) if colspan.isdigit() and int(colspan) > 0 else 1
+
+    def _tabela_fim(self, tag):
+        if not self._abertas:
+            return
+        tabela = self._abertas[-1]
+        if tag == 'caption':
+            if tabela['legenda'] is not None:
+                tabela['resultado']['legenda'] = ' '.join(''.join(tabela['legenda']).split()) or None
+                tabela['legenda'] = None
+        elif tag in ('td', 'th'):
+            self._fechar_celula(tabela)
+        elif tag == 'tr':
+            self._fechar_celula(tabela)
+            self._fechar_linha(tabela)
+        elif tag == 'table':
+            self._fechar_celula(tabela)
+            self._fechar_linha(tabela)
+            self._abertas.pop()
+
+    @staticmethod
+    def _fechar_celula(tabela):
+        if tabela['celula'] is None:
+            return
+        tabela['linha'].append(' '.join(''.join(tabela['celula']).split()))
+        tabela['linha'].extend([''] * (tabela['colspan'] - 1))
+        tabela['celula'] = None
+        tabela['colspan'] = 1
+
+    @staticmethod
+    def _fechar_linha(tabela):
+        if tabela['linha']:
+            tabela['resultado']['linhas'].append(tabela['linha'])
+        tabela['linha'] = None
+
+def _acrescentar(destino, chave, valor):
+    """Guarda o valor; uma chave repetida (og:image...) vira lista"""
+    if chave not in destino:
+        destino[chave] = valor
+    elif isinstance(destino[chave], list):
+        destino[chave].append(valor)
+    else:
+        destino[chave] = [destino[chave], valor]
+
+def _ler_em_blocos(conteudo):
+    """Blocos de bytes/str de uma string ou de um arquivo"""
+    if isinstance(conteudo, (bytes, str)):
+        for inicio in range(0, len(conteudo), TAMANHO_BLOCO_PARSE):
+            yield conteudo[inicio:inicio + TAMANHO_BLOCO_PARSE]
+        return
+    while True:
+        bloco = conteudo.read(TAMANHO_BLOCO_PARSE)
+        if not bloco:
+            break
+        yield bloco
+
+def extrair_artefatos(conteudo, url_base='', codificacao=None):
+    """
+    Texto, links, metadados e tabelas em uma passada pelo documento
+
+    Com lxml instalado, os eventos vêm do parser em C direto para o
+    ColetorArtefatos, sem árvore nenhuma na memória; sem ele, do html.parser
+    da biblioteca padrão. Em nenhum dos casos o BeautifulSoup é usado.
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        url_base (str): URL da página (depois de redirecionamentos), para
+            deixar links e a URL canônica absolutos
+        codificacao (str): Codificação dos bytes (None = resolver_codificacao)
+
+    Returns:
+        ArtefatosHTML: Artefatos da página
+    """
+    coletor = ColetorArtefatos(url_base)
+    try:
+        from lxml import etree
+    except ImportError:
+        return _extrair_sem_lxml(conteudo, coletor, codificacao)
+
+    if codificacao is None and not isinstance(conteudo, str):
+        from codificacao_html import resolver_codificacao
+
+        codificacao, _ = resolver_codificacao(conteudo)
+    parser = etree.HTMLParser(target=coletor, encoding=codificacao if not isinstance(conteudo, str) else None)
+    for bloco in _ler_em_blocos(conteudo):
+        parser.feed(bloco)
+    try:
+        return parser.close()
+    except etree.XMLSyntaxError:
+        # Documento vazio (ou só espaços): nenhum evento chegou ao coletor
+        return coletor.close()
+
+def _extrair_sem_lxml(conteudo, coletor, codificacao):
+    import codecs
+    from html.parser import HTMLParser
+
+    class _Adaptador(HTMLParser):
+        def handle_starttag(self, tag, atributos):
+            coletor.start(tag, {nome: valor or '' for nome, valor in atributos})
+
+        def handle_startendtag(self, tag, atributos):
+            self.handle_starttag(tag, atributos)
+            coletor.end(tag)
+
+        def handle_endtag(self, tag):
+            coletor.end(tag)
+
+        def handle_data(self, texto):
+            coletor.data(texto)
+
+    adaptador = _Adaptador(convert_charrefs=True)
+    decodificador = None
+    if not isinstance(conteudo, str):
+        if codificacao is None:
+            from codificacao_html import resolver_codificacao
+
+            codificacao, _ = resolver_codificacao(conteudo)
+        decodificador = codecs.getincrementaldecoder(codificacao)(errors='replace')
+    for bloco in _ler_em_blocos(conteudo):
+        adaptador.feed(decodificador.decode(bloco) if decodificador else bloco)
+    if decodificador:
+        adaptador.feed(decodificador.decode(b'', final=True))
+    adaptador.close()
+    return coletor.close()
+
+def gravar_tabelas_csv(artefatos, prefixo):
+    """
+    Grava cada tabela em um CSV (prefixo_tabela_01.csv, _02...)
+
+    Args:
+        artefatos (ArtefatosHTML | dict): Artefatos (ou o dicionário do JSON gravado)
+        prefixo (str): Caminho e começo do nome dos arquivos
+
+    Returns:
+        list: Caminhos dos arquivos gravados
+    """
+    tabelas = artefatos['tabelas'] if isinstance(artefatos, dict) else artefatos.tabelas
+    caminhos = []
+    for numero, tabela in enumerate(tabelas, 1):
+        caminho = f"{prefixo}_tabela_{numero:02d}.csv"
+        # utf-8-sig: o Excel reconhece a codificação e mantém os acentos
+        with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+            csv.writer(f).writerows(tabela['linhas'])
+        caminhos.append(caminho)
+    return caminhos
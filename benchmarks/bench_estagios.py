@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+🧪 Extrator de HTML - Benchmark por estágio
+Mede, offline, o tempo e o pico de memória de cada estágio da extração
+(decodificação, parse por parser, serialização, gravação e estatísticas da
+GUI) sobre o corpus gerado em corpus.py, e salva os resultados em JSON
+para comparar entre commits
+
+Uso:
+    python benchmarks/bench_estagios.py
+    python benchmarks/bench_estagios.py --tamanhos 10KB,1MB,50MB --saida resultados.json
+    python benchmarks/bench_estagios.py --comparar antes.json depois.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import bs4
+from bs4 import UnicodeDammit
+
+from codificacao_html import resolver_codificacao
+from corpus import TAMANHOS, TAMANHOS_PADRAO, carregar_corpus
+from parsers_html import criar_soup, parsers_disponiveis
+from serializacao_html import (MODO_MINIFICADO, MODO_PRETTY, fragmentos_minificado, fragmentos_pretty,
+                               gravar_bruto, gravar_html)
+from visualizador_html import contar_palavras, indexar_linhas
+
+# Documentos acima disso rodam uma vez só por estágio
+LIMITE_REPETICOES = 5 * 1024 * 1024
+
+def medir(funcao, repeticoes=3, memoria=True):
+    """
+    Mede o tempo (várias execuções) e o pico de memória (uma execução)
+
+    O pico vem do tracemalloc, que só enxerga alocações feitas pelo Python;
+    memória alocada direto em C (árvore interna do lxml) não entra na conta.
+
+    Args:
+        funcao (callable): Estágio a medir, sem argumentos
+        repeticoes (int): Quantas vezes cronometrar
+        memoria (bool): Se True, faz uma execução extra com tracemalloc
+
+    Returns:
+        dict: tempo_min, tempo_mediana, repeticoes e pico_memoria (bytes)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            funcao()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'tempo_min': min(tempos),
+        'tempo_mediana': statistics.median(tempos),
+        'repeticoes': repeticoes,
+        'pico_memoria': pico,
+    }
+
+def _parse_em_blocos(conteudo, codificacao):
+    """Monta a árvore do lxml alimentando o parser em blocos, sem BeautifulSoup"""
+    from lxml import etree
+
+    from parse_incremental import TAMANHO_MINIMO_FEED
+
+    parser = etree.HTMLParser(encoding=codificacao)
+    for inicio in range(0, len(conteudo), TAMANHO_MINIMO_FEED):
+        parser.feed(conteudo[inicio:inicio + TAMANHO_MINIMO_FEED])
+    return parser.close()
+
+def _estagios(conteudo, diretorio):
+    """Lista (nome, função) dos estágios para um documento"""
+    parsers = parsers_disponiveis()
+    estagios = [
+        ('decodificar:utf8', lambda: conteudo.decode('utf-8', errors='replace')),
+        ('decodificar:unicodedammit', lambda: UnicodeDammit(conteudo, is_html=True).unicode_markup),
+        ('decodificar:resolver', lambda: resolver_codificacao(conteudo)),
+    ]
+    # Parse com a codificação já resolvida: o BeautifulSoup não precisa detectar
+    codificacao, _ = resolver_codificacao(conteudo)
+    for parser in parsers:
+        estagios.append((f'parse:{parser}', lambda parser=parser: criar_soup(conteudo, parser)))
+        estagios.append((f'parse:{parser}:codificacao', lambda parser=parser: criar_soup(
+            conteudo, parser, from_encoding=codificacao)))
+    if 'lxml' in parsers:
+        # Parser push, como o download incremental alimenta (blocos de 64 KB)
+        estagios.append(('parse:lxml:feed', lambda: _parse_em_blocos(conteudo, codificacao)))
+
+    # Serialização e gravação usam sempre a mesma árvore, montada uma vez
+    soup = criar_soup(conteudo, parsers[0])
+    texto_pretty = soup.prettify()
+    destino = os.path.join(diretorio, 'saida.html')
+    origem_bruta = os.path.join(diretorio, 'entrada.html')
+    with open(origem_bruta, 'wb') as f:
+        f.write(conteudo)
+
+    def gravar_prettify():
+        with open(destino, 'w', encoding='utf-8') as f:
+            f.write(soup.prettify())
+
+    def gravar_raw():
+        with open(origem_bruta, 'rb') as f:
+            gravar_bruto(f, destino)
+
+    def consumir(fragmentos):
+        for _ in fragmentos:
+            pass
+
+    estagios += [
+        ('serializar:prettify', soup.prettify),
+        ('serializar:pretty-fragmentos', lambda: consumir(fragmentos_pretty(soup))),
+        ('serializar:minified-fragmentos', lambda: consumir(fragmentos_minificado(soup))),
+        ('serializar:str', lambda: str(soup)),
+        ('gravar:prettify-string', gravar_prettify),
+        ('gravar:pretty-incremental', lambda: gravar_html(soup, destino, MODO_PRETTY)),
+        ('gravar:minified-incremental', lambda: gravar_html(soup, destino, MODO_MINIFICADO)),
+        ('gravar:raw', gravar_raw),
+        ('gui:count-linhas', lambda: texto_pretty.count('\n')),
+        ('gui:split-palavras', lambda: len(texto_pretty.split())),
+        ('gui:contar-palavras', lambda: contar_palavras(texto_pretty)),
+        ('gui:indexar-linhas', lambda: indexar_linhas(texto_pretty)),
+    ]
+    return parsers[0], estagios
+
+def executar(tamanhos, repeticoes, memoria=True, filtro=None):
+    """
+    Roda todos os estágios sobre o corpus
+
+    Args:
+        tamanhos (list): Nomes de tamanho do corpus
+        repeticoes (int): Repetições por estágio (documentos pequenos)
+        memoria (bool): Se True, mede o pico de memória
+        filtro (str): Só roda estágios cujo nome contém esse texto
+
+    Returns:
+        list: Um dicionário por (documento, estágio)
+    """
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix='bench_extrator_') as diretorio:
+        for documento, conteudo in carregar_corpus(tamanhos):
+            vezes = repeticoes if len(conteudo) < LIMITE_REPETICOES else 1
+            parser_base, estagios = _estagios(conteudo, diretorio)
+            print(f"\n📄 {documento} ({len(conteudo):,} bytes, árvore com {parser_base})")
+            for estagio, funcao in estagios:
+                if filtro and filtro not in estagio:
+                    continue
+                medida = medir(funcao, vezes, memoria)
+                medida.update({'documento': documento, 'bytes': len(conteudo), 'estagio': estagio})
+                resultados.append(medida)
+                pico = f"{medida['pico_memoria'] / (1024 * 1024):>8.1f} MB" if medida['pico_memoria'] is not None else ''
+                print(f"  • {estagio:<32} {medida['tempo_mediana'] * 1000:>10.1f} ms {pico}")
+    return resultados
+
+def metadados():
+    """Commit, versões e máquina, para comparar resultados entre execuções"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        import lxml.etree
+        versao_lxml = '.'.join(map(str, lxml.etree.LXML_VERSION))
+    except ImportError:
+        versao_lxml = None
+    return {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'bs4': bs4.__version__,
+        'lxml': versao_lxml,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+    }
+
+def comparar(arquivo_base, arquivo_novo):
+    """Mostra a variação de tempo e memória entre dois arquivos de resultado"""
+    with open(arquivo_base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(arquivo_novo, 'r', encoding='utf-8') as f:
+        novo = json.load(f)
+
+    indice_base = {(r['documento'], r['estagio']): r for r in base['resultados']}
+    print(f"📊 {base['metadados'].get('commit')} → {novo['metadados'].get('commit')}")
+    print(f"{'documento':<20} {'estágio':<32} {'antes':>10} {'depois':>10} {'tempo':>8} {'memória':>8}")
+    for r in novo['resultados']:
+        anterior = indice_base.get((r['documento'], r['estagio']))
+        if anterior is None:
+            continue
+        variacao = (r['tempo_mediana'] / anterior['tempo_mediana'] - 1) * 100 if anterior['tempo_mediana'] else 0.0
+        memoria = ''
+        if r.get('pico_memoria') and anterior.get('pico_memoria'):
+            memoria = f"{(r['pico_memoria'] / anterior['pico_memoria'] - 1) * 100:>+7.1f}%"
+        print(
+            f"{r['documento']:<20} {r['estagio']:<32} {anterior['tempo_mediana'] * 1000:>8.1f}ms "
+            f"{r['tempo_mediana'] * 1000:>8.1f}ms {variacao:>+7.1f}% {memoria:>8}"
+        )
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="🧪 Benchmark por estágio - Extrator de HTML")
+    parser.add_argument('--tamanhos', default=','.join(TAMANHOS_PADRAO),
+                        help=f"Tamanhos separados por vírgula ({', '.join(TAMANHOS)})")
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições por estágio (padrão: 3)')
+    parser.add_argument('--estagio', metavar='TEXTO', help="Só estágios cujo nome contém TEXTO (ex.: 'parse')")
+    parser.add_argument('--sem-memoria', action='store_true', help='Não medir pico de memória (mais rápido)')
+    parser.add_argument('--saida', metavar='ARQUIVO', help='Salvar resultados em JSON')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'), help='Comparar dois arquivos JSON')
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    tamanhos = [t.strip() for t in args.tamanhos.split(',') if t.strip()]
+    invalidos = [t for t in tamanhos if t not in TAMANHOS]
+    if invalidos:
+        parser.error(f"Tamanhos inválidos: {', '.join(invalidos)}")
+
+    dados = {'metadados': metadados()}
+    print("=" * 60)
+    print("🧪 BENCHMARK POR ESTÁGIO - Extrator de HTML")
+    print(f"commit {dados['metadados']['commit']} | Python {dados['metadados']['python']} | bs4 {dados['metadados']['bs4']}")
+    print("=" * 60)
+
+    dados['resultados'] = executar(tamanhos, args.repeticoes, not args.sem_memoria, args.estagio)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados salvos em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+🧪 Extrator de HTML - Benchmark de inicialização
+Mede quanto a CLI demora para responder a --version e --help rodando pelo
+Python e pelos executáveis do build.py (arquivo único e pasta), que é o que
+pesa quando scripts chamam a CLI uma vez por URL
+
+Uso:
+    python benchmarks/bench_inicializacao.py
+    python benchmarks/bench_inicializacao.py --repeticoes 20 --saida inicio.json
+    python benchmarks/bench_inicializacao.py --executavel meu=caminho/ExtratorHTML.exe
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from build import FORMATO_ARQUIVO_UNICO, FORMATO_PASTA, caminho_executavel
+
+SCRIPT_CLI = os.path.join(RAIZ, 'extrator_html.py')
+_IMPORTS_COMPLETOS = (
+    "import runpy, sys, requests, bs4; sys.argv[0] = {0!r}; runpy.run_path({0!r}, run_name='__main__')"
+).format(SCRIPT_CLI)
+
+def medir_comando(comando, repeticoes):
+    """
+    Roda o comando várias vezes e cronometra cada execução até o fim
+
+    Returns:
+        dict: tempo_min, tempo_mediana e repeticoes (segundos), ou None se o
+        comando falhar
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run(comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tempos.append(time.perf_counter() - inicio)
+        if processo.returncode != 0:
+            return None
+    return {
+        'tempo_min': min(tempos),
+        'tempo_mediana': statistics.median(tempos),
+        'repeticoes': repeticoes,
+    }
+
+def alvos(executaveis_extras):
+    """
+    Lista (nome, comando base) de tudo o que vai ser medido
+
+    Os executáveis do build.py entram só se existirem em dist/.
+    """
+    lista = [
+        ('python', [sys.executable, SCRIPT_CLI]),
+        # O que a CLI pagava antes dos imports sob demanda: requests e bs4 logo no início
+        ('python:imports-completos', [sys.executable, '-c', _IMPORTS_COMPLETOS]),
+    ]
+    for formato in (FORMATO_ARQUIVO_UNICO, FORMATO_PASTA):
+        caminho = os.path.join(RAIZ, caminho_executavel('ExtratorHTML', formato))
+        if os.path.isfile(caminho):
+            lista.append((f'exe:{formato}', [caminho]))
+    for extra in executaveis_extras or []:
+        nome, _, caminho = extra.partition('=')
+        lista.append((f'exe:{nome}', [caminho or nome]))
+    return lista
+
+def executar(repeticoes, executaveis_extras=None):
+    """
+    Mede --version e --help de cada alvo
+
+    Returns:
+        list: Um dicionário por (alvo, argumento)
+    """
+    resultados = []
+    for nome, comando in alvos(executaveis_extras):
+        print(f"\n🚀 {nome}")
+        for argumento in ('--version', '--help'):
+            medida = medir_comando(comando + [argumento], repeticoes)
+            if medida is None:
+                print(f"  • {argumento:<10} ❌ falhou")
+                continue
+            medida.update({'alvo': nome, 'argumento': argumento})
+            resultados.append(medida)
+            print(f"  • {argumento:<10} {medida['tempo_mediana'] * 1000:>9.1f} ms (mín. {medida['tempo_min'] * 1000:.1f} ms)")
+    return resultados
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="🧪 Benchmark de inicialização - Extrator de HTML")
+    parser.add_argument('--repeticoes', type=int, default=10, help='Execuções por comando (padrão: 10)')
+    parser.add_argument('--executavel', action='append', metavar='NOME=CAMINHO',
+                        help='Executável extra para medir (pode repetir)')
+    parser.add_argument('--saida', metavar='ARQUIVO', help='Salvar resultados em JSON')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧪 BENCHMARK DE INICIALIZAÇÃO - Extrator de HTML")
+    print(f"Python {platform.python_version()} | {platform.platform()}")
+    print("=" * 60)
+
+    dados = {
+        'metadados': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+        },
+        'resultados': executar(args.repeticoes, args.executavel),
+    }
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados salvos em: {args.saida}")
+
+if __name__ == "__main__":
+    main()
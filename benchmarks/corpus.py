@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+🧪 Extrator de HTML - Corpus dos benchmarks
+Gera documentos HTML determinísticos (mesma semente = mesmos bytes) em
+vários tamanhos, sem acesso à rede
+"""
+
+import os
+import random
+import re
+
+# Tamanhos disponíveis (nome -> bytes)
+TAMANHOS = {
+    '10KB': 10 * 1024,
+    '100KB': 100 * 1024,
+    '1MB': 1024 * 1024,
+    '10MB': 10 * 1024 * 1024,
+    '50MB': 50 * 1024 * 1024,
+}
+TAMANHOS_PADRAO = ('10KB', '100KB', '1MB', '10MB')
+
+# Página real usada como base do corpus "real": a landing page do projeto
+PAGINA_REAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'index.html')
+
+_PALAVRAS = (
+    'extrator html página conteúdo dados link tabela lista análise relatório '
+    'visualização gráfico resultado usuário sistema rede arquivo cache parser '
+    'the quick brown fox jumps over lazy dog lorem ipsum dolor sit amet'
+).split()
+
+def _texto(rng, minimo=4, maximo=30):
+    return ' '.join(rng.choice(_PALAVRAS) for _ in range(rng.randint(minimo, maximo)))
+
+def _bloco(rng, indice):
+    """Um bloco de HTML variado (artigo, tabela, lista, formulário, script)"""
+    tipo = rng.randrange(5)
+    if tipo == 0:
+        paragrafos = ''.join(
+            f'<p class="texto t{rng.randrange(9)}">{_texto(rng)} <a href="/pagina/{indice}/{i}?ref=bench">'
+            f'{_texto(rng, 1, 3)}</a> <b>{_texto(rng, 1, 4)}</b> &amp; {_texto(rng, 2, 8)}</p>\n'
+            for i in range(rng.randint(2, 6))
+        )
+        return f'<article id="artigo-{indice}" data-ordem="{indice}">\n<h2>{_texto(rng, 2, 6)}</h2>\n{paragrafos}</article>\n'
+    if tipo == 1:
+        linhas = ''.join(
+            '<tr>' + ''.join(f'<td>{rng.randint(0, 99999)}</td>' for _ in range(5)) + '</tr>\n'
+            for _ in range(rng.randint(3, 12))
+        )
+        return f'<table class="dados"><thead><tr><th>a</th><th>b</th><th>c</th><th>d</th><th>e</th></tr></thead>\n<tbody>\n{linhas}</tbody></table>\n'
+    if tipo == 2:
+        itens = ''.join(f'  <li><a href="https://exemplo.com/{indice}/{i}">{_texto(rng, 1, 5)}</a></li>\n' for i in range(rng.randint(3, 10)))
+        return f'<nav>\n<ul class="menu">\n{itens}</ul>\n</nav>\n'
+    if tipo == 3:
+        return (
+            f'<form action="/enviar/{indice}" method="post"><label>{_texto(rng, 1, 3)}</label>'
+            f'<input type="text" name="campo{indice}" value="{_texto(rng, 1, 2)}"><br>'
+            f'<textarea>  {_texto(rng)}\n  {_texto(rng)}  </textarea></form>\n'
+        )
+    return (
+        f'<!-- bloco {indice} -->\n<script>var dados{indice} = {{"id": {indice}, "itens": [1, 2, 3]}};\n'
+        f'if (dados{indice}.id < 10) {{ console.log("x"); }}</script>\n'
+        f'<pre>  {_texto(rng)}\n    {_texto(rng)}</pre>\n'
+    )
+
+def gerar_sintetico(tamanho, semente=42):
+    """
+    Gera um documento sintético com aproximadamente ``tamanho`` bytes
+
+    Args:
+        tamanho (int): Tamanho aproximado em bytes
+        semente (int): Semente do gerador aleatório
+
+    Returns:
+        bytes: Documento HTML em UTF-8
+    """
+    rng = random.Random(semente)
+    cabecalho = (
+        '<!DOCTYPE html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+        '<title>Corpus sintético</title>\n<style>body { margin: 0 } .texto { color: #333 }</style>\n'
+        '</head>\n<body>\n<div id="conteudo" class="principal">\n'
+    )
+    rodape = '</div>\n</body>\n</html>\n'
+    partes = [cabecalho]
+    total = len(cabecalho) + len(rodape)
+    indice = 0
+    while total < tamanho:
+        bloco = _bloco(rng, indice)
+        partes.append(bloco)
+        total += len(bloco.encode('utf-8'))
+        indice += 1
+    partes.append(rodape)
+    return ''.join(partes).encode('utf-8')
+
+def gerar_real(tamanho):
+    """
+    Gera um documento a partir da landing page do projeto (index.html)
+
+    O conteúdo do <body> é repetido até chegar ao tamanho pedido, mantendo
+    o HTML, CSS e scripts reais da página, e cortado no fim da última tag
+    que cabe, para o documento não passar do tamanho do sintético de mesmo
+    nome.
+
+    Args:
+        tamanho (int): Tamanho aproximado em bytes
+
+    Returns:
+        bytes: Documento HTML em UTF-8
+    """
+    with open(PAGINA_REAL, 'rb') as f:
+        pagina = f.read()
+
+    encontrado = re.search(rb'(?is)(.*?<body[^>]*>)(.*)(</body>.*)', pagina)
+    if not encontrado:
+        repeticoes = max(1, tamanho // len(pagina))
+        return pagina * repeticoes
+    inicio, corpo, fim = encontrado.groups()
+
+    restante = max(0, tamanho - len(inicio) - len(fim))
+    repeticoes = -(-restante // len(corpo))
+    conteudo = (corpo * repeticoes)[:restante]
+    # Corta depois de um '>': nem tag nem caractere UTF-8 ficam pela metade
+    conteudo = conteudo[:conteudo.rfind(b'>') + 1]
+    return inicio + conteudo + fim
+
+def carregar_corpus(tamanhos=TAMANHOS_PADRAO):
+    """
+    Monta o corpus: um documento sintético e um real para cada tamanho
+
+    Args:
+        tamanhos (iterable): Nomes de tamanho (ver TAMANHOS)
+
+    Returns:
+        list: Tuplas (nome do documento, bytes)
+    """
+    corpus = []
+    for nome in tamanhos:
+        tamanho = TAMANHOS[nome]
+        corpus.append((f'sintetico-{nome}', gerar_sintetico(tamanho)))
+        corpus.append((f'real-{nome}', gerar_real(tamanho)))
+    return corpus
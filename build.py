@@ -9,6 +9,21 @@ import subprocess
 import sys
 import shutil
 
+# --onefile descompacta tudo numa pasta temporária a cada execução; --onedir
+# deixa os arquivos prontos ao lado do executável e inicia bem mais rápido
+FORMATO_ARQUIVO_UNICO = 'onefile'
+FORMATO_PASTA = 'onedir'
+# Builds em pasta vão para dist/pasta, para conviver com os de arquivo único
+PASTA_ONEDIR = os.path.join('dist', 'pasta')
+
+# Módulos que o PyInstaller arrastaria sem que o extrator use
+MODULOS_EXCLUIDOS = [
+    'unittest', 'doctest', 'pydoc', 'pdb', 'lib2to3', 'test', 'xmlrpc',
+    'pytest', 'IPython', 'numpy', 'matplotlib', 'PIL',
+]
+# A CLI não abre janelas
+MODULOS_EXCLUIDOS_CLI = MODULOS_EXCLUIDOS + ['tkinter', '_tkinter']
+
 def verificar_pyinstaller():
     """Verifica se PyInstaller está instalado"""
     try:
@@ -36,15 +51,33 @@ def limpar_builds_anteriores():
             print(f"🗑️ Removendo arquivo: {arquivo}")
             os.remove(arquivo)
 
-def criar_executavel_cli():
-    """Cria executável da versão CLI"""
+def opcoes_formato(formato, excluidos):
+    """Argumentos do PyInstaller para o formato do build e os módulos excluídos"""
+    opcoes = []
+    if formato == FORMATO_PASTA:
+        opcoes += ['--onedir', '--distpath', PASTA_ONEDIR]
+    else:
+        opcoes.append('--onefile')
+    for modulo in excluidos:
+        opcoes += ['--exclude-module', modulo]
+    return opcoes
+
+def caminho_executavel(nome, formato):
+    """Onde o PyInstaller deixa o executável de cada formato"""
+    extensao = '.exe' if os.name == 'nt' else ''
+    if formato == FORMATO_PASTA:
+        return os.path.join(PASTA_ONEDIR, nome, nome + extensao)
+    return os.path.join('dist', nome + extensao)
+
+def criar_executavel_cli(formato=FORMATO_ARQUIVO_UNICO):
+    """Cria executável da versão CLI (formato: 'onefile' ou 'onedir')"""
     print("\n" + "=" * 60)
-    print("🔨 Criando executável CLI...")
+    print(f"🔨 Criando executável CLI ({formato})...")
     print("=" * 60)
     
     comando = [
         sys.executable, '-m', 'PyInstaller',
-        '--onefile',
+        *opcoes_formato(formato, MODULOS_EXCLUIDOS_CLI),
         '--name', 'ExtratorHTML',
         '--clean',
         '--noconfirm',
@@ -54,21 +87,21 @@ def criar_executavel_cli():
     
     try:
         subprocess.run(comando, check=True)
-        print("\n✅ Executável CLI criado: dist/ExtratorHTML.exe")
+        print(f"\n✅ Executável CLI criado: {caminho_executavel('ExtratorHTML', formato)}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"\n❌ Erro ao criar executável CLI: {e}")
         return False
 
-def criar_executavel_gui():
-    """Cria executável da versão GUI"""
+def criar_executavel_gui(formato=FORMATO_ARQUIVO_UNICO):
+    """Cria executável da versão GUI (formato: 'onefile' ou 'onedir')"""
     print("\n" + "=" * 60)
-    print("🔨 Criando executável GUI...")
+    print(f"🔨 Criando executável GUI ({formato})...")
     print("=" * 60)
     
     comando = [
         sys.executable, '-m', 'PyInstaller',
-        '--onefile',
+        *opcoes_formato(formato, MODULOS_EXCLUIDOS),
         '--name', 'ExtratorHTML_GUI',
         '--clean',
         '--noconfirm',
@@ -79,12 +112,20 @@ def criar_executavel_gui():
     
     try:
         subprocess.run(comando, check=True)
-        print("\n✅ Executável GUI criado: dist/ExtratorHTML_GUI.exe")
+        print(f"\n✅ Executável GUI criado: {caminho_executavel('ExtratorHTML_GUI', formato)}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"\n❌ Erro ao criar executável GUI: {e}")
         return False
 
+def tamanho_pasta(caminho):
+    """Soma do tamanho dos arquivos de uma pasta (build onedir)"""
+    return sum(
+        os.path.getsize(os.path.join(raiz, arquivo))
+        for raiz, _, arquivos in os.walk(caminho)
+        for arquivo in arquivos
+    )
+
 def mostrar_resultado():
     """Mostra resultado final"""
     print("\n" + "=" * 60)
@@ -96,13 +137,20 @@ def mostrar_resultado():
     if os.path.exists(dist_path):
         print(f"\n📁 Executáveis criados em: {dist_path}")
         print("\nArquivos gerados:")
-        for arquivo in os.listdir(dist_path):
+        for arquivo in sorted(os.listdir(dist_path)):
             caminho = os.path.join(dist_path, arquivo)
-            tamanho = os.path.getsize(caminho) / (1024 * 1024)  # MB
-            print(f"  📦 {arquivo} ({tamanho:.1f} MB)")
+            if os.path.isfile(caminho):
+                tamanho = os.path.getsize(caminho) / (1024 * 1024)  # MB
+                print(f"  📦 {arquivo} ({tamanho:.1f} MB)")
+        
+        pasta_onedir = os.path.abspath(PASTA_ONEDIR)
+        if os.path.isdir(pasta_onedir):
+            for nome in sorted(os.listdir(pasta_onedir)):
+                tamanho = tamanho_pasta(os.path.join(pasta_onedir, nome)) / (1024 * 1024)  # MB
+                print(f"  📁 pasta/{nome}/ ({tamanho:.1f} MB)")
     
     print("\n💡 Como usar:")
-    print("  1. Navegue até a pasta 'dist'")
+    print("  1. Navegue até a pasta 'dist' (ou 'dist/pasta/<nome>' no formato pasta)")
     print("  2. Execute 'ExtratorHTML.exe' (CLI) ou 'ExtratorHTML_GUI.exe' (Interface)")
     print("  3. Cole a URL e extraia o HTML!")
 
@@ -131,14 +179,26 @@ def main():
     
     escolha = input("\nEscolha (1/2/3) [3]: ").strip() or "3"
     
+    print("\n📋 Formato do executável?")
+    print("  1. Arquivo único (--onefile, mais simples de distribuir)")
+    print("  2. Pasta (--onedir, inicia mais rápido)")
+    print("  3. Ambos (para comparar com benchmarks/bench_inicializacao.py)")
+    
+    escolha_formato = input("\nEscolha (1/2/3) [1]: ").strip() or "1"
+    formatos = {
+        "1": [FORMATO_ARQUIVO_UNICO],
+        "2": [FORMATO_PASTA],
+        "3": [FORMATO_ARQUIVO_UNICO, FORMATO_PASTA],
+    }.get(escolha_formato, [FORMATO_ARQUIVO_UNICO])
+    
     sucesso_cli = True
     sucesso_gui = True
     
     if escolha in ["1", "3"]:
-        sucesso_cli = criar_executavel_cli()
+        sucesso_cli = all([criar_executavel_cli(formato) for formato in formatos])
     
     if escolha in ["2", "3"]:
-        sucesso_gui = criar_executavel_gui()
+        sucesso_gui = all([criar_executavel_gui(formato) for formato in formatos])
     
     # Mostrar resultado
     if sucesso_cli or sucesso_gui:
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Cache HTTP em disco
+Guarda as respostas por URL normalizada com ETag/Last-Modified/Cache-Control,
+revalida com requisições condicionais e remove as entradas menos usadas
+quando o tamanho máximo é atingido
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DIRETORIO_PADRAO = '.cache_extrator'
+TAMANHO_MAXIMO_PADRAO = 200 * 1024 * 1024  # 200 MB
+
+# Modos de uso do cache
+MODO_DESLIGADO = 'desligado'
+MODO_USAR = 'usar'
+MODO_ATUALIZAR = 'atualizar'  # Ignora a cópia guardada, mas grava a nova
+MODOS_CACHE = (MODO_DESLIGADO, MODO_USAR, MODO_ATUALIZAR)
+
+def normalizar_url(url):
+    """
+    Normaliza uma URL para uso como chave
+
+    Esquema e host em minúsculas, porta padrão removida, caminho vazio vira
+    '/', parâmetros da query ordenados e fragmento (#...) descartado.
+
+    Args:
+        url (str): URL original
+
+    Returns:
+        str: URL normalizada
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or '').lower()
+    porta = partes.port
+    if porta and not ((esquema == 'http' and porta == 80) or (esquema == 'https' and porta == 443)):
+        host = f"{host}:{porta}"
+    if partes.username:
+        credenciais = partes.username + (f":{partes.password}" if partes.password else '')
+        host = f"{credenciais}@{host}"
+    caminho = partes.path or '/'
+    query = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((esquema, host, caminho, query, ''))
+
+def _diretivas_cache_control(valor):
+    """Converte 'max-age=60, no-cache' em {'max-age': '60', 'no-cache': ''}"""
+    diretivas = {}
+    for parte in (valor or '').split(','):
+        parte = parte.strip().lower()
+        if not parte:
+            continue
+        nome, _, argumento = parte.partition('=')
+        diretivas[nome.strip()] = argumento.strip().strip('"')
+    return diretivas
+
+class EntradaCache:
+    """Metadados de uma resposta guardada no cache"""
+
+    def __init__(self, chave, url, arquivo, tamanho, status, headers, armazenado_em):
+        self.chave = chave
+        self.url = url
+        self.arquivo = arquivo
+        self.tamanho = tamanho
+        self.status = status
+        self.headers = headers
+        self.armazenado_em = armazenado_em
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def fresca(self, agora=None):
+        """True se o Cache-Control permite usar a cópia sem revalidar"""
+        diretivas = _diretivas_cache_control(self.headers.get('Cache-Control'))
+        if 'no-cache' in diretivas or ('must-revalidate' in diretivas and 'max-age' not in diretivas):
+            return False
+        max_age = diretivas.get('s-maxage') or diretivas.get('max-age')
+        if not max_age or not re.fullmatch(r'\d+', max_age):
+            return False
+        agora = agora if agora is not None else time.time()
+        return agora - self.armazenado_em < int(max_age)
+
+    def headers_condicionais(self):
+        """Headers If-None-Match / If-Modified-Since para revalidação"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class CacheHTTP:
+    """
+    Cache persistente de respostas HTTP com despejo LRU por tamanho
+
+    O corpo de cada resposta fica em um arquivo próprio e o índice (headers,
+    tamanho e último acesso) em um banco SQLite no mesmo diretório. Pode ser
+    usado por várias threads ao mesmo tempo.
+    """
+
+    # Headers guardados junto com o corpo
+    HEADERS_GUARDADOS = ('ETag', 'Last-Modified', 'Cache-Control', 'Content-Type', 'Expires', 'Date')
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO):
+        """
+        Args:
+            diretorio (str): Diretório onde o cache é guardado
+            tamanho_maximo (int): Tamanho máximo total dos corpos em bytes
+        """
+        self.diretorio = os.path.abspath(diretorio)
+        self.tamanho_maximo = tamanho_maximo
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._banco = sqlite3.connect(
+            os.path.join(self.diretorio, 'indice.sqlite3'),
+            check_same_thread=False
+        )
+        self._banco.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entradas (
+                chave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                arquivo TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                armazenado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+            """
+        )
+        self._banco.execute('CREATE INDEX IF NOT EXISTS idx_acesso ON entradas (ultimo_acesso)')
+        self._banco.commit()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.revalidados = 0
+
+    @staticmethod
+    def chave(url):
+        """Chave do cache: SHA-256 da URL normalizada"""
+        return hashlib.sha256(normalizar_url(url).encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave)
+
+    def consultar(self, url):
+        """
+        Procura a URL no cache e marca o acesso (para o LRU)
+
+        Returns:
+            EntradaCache: Entrada encontrada ou None
+        """
+        chave = self.chave(url)
+        with self._lock:
+            linha = self._banco.execute(
+                'SELECT url, arquivo, tamanho, status, headers, armazenado_em FROM entradas WHERE chave = ?',
+                (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            if not os.path.exists(linha[1]):
+                # Corpo apagado por fora: esquece a entrada
+                self._banco.execute('DELETE FROM entradas WHERE chave = ?', (chave,))
+                self._banco.commit()
+                return None
+            self._banco.execute('UPDATE entradas SET ultimo_acesso = ? WHERE chave = ?', (time.time(), chave))
+            self._banco.commit()
+        return EntradaCache(chave, linha[0], linha[1], linha[2], linha[3], json.loads(linha[4]), linha[5])
+
+    def ler_corpo(self, entrada):
+        """Lê o corpo guardado de uma entrada"""
+        with open(entrada.arquivo, 'rb') as f:
+            return f.read()
+
+    def guardar(self, url, conteudo, status, headers):
+        """
+        Guarda uma resposta no cache (respeitando Cache-Control: no-store)
+
+        Args:
+            url (str): URL da requisição
+            conteudo (bytes | arquivo): Corpo da resposta (bytes ou arquivo binário)
+            status (int): Status HTTP
+            headers (Mapping): Headers da resposta
+
+        Returns:
+            bool: True se a resposta foi guardada
+        """
+        if 'no-store' in _diretivas_cache_control(headers.get('Cache-Control')):
+            return False
+
+        chave = self.chave(url)
+        caminho = self._caminho(chave)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        # Escrita atômica: outro leitor nunca vê um corpo pela metade
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            if isinstance(conteudo, (bytes, bytearray)):
+                f.write(conteudo)
+            else:
+                shutil.copyfileobj(conteudo, f)
+            tamanho = f.tell()
+        if tamanho > self.tamanho_maximo:
+            os.remove(temporario)
+            return False
+        os.replace(temporario, caminho)
+
+        guardados = {nome: headers[nome] for nome in self.HEADERS_GUARDADOS if headers.get(nome)}
+        agora = time.time()
+        with self._lock:
+            self._banco.execute(
+                'INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (chave, normalizar_url(url), caminho, tamanho, status, json.dumps(guardados), agora, agora)
+            )
+            self._banco.commit()
+            self._despejar()
+        return True
+
+    def renovar(self, entrada, headers):
+        """
+        Atualiza uma entrada depois de um 304 Not Modified
+
+        Args:
+            entrada (EntradaCache): Entrada revalidada
+            headers (Mapping): Headers da resposta 304
+        """
+        for nome in self.HEADERS_GUARDADOS:
+            if headers.get(nome):
+                entrada.headers[nome] = headers[nome]
+        entrada.armazenado_em = time.time()
+        with self._lock:
+            self._banco.execute(
+                'UPDATE entradas SET headers = ?, armazenado_em = ?, ultimo_acesso = ? WHERE chave = ?',
+                (json.dumps(entrada.headers), entrada.armazenado_em, entrada.armazenado_em, entrada.chave)
+            )
+            self._banco.commit()
+
+    def _despejar(self):
+        """Remove as entradas usadas há mais tempo até caber no tamanho máximo"""
+        total = self._banco.execute('SELECT COALESCE(SUM(tamanho), 0) FROM entradas').fetchone()[0]
+        if total <= self.tamanho_maximo:
+            return
+
+        removidas = []
+        for chave, arquivo, tamanho in self._banco.execute(
+            'SELECT chave, arquivo, tamanho FROM entradas ORDER BY ultimo_acesso ASC'
+        ).fetchall():
+            if total <= self.tamanho_maximo:
+                break
+            removidas.append((chave,))
+            total -= tamanho
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+
+        self._banco.executemany('DELETE FROM entradas WHERE chave = ?', removidas)
+        self._banco.commit()
+
+    def limpar(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            for (arquivo,) in self._banco.execute('SELECT arquivo FROM entradas').fetchall():
+                try:
+                    os.remove(arquivo)
+                except OSError:
+                    pass
+            self._banco.execute('DELETE FROM entradas')
+            self._banco.commit()
+
+    def registrar(self, evento):
+        """Conta um evento de uso: 'acertos', 'falhas' ou 'revalidados'"""
+        with self._lock:
+            setattr(self, evento, getattr(self, evento) + 1)
+
+    def estatisticas(self):
+        """
+        Retorna contadores de uso e ocupação do cache
+
+        Returns:
+            dict: acertos, falhas, revalidados, entradas e bytes ocupados
+        """
+        with self._lock:
+            entradas, ocupado = self._banco.execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas'
+            ).fetchone()
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'revalidados': self.revalidados,
+            'entradas': entradas,
+            'bytes': ocupado,
+        }
+
+    def fechar(self):
+        """Fecha o índice SQLite"""
+        with self._lock:
+            self._banco.close()
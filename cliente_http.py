@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Cliente HTTP
+Sessão HTTP reutilizável com pool de conexões keep-alive, compartilhada
+pela versão CLI e pela versão GUI
+"""
+
+import socket
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family, create_connection
+from requests.structures import CaseInsensitiveDict
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    # urllib3 1.26 (ainda aceito pelo requests 2.31) não tem essa exceção
+    NameResolutionError = None
+
+from cache_http import MODO_DESLIGADO, MODO_USAR
+from codificacao_html import resolver_codificacao
+from metricas import medir_fase, metricas_atuais, registrar_fase
+from retentativas import PoliticaRetentativas
+
+# Headers para simular um navegador real
+HEADERS_PADRAO = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+TAMANHO_BLOCO = 64 * 1024
+LIMITE_MEMORIA_PADRAO = 8 * 1024 * 1024  # Acima disso o corpo vai para disco
+
+class TamanhoExcedido(requests.exceptions.RequestException):
+    """O corpo da resposta passou do tamanho máximo permitido"""
+
+    def __init__(self, tamanho, limite, **kwargs):
+        self.tamanho = tamanho
+        self.limite = limite
+        super().__init__(f"Corpo passou do limite de {limite:,} bytes ({tamanho:,} bytes)", **kwargs)
+
+class CorpoBaixado:
+    """
+    Corpo de uma resposta guardado em arquivo (RAM pequena ou disco)
+
+    Pode ser usado como context manager para liberar o arquivo temporário.
+    """
+
+    def __init__(self, arquivo, tamanho, retomadas=0, content_type=None, url=None):
+        self.arquivo = arquivo
+        self.tamanho = tamanho
+        self.retomadas = retomadas
+        self.content_type = content_type
+        # URL final da resposta, base dos links relativos
+        self.url = url
+        # Árvore do lxml montada durante o download (baixar(consumidor=...))
+        self.arvore = None
+        self._codificacao = None
+
+    @property
+    def em_disco(self):
+        """True se o corpo foi gravado em disco em vez de ficar na memória"""
+        return getattr(self.arquivo, '_rolled', True)
+
+    def abrir(self):
+        """Retorna o arquivo posicionado no início"""
+        self.arquivo.seek(0)
+        return self.arquivo
+
+    def ler(self):
+        """Lê o corpo inteiro para a memória"""
+        return self.abrir().read()
+
+    def codificacao(self):
+        """
+        Codificação do documento, resolvida uma vez só (ver resolver_codificacao)
+
+        Returns:
+            str: Nome da codificação, pronto para o from_encoding do BeautifulSoup
+        """
+        if self._codificacao is None:
+            self._codificacao = resolver_codificacao(self.arquivo, self.content_type)
+        return self._codificacao[0]
+
+    @property
+    def caminho_codificacao(self):
+        """Como a codificação foi descoberta ('header', 'meta'...) ou None se ainda não foi"""
+        return self._codificacao[1] if self._codificacao else None
+
+    def iterar(self, tamanho_bloco=TAMANHO_BLOCO):
+        """Percorre o corpo em blocos de bytes"""
+        arquivo = self.abrir()
+        while True:
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            yield bloco
+
+    def fechar(self):
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+class _ConexaoMedida:
+    """
+    Mixin das conexões do urllib3 que mede DNS, TCP e TLS
+
+    Só entra em ação quando há uma MetricasExtracao sendo coletada na thread;
+    fora disso a conexão segue o caminho normal do urllib3.
+    """
+
+    def _new_conn(self):
+        metricas = metricas_atuais()
+        if metricas is None:
+            return super()._new_conn()
+
+        # Resolve uma vez só e conecta direto no IP, para separar DNS de TCP
+        inicio = time.perf_counter()
+        try:
+            enderecos = socket.getaddrinfo(
+                self._dns_host.strip('[]'), self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except socket.gaierror as e:
+            if NameResolutionError is None:
+                raise NewConnectionError(self, f"Failed to resolve '{self.host}' ({e})") from e
+            raise NameResolutionError(self.host, self, e) from e
+        resolvido = time.perf_counter()
+        metricas.adicionar('dns', resolvido - inicio)
+
+        erro = None
+        for *_, endereco in enderecos:
+            try:
+                sock = create_connection(
+                    (endereco[0], self.port), self.timeout,
+                    source_address=self.source_address, socket_options=self.socket_options
+                )
+                break
+            except socket.timeout as e:
+                raise ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                ) from e
+            except OSError as e:
+                erro = e
+        else:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {erro}") from erro
+
+        self._fim_tcp = time.perf_counter()
+        metricas.adicionar('conexao', self._fim_tcp - resolvido)
+        return sock
+
+    def connect(self):
+        metricas = metricas_atuais()
+        if metricas is None or not isinstance(self, HTTPSConnection):
+            return super().connect()
+        self._fim_tcp = None
+        super().connect()
+        if self._fim_tcp is not None:
+            metricas.adicionar('tls', time.perf_counter() - self._fim_tcp)
+
+class _AdaptadorContabilizado(HTTPAdapter):
+    """HTTPAdapter que conta requisições enviadas e conexões TCP realmente abertas"""
+
+    def __init__(self, *args, **kwargs):
+        self._lock_contadores = threading.Lock()
+        self._conexoes = 0
+        self._requisicoes = 0
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adaptador = self
+
+        # Cada socket novo passa por _new_conn, inclusive reconexões de um
+        # objeto de conexão que o servidor fechou
+        class _Conexao(_ConexaoMedida, HTTPConnection):
+            def _new_conn(self):
+                adaptador._registrar_conexao()
+                return super()._new_conn()
+
+        class _ConexaoHTTPS(_ConexaoMedida, HTTPSConnection):
+            def _new_conn(self):
+                adaptador._registrar_conexao()
+                return super()._new_conn()
+
+        class _Pool(HTTPConnectionPool):
+            ConnectionCls = _Conexao
+
+        class _PoolHTTPS(HTTPSConnectionPool):
+            ConnectionCls = _ConexaoHTTPS
+
+        self.poolmanager.pool_classes_by_scheme = {'http': _Pool, 'https': _PoolHTTPS}
+
+    def _registrar_conexao(self):
+        with self._lock_contadores:
+            self._conexoes += 1
+
+    def send(self, request, *args, **kwargs):
+        with self._lock_contadores:
+            self._requisicoes += 1
+        return super().send(request, *args, **kwargs)
+
+    def contadores(self):
+        """Retorna (conexões abertas, requisições feitas)"""
+        with self._lock_contadores:
+            return self._conexoes, self._requisicoes
+
+class ClienteHTTP:
+    """
+    Cliente HTTP com sessão e pool de conexões por host
+
+    Extrações repetidas contra os mesmos hosts reutilizam conexões já
+    abertas (TCP + TLS), evitando um novo handshake a cada requisição.
+    Pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self, headers=None, conexoes_por_host=10, hosts_no_pool=20, timeout=30,
+                 cache=None, modo_cache=MODO_USAR, tamanho_maximo=None,
+                 limite_memoria=LIMITE_MEMORIA_PADRAO, max_retomadas=3, retentativas=None, limitador=None):
+        """
+        Args:
+            headers (dict): Headers extras somados aos HEADERS_PADRAO
+            conexoes_por_host (int): Conexões mantidas abertas por host
+            hosts_no_pool (int): Quantidade de hosts com pool mantido em memória
+            timeout (float): Timeout padrão das requisições em segundos
+            cache (CacheHTTP): Cache em disco das respostas (None = sem cache)
+            modo_cache (str): 'usar', 'atualizar' ou 'desligado'
+            tamanho_maximo (int): Tamanho máximo do corpo em bytes (None = sem limite)
+            limite_memoria (int): Bytes do corpo mantidos em RAM antes de ir para disco
+            max_retomadas (int): Quantas vezes retomar um download interrompido
+            retentativas (PoliticaRetentativas): Quando repetir falhas
+                temporárias (None = PoliticaRetentativas() padrão; use
+                tentativas=1 para não repetir)
+            limitador (LimitadorPorHost): Requisições por segundo por host,
+                compartilhado por todas as threads (None = sem limite)
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.modo_cache = modo_cache
+        self.tamanho_maximo = tamanho_maximo
+        self.limite_memoria = limite_memoria
+        self.max_retomadas = max_retomadas
+        self.retentativas = retentativas or PoliticaRetentativas()
+        self.limitador = limitador
+        self.sessao = requests.Session()
+        self.sessao.headers.update(HEADERS_PADRAO)
+        if headers:
+            self.sessao.headers.update(headers)
+
+        self._adaptador = _AdaptadorContabilizado(
+            pool_connections=hosts_no_pool,
+            pool_maxsize=conexoes_por_host
+        )
+        self.sessao.mount('http://', self._adaptador)
+        self.sessao.mount('https://', self._adaptador)
+
+    def obter(self, url, modo_cache=None, **kwargs):
+        """
+        Faz uma requisição GET e devolve a resposta com o corpo em memória
+
+        Atalho para ``baixar()`` quando o chamador quer ``response.content``.
+
+        Args:
+            url (str): URL para acessar
+            modo_cache (str): Sobrescreve o modo_cache do cliente nesta chamada
+            **kwargs: Argumentos extras repassados para baixar()
+
+        Returns:
+            requests.Response: Resposta com status 2xx e ``content`` preenchido
+
+        Raises:
+            requests.exceptions.RequestException: Em erros de rede ou HTTP
+        """
+        response, corpo = self.baixar(url, modo_cache=modo_cache, **kwargs)
+        with corpo:
+            response._content = corpo.ler()
+        response._content_consumed = True
+        return response
+
+    def baixar(self, url, modo_cache=None, tamanho_maximo=None, limite_memoria=None, progresso=None,
+               prazo=None, consumidor=None, **kwargs):
+        """
+        Faz uma requisição GET lendo o corpo em blocos (stream)
+
+        O corpo vai para um arquivo temporário que só fica em memória até
+        ``limite_memoria`` bytes; acima disso é gravado em disco. Se o corpo
+        passar de ``tamanho_maximo`` o download é abortado. Quando a conexão
+        cai no meio do download e o servidor aceita Range, o download continua
+        de onde parou.
+
+        Com cache, uma cópia ainda fresca (Cache-Control: max-age) é devolvida
+        sem acessar a rede; uma cópia vencida é revalidada com If-None-Match /
+        If-Modified-Since e, se o servidor responder 304, o corpo guardado é
+        reaproveitado. O atributo ``origem_cache`` da resposta indica o caminho:
+        'acerto', 'revalidado', 'falha' ou None (cache desligado).
+
+        Falhas temporárias (timeout, conexão derrubada, 429, 503...) são
+        repetidas conforme a política ``retentativas`` do cliente, e cada
+        tentativa passa antes pelo ``limitador`` do host. Um Retry-After
+        recebido segura o host inteiro no limitador, não só esta thread.
+
+        Args:
+            url (str): URL para acessar
+            modo_cache (str): Sobrescreve o modo_cache do cliente nesta chamada
+            tamanho_maximo (int): Sobrescreve o tamanho_maximo do cliente
+            limite_memoria (int): Sobrescreve o limite_memoria do cliente
+            progresso (callable): Chamada a cada bloco com (bytes recebidos,
+                total esperado ou None); uma exceção lançada por ela aborta o
+                download e é repassada ao chamador
+            prazo (float): Instante (time.monotonic) depois do qual não há
+                nova tentativa; o timeout de cada tentativa é encurtado até ele
+            consumidor (ArvoreIncremental): Recebe cada bloco enquanto o
+                download acontece; o resultado de ``concluir()`` fica em
+                ``corpo.arvore`` (None se não der para usar)
+            **kwargs: Argumentos extras repassados para Session.get
+
+        Returns:
+            tuple: (requests.Response sem o corpo lido, CorpoBaixado)
+
+        Raises:
+            TamanhoExcedido: Se o corpo passar do tamanho máximo
+            requests.exceptions.RequestException: Em erros de rede ou HTTP
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.pop('stream', None)
+        modo = modo_cache or self.modo_cache
+        tamanho_maximo = self.tamanho_maximo if tamanho_maximo is None else tamanho_maximo
+        limite_memoria = self.limite_memoria if limite_memoria is None else limite_memoria
+        usar_cache = self.cache is not None and modo != MODO_DESLIGADO
+
+        entrada = self.cache.consultar(url) if usar_cache and modo == MODO_USAR else None
+        if entrada is not None and entrada.fresca():
+            try:
+                resposta = self._resposta_do_cache(url, entrada, 'acerto')
+            except FileNotFoundError:
+                # Outra thread despejou o corpo depois do consultar(): vira falha
+                entrada = None
+            else:
+                self.cache.registrar('acertos')
+                return self._anotar_metricas(*resposta)
+
+        if entrada is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(entrada.headers_condicionais())
+            kwargs['headers'] = headers
+
+        timeout = kwargs['timeout']
+        tentativa = 1
+        while True:
+            if prazo is not None:
+                kwargs['timeout'] = max(0.001, min(timeout, prazo - time.monotonic()))
+            if self.limitador is not None:
+                aguardado = self.limitador.aguardar(url)
+                if aguardado:
+                    registrar_fase('espera', aguardado)
+            if consumidor is not None:
+                consumidor.iniciar()
+            try:
+                response, corpo = self._requisitar(url, entrada, usar_cache, tamanho_maximo, limite_memoria,
+                                                   progresso, kwargs, consumidor)
+                if consumidor is not None:
+                    corpo.arvore = consumidor.concluir(corpo)
+                return response, corpo
+            except requests.exceptions.RequestException as e:
+                espera = self.retentativas.espera(e, tentativa)
+                if espera is None or (prazo is not None and time.monotonic() + espera >= prazo):
+                    raise
+                self._pausar_host(url, e, espera)
+            with medir_fase('espera'):
+                time.sleep(espera)
+            tentativa += 1
+            metricas = metricas_atuais()
+            if metricas is not None:
+                metricas.tentativas = tentativa
+
+    def _pausar_host(self, url, erro, espera):
+        """Com Retry-After, segura o host no limitador para todas as threads"""
+        response = getattr(erro, 'response', None)
+        if self.limitador is not None and response is not None and 'Retry-After' in response.headers:
+            self.limitador.pausar(url, espera)
+
+    def _requisitar(self, url, entrada, usar_cache, tamanho_maximo, limite_memoria, progresso, kwargs,
+                    consumidor=None):
+        """Uma tentativa de baixar(): GET, revalidação do cache e leitura do corpo"""
+        metricas = metricas_atuais()
+        if metricas is not None:
+            inicio = time.perf_counter()
+            rede_antes = metricas.tempo_rede()
+        response = self.sessao.get(url, stream=True, **kwargs)
+        if metricas is not None:
+            # Até os headers chegarem, descontando a abertura da conexão
+            metricas.status = response.status_code
+            metricas.adicionar('ttfb', time.perf_counter() - inicio - (metricas.tempo_rede() - rede_antes))
+        try:
+            if response.status_code == 304 and entrada is not None:
+                response.close()
+                try:
+                    resposta = self._resposta_do_cache(url, entrada, 'revalidado', response)
+                except FileNotFoundError:
+                    # Corpo despejado por outra thread durante a revalidação: pede a página inteira
+                    headers = {nome: valor for nome, valor in kwargs['headers'].items()
+                               if nome not in entrada.headers_condicionais()}
+                    return self._requisitar(url, None, usar_cache, tamanho_maximo, limite_memoria, progresso,
+                                            dict(kwargs, headers=headers), consumidor)
+                self.cache.renovar(entrada, response.headers)
+                self.cache.registrar('revalidados')
+                return self._anotar_metricas(*resposta)
+
+            response.raise_for_status()
+            with medir_fase('download'):
+                corpo = self._ler_corpo(url, response, tamanho_maximo, limite_memoria, kwargs, progresso, consumidor)
+        except Exception:
+            response.close()
+            raise
+
+        response.origem_cache = None
+        if usar_cache:
+            self.cache.registrar('falhas')
+            if response.status_code == 200:
+                self.cache.guardar(url, corpo.abrir(), response.status_code, response.headers)
+            response.origem_cache = 'falha'
+        return self._anotar_metricas(response, corpo)
+
+    @staticmethod
+    def _anotar_metricas(response, corpo):
+        """Copia status, bytes e origem do cache para a medição da thread"""
+        metricas = metricas_atuais()
+        if metricas is not None:
+            metricas.status = response.status_code
+            metricas.bytes_recebidos = corpo.tamanho
+            metricas.origem_cache = response.origem_cache
+        return response, corpo
+
+    def _ler_corpo(self, url, response, tamanho_maximo, limite_memoria, kwargs, progresso=None, consumidor=None):
+        """Lê o corpo em blocos para um SpooledTemporaryFile, retomando com Range"""
+        declarado = response.headers.get('Content-Length', '')
+        comprimido = response.headers.get('Content-Encoding', 'identity').lower() != 'identity'
+        if tamanho_maximo and declarado.isdigit() and not comprimido and int(declarado) > tamanho_maximo:
+            raise TamanhoExcedido(int(declarado), tamanho_maximo, response=response)
+        # Com Content-Encoding o Content-Length é do corpo comprimido
+        esperado = int(declarado) if declarado.isdigit() and not comprimido else None
+
+        arquivo = tempfile.SpooledTemporaryFile(max_size=limite_memoria)
+        if consumidor is not None:
+            consumidor.iniciar(response.headers.get('Content-Type'))
+        recebidos = 0
+        retomadas = 0
+        atual = response
+        try:
+            while True:
+                try:
+                    for bloco in atual.iter_content(TAMANHO_BLOCO):
+                        recebidos += len(bloco)
+                        if tamanho_maximo and recebidos > tamanho_maximo:
+                            raise TamanhoExcedido(recebidos, tamanho_maximo, response=response)
+                        arquivo.write(bloco)
+                        if consumidor is not None:
+                            consumidor.alimentar(bloco)
+                        if progresso:
+                            progresso(recebidos, esperado)
+                    break
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+                    validador = self._validador_retomada(response)
+                    if retomadas >= self.max_retomadas or validador is None:
+                        raise
+                    retomadas += 1
+                    if atual is not response:
+                        atual.close()
+
+                    headers = dict(kwargs.get('headers') or {})
+                    headers.update({'Range': f'bytes={recebidos}-', 'If-Range': validador})
+                    argumentos = dict(kwargs, headers=headers)
+                    atual = self.sessao.get(url, stream=True, **argumentos)
+
+                    intervalo = atual.headers.get('Content-Range', '')
+                    if atual.status_code == 206 and intervalo.startswith(f'bytes {recebidos}-'):
+                        continue
+                    atual.raise_for_status()
+                    # 200 completo: o recurso mudou ou o Range foi ignorado
+                    arquivo.seek(0)
+                    arquivo.truncate()
+                    recebidos = 0
+                    if consumidor is not None:
+                        consumidor.iniciar(response.headers.get('Content-Type'))
+        except Exception:
+            arquivo.close()
+            raise
+        finally:
+            if atual is not response:
+                atual.close()
+
+        return CorpoBaixado(arquivo, recebidos, retomadas=retomadas,
+                            content_type=response.headers.get('Content-Type'), url=response.url)
+
+    @staticmethod
+    def _validador_retomada(response):
+        """ETag/Last-Modified para If-Range, ou None se não dá para retomar"""
+        if response.headers.get('Accept-Ranges', '').lower() != 'bytes':
+            return None
+        # Com Content-Encoding o Range conta bytes comprimidos, não os lidos
+        if response.headers.get('Content-Encoding', 'identity').lower() != 'identity':
+            return None
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    def _resposta_do_cache(self, url, entrada, origem, response_304=None):
+        """Monta um requests.Response e o corpo a partir de uma entrada do cache"""
+        response = requests.Response()
+        response.status_code = entrada.status
+        response.reason = 'OK'
+        response.url = response_304.url if response_304 is not None else url
+        response.headers = CaseInsensitiveDict(entrada.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        if response_304 is not None:
+            response.elapsed = response_304.elapsed
+            response.request = response_304.request
+        response.origem_cache = origem
+        corpo = CorpoBaixado(open(entrada.arquivo, 'rb'), entrada.tamanho,
+                             content_type=response.headers.get('Content-Type'), url=response.url)
+        return response, corpo
+
+    def estatisticas(self):
+        """
+        Retorna as estatísticas do pool de conexões
+
+        Returns:
+            dict: requisicoes, conexoes_abertas e conexoes_reutilizadas
+        """
+        conexoes, requisicoes = self._adaptador.contadores()
+        return {
+            'requisicoes': requisicoes,
+            'conexoes_abertas': conexoes,
+            'conexoes_reutilizadas': max(0, requisicoes - conexoes),
+        }
+
+    def fechar(self):
+        """Fecha a sessão e todas as conexões do pool"""
+        self.sessao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+_cliente_padrao = None
+_lock_cliente_padrao = threading.Lock()
+
+def obter_cliente_padrao():
+    """Retorna o ClienteHTTP compartilhado do processo (criado sob demanda)"""
+    global _cliente_padrao
+    with _lock_cliente_padrao:
+        if _cliente_padrao is None:
+            _cliente_padrao = ClienteHTTP()
+        return _cliente_padrao
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Codificação
+Descobre a codificação do documento pelo caminho mais barato disponível
+(BOM, charset do header, <meta> do início, UTF-8 válido, detector em C) e
+só recorre à detecção completa do UnicodeDammit em último caso
+"""
+
+import codecs
+import re
+import time
+
+from metricas import registrar_codificacao
+
+# Caminhos da resolução, do mais barato para o mais caro
+CAMINHO_BOM = 'bom'
+CAMINHO_HEADER = 'header'
+CAMINHO_META = 'meta'
+CAMINHO_UTF8 = 'utf-8'
+CAMINHO_DETECTOR = 'detector'
+CAMINHO_SNIFF = 'sniff'
+CAMINHOS = (CAMINHO_BOM, CAMINHO_HEADER, CAMINHO_META, CAMINHO_UTF8, CAMINHO_DETECTOR, CAMINHO_SNIFF)
+
+# Até onde procurar o <meta charset> (o padrão HTML fala em 1024 bytes;
+# algumas páginas têm muito <head> antes dele)
+LIMITE_META = 4096
+# Amostra entregue ao detector
+LIMITE_DETECTOR = 64 * 1024
+CONFIANCA_MINIMA = 0.5
+TAMANHO_BLOCO = 1024 * 1024
+
+# UTF-32 antes de UTF-16: o BOM do UTF-32 LE começa com o do UTF-16 LE
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF32_LE, 'utf-32le'),
+    (codecs.BOM_UTF32_BE, 'utf-32be'),
+    (codecs.BOM_UTF16_LE, 'utf-16le'),
+    (codecs.BOM_UTF16_BE, 'utf-16be'),
+)
+
+_CHARSET_HEADER = re.compile(r'charset\s*=\s*["\']?([^\s;"\']+)', re.I)
+_META = re.compile(rb'<meta\s[^>]*?charset\s*=\s*["\']?\s*([\w.:+-]+)', re.I)
+
+# Como os navegadores: latin-1 e ASCII declarados são lidos como windows-1252
+_EQUIVALENTES = {'latin-1': 'cp1252', 'iso8859-1': 'cp1252', 'ascii': 'cp1252'}
+
+# Nomes do Python que o lxml (libxml2/iconv) não reconhece
+_ROTULOS_LXML = {
+    'utf-16-le': 'utf-16le', 'utf-16-be': 'utf-16be',
+    'utf-32-le': 'utf-32le', 'utf-32-be': 'utf-32be',
+    'mac-roman': 'macintosh', 'iso2022-jp': 'iso-2022-jp',
+}
+
+def _normalizar(nome):
+    """Nome canônico da codificação, aceito pelo Python e pelo lxml (None se desconhecida)"""
+    try:
+        nome = codecs.lookup(nome.strip()).name
+    except (LookupError, ValueError):
+        return None
+    nome = _EQUIVALENTES.get(nome, nome).replace('_', '-')
+    return _ROTULOS_LXML.get(nome, nome)
+
+def charset_do_header(content_type):
+    """Codificação válida declarada no Content-Type (ou None)"""
+    encontrado = _CHARSET_HEADER.search(content_type or '')
+    return _normalizar(encontrado.group(1)) if encontrado else None
+
+def charset_do_meta(inicio):
+    """Codificação declarada em <meta charset> / http-equiv no começo do documento"""
+    encontrado = _META.search(inicio[:LIMITE_META])
+    if not encontrado:
+        return None
+    nome = _normalizar(encontrado.group(1).decode('ascii', errors='ignore'))
+    # Um documento que se lê como ASCII não é UTF-16, apesar do que o <meta> diga
+    if nome and nome.startswith('utf-16'):
+        return 'utf-8'
+    return nome
+
+def detector_disponivel():
+    """Nome do detector em C instalado (cchardet) ou None"""
+    try:
+        import cchardet  # noqa: F401
+    except ImportError:
+        return None
+    return 'cchardet'
+
+def _detectar(amostra):
+    import cchardet
+
+    resultado = cchardet.detect(amostra)
+    if not resultado.get('encoding') or (resultado.get('confidence') or 0) < CONFIANCA_MINIMA:
+        return None
+    return _normalizar(resultado['encoding'])
+
+def _blocos(conteudo):
+    if isinstance(conteudo, (bytes, bytearray, memoryview)):
+        for posicao in range(0, len(conteudo), TAMANHO_BLOCO):
+            yield conteudo[posicao:posicao + TAMANHO_BLOCO]
+        return
+    conteudo.seek(0)
+    while True:
+        bloco = conteudo.read(TAMANHO_BLOCO)
+        if not bloco:
+            return
+        yield bloco
+
+def utf8_valido(conteudo):
+    """True se os bytes (ou o arquivo) formam UTF-8 válido, verificado em blocos"""
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for bloco in _blocos(conteudo):
+            decodificador.decode(bloco)
+        decodificador.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def codificacao_declarada(inicio, content_type=None):
+    """
+    Codificação que o documento declara logo no começo: BOM, charset do
+    Content-Type ou <meta charset> (nessa ordem)
+
+    Basta o início do corpo, então serve para quem ainda está baixando.
+
+    Returns:
+        tuple: (codificação, caminho), ou None se nada for declarado
+    """
+    for bom, nome in _BOMS:
+        if inicio.startswith(bom):
+            return nome, CAMINHO_BOM
+    nome = charset_do_header(content_type)
+    if nome:
+        return nome, CAMINHO_HEADER
+    nome = charset_do_meta(inicio)
+    if nome:
+        return nome, CAMINHO_META
+    return None
+
+def _resolver(conteudo, inicio, content_type, usar_detector):
+    declarada = codificacao_declarada(inicio, content_type)
+    if declarada:
+        return declarada
+    if utf8_valido(conteudo):
+        return 'utf-8', CAMINHO_UTF8
+    if usar_detector and detector_disponivel():
+        nome = _detectar(inicio[:LIMITE_DETECTOR])
+        if nome:
+            return nome, CAMINHO_DETECTOR
+
+    from bs4 import UnicodeDammit
+
+    if not isinstance(conteudo, (bytes, bytearray)):
+        conteudo.seek(0)
+        conteudo = conteudo.read()
+    encontrada = UnicodeDammit(conteudo, is_html=True).original_encoding
+    return _normalizar(encontrada or 'cp1252') or 'cp1252', CAMINHO_SNIFF
+
+def resolver_codificacao(conteudo, content_type=None, usar_detector=True):
+    """
+    Descobre a codificação de um documento HTML
+
+    Ordem: BOM, charset do Content-Type, <meta charset> nos primeiros
+    LIMITE_META bytes, UTF-8 válido, detector em C (cchardet, se instalado)
+    e, por último, a detecção completa do UnicodeDammit. O caminho usado vai
+    para a medição da thread (MetricasExtracao), se houver.
+
+    Args:
+        conteudo (bytes | arquivo): Corpo do documento (arquivos binários
+            voltam para o início)
+        content_type (str): Header Content-Type da resposta
+        usar_detector (bool): Se False, pula o detector em C
+
+    Returns:
+        tuple: (codificação, caminho) com caminho em CAMINHOS
+    """
+    inicio_relogio = time.perf_counter()
+    if isinstance(conteudo, (bytes, bytearray)):
+        inicio = bytes(conteudo[:LIMITE_DETECTOR])
+    else:
+        conteudo.seek(0)
+        inicio = conteudo.read(LIMITE_DETECTOR)
+    try:
+        codificacao, caminho = _resolver(conteudo, inicio, content_type, usar_detector)
+    finally:
+        if not isinstance(conteudo, (bytes, bytearray)):
+            conteudo.seek(0)
+    registrar_codificacao(codificacao, caminho, time.perf_counter() - inicio_relogio)
+    return codificacao, caminho
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Estágio de CPU em processos
+Parse, seleção e serialização do modo lote em processos separados, para o
+trabalho em Python puro (BeautifulSoup, prettify) usar vários núcleos em vez
+de disputar o GIL com as threads que baixam
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+from metricas import MetricasExtracao, coletando, medir_fase
+
+# Corpos até esse tamanho vão junto com a tarefa (pickle pelo pipe); acima
+# disso o worker lê de um arquivo temporário, sem passar os bytes pelo pipe
+LIMITE_ENVIO_DIRETO = 1024 * 1024
+
+def processos_padrao():
+    """Um processo por núcleo disponível para este processo"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Windows e macOS não têm sched_getaffinity
+        return os.cpu_count() or 1
+
+def _aquecer():
+    """Importa bs4/lxml ao subir o worker, e não na primeira tarefa"""
+    import parsers_html
+    import processamento_html  # noqa: F401
+
+    parsers_html.escolher_parser(None)
+
+def processar_documento(tarefa):
+    """
+    Executa, no processo worker, a parte de CPU de uma extração
+
+    Args:
+        tarefa (dict): Montada por EstagioCPU.processar() ('dados' ou
+            'caminho' com o corpo, content_type e as opções de saída)
+
+    Returns:
+        dict: caracteres, arquivo, conteudo, trechos, parsers_compativeis
+        (quando pedido) e as medições do worker (fases, bytes_saida,
+        codificacao, caminho_codificacao, tempo_codificacao)
+    """
+    import io
+
+    from cliente_http import CorpoBaixado
+    from parsers_html import comparar_parsers, criar_soup
+    from processamento_html import artefatos_corpo, conteudo_saida, gravar_saida
+    from selecao_html import selecionar
+    from serializacao_html import MODO_ARTEFATOS, MODO_RAW, reservar_nome_arquivo
+
+    if 'caminho' in tarefa:
+        arquivo = open(tarefa['caminho'], 'rb')
+    else:
+        arquivo = io.BytesIO(tarefa['dados'])
+    corpo = CorpoBaixado(arquivo, tarefa['tamanho'], content_type=tarefa['content_type'], url=tarefa['url_final'])
+    metricas = MetricasExtracao(tarefa['url'])
+    saida = {'caracteres': 0, 'arquivo': None, 'conteudo': None}
+    seletor, xpath = tarefa['seletor'], tarefa['xpath']
+    parser, modo_saida = tarefa['parser'], tarefa['modo_saida']
+
+    with corpo, coletando(metricas):
+        if tarefa['verificar_parsers']:
+            saida['parsers_compativeis'] = comparar_parsers(corpo.abrir())['compativeis']
+        if tarefa['retornar_conteudo']:
+            saida['conteudo'] = conteudo_saida(corpo, modo_saida, parser, seletor, xpath)
+            if saida['conteudo'] is not None:
+                saida['caracteres'] = len(saida['conteudo'])
+        elif tarefa['nome_arquivo']:
+            nome_arquivo = reservar_nome_arquivo(tarefa['nome_arquivo'])
+            saida['caracteres'] = gravar_saida(corpo, nome_arquivo, modo_saida, parser, seletor, xpath)
+            saida['arquivo'] = os.path.abspath(nome_arquivo)
+        elif seletor or xpath:
+            with medir_fase('parse'):
+                saida['trechos'] = len(selecionar(corpo.abrir(), seletor, xpath, parser, corpo.codificacao()))
+        elif modo_saida == MODO_ARTEFATOS:
+            artefatos_corpo(corpo)
+        elif modo_saida != MODO_RAW:
+            with medir_fase('parse'):
+                criar_soup(corpo.abrir(), parser, from_encoding=corpo.codificacao())
+
+    saida.update({
+        'fases': metricas.fases,
+        'bytes_saida': metricas.bytes_saida,
+        'codificacao': metricas.codificacao,
+        'caminho_codificacao': metricas.caminho_codificacao,
+        'tempo_codificacao': metricas.tempo_codificacao,
+    })
+    return saida
+
+class EstagioCPU:
+    """
+    Pool de processos para a parte de CPU das extrações
+
+    As threads de download chamam ``processar()`` com o corpo baixado e
+    ficam esperando o resultado. A fila entre os estágios é limitada a
+    ``fila`` tarefas: com os processos ocupados e a fila cheia, a thread que
+    acabou de baixar espera uma vaga antes de enviar a sua, então a memória
+    (corpos esperando parse) não cresce mais rápido do que a CPU dá conta.
+
+    Pode ser usado como context manager.
+    """
+
+    def __init__(self, processos=None, fila=None, diretorio_temporario=None):
+        """
+        Args:
+            processos (int): Processos de parse (None = um por núcleo)
+            fila (int): Tarefas enviadas e ainda não terminadas (None = 2x processos)
+            diretorio_temporario (str): Onde ficam os corpos grandes entregues
+                por arquivo (None = diretório temporário do sistema)
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.processos = max(1, processos or processos_padrao())
+        self.fila = max(1, fila or 2 * self.processos)
+        self.diretorio_temporario = diretorio_temporario
+        self._vagas = threading.BoundedSemaphore(self.fila)
+        self._executor = ProcessPoolExecutor(max_workers=self.processos, initializer=_aquecer)
+
+    def processar(self, corpo, url, nome_arquivo=None, parser=None, verificar_parsers=False,
+                  modo_saida=None, seletor=None, xpath=None, retornar_conteudo=False):
+        """
+        Envia o corpo a um worker e espera o resultado (ver processar_documento)
+
+        Raises:
+            Exception: O erro levantado no worker (ou BrokenProcessPool)
+        """
+        tarefa = {
+            'url': url,
+            'url_final': corpo.url,
+            'tamanho': corpo.tamanho,
+            'content_type': corpo.content_type,
+            'nome_arquivo': nome_arquivo,
+            'parser': parser,
+            'verificar_parsers': verificar_parsers,
+            'modo_saida': modo_saida,
+            'seletor': seletor,
+            'xpath': xpath,
+            'retornar_conteudo': retornar_conteudo,
+        }
+        self._vagas.acquire()
+        caminho = None
+        try:
+            if corpo.tamanho <= LIMITE_ENVIO_DIRETO:
+                tarefa['dados'] = corpo.ler()
+            else:
+                caminho = self._entregar_em_arquivo(corpo)
+                tarefa['caminho'] = caminho
+            return self._executor.submit(processar_documento, tarefa).result()
+        finally:
+            self._vagas.release()
+            if caminho is not None:
+                os.remove(caminho)
+
+    def _entregar_em_arquivo(self, corpo):
+        """Copia o corpo para um arquivo temporário com nome, que o worker abre"""
+        descritor, caminho = tempfile.mkstemp(suffix='.corpo', dir=self.diretorio_temporario)
+        with os.fdopen(descritor, 'wb') as destino:
+            shutil.copyfileobj(corpo.abrir(), destino, 1024 * 1024)
+        return caminho
+
+    def fechar(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def registrar_medicoes(metricas, saida):
+    """Soma na medição da extração o que o worker mediu"""
+    for fase, segundos in saida['fases'].items():
+        metricas.adicionar(fase, segundos)
+    metricas.bytes_saida += saida['bytes_saida']
+    if saida['codificacao']:
+        metricas.codificacao = saida['codificacao']
+        metricas.caminho_codificacao = saida['caminho_codificacao']
+        metricas.tempo_codificacao += saida['tempo_codificacao']
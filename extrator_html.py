@@ -4,14 +4,82 @@
 Ferramenta para extrair HTML de qualquer URL usando BeautifulSoup
 """
 
-import requests
-from bs4 import BeautifulSoup
 import sys
 from datetime import datetime
 import os
 import argparse
+import contextlib
+import time
+from collections import Counter
 
-def extrair_html(url, salvar_arquivo=True, mostrar_preview=True):
+# requests/urllib3 (cliente_http) e bs4 só são importados quando usados:
+# --help e --version não pagam por eles, e scripts chamam a CLI por URL
+from armazem import COMPRESSOES_ARMAZEM, ArmazemConteudo, mostrar_estatisticas_armazem
+from arquivamento import COMPRESSAO_GZIP, COMPRESSOES, FORMATO_WARC, FORMATOS_ARQUIVO, Arquivador
+from cache_http import CacheHTTP, DIRETORIO_PADRAO, MODO_ATUALIZAR, MODO_USAR
+from metricas import (MetricasExtracao, RegistroMetricasJSONL, adicionar_coletor, coletando, medir_fase,
+                      metricas_atuais, mostrar_perfil, publicar, registrar_saida, remover_coletor)
+from parse_incremental import ArvoreIncremental, parse_incremental_disponivel
+from processamento_html import artefatos_corpo, conteudo_saida, decodificar_corpo, gravar_saida
+from resultado_extracao import ResultadoExtracao
+from parsers_html import (PARSER_AUTOMATICO, PARSERS_SUPORTADOS, comparar_parsers, criar_soup,
+                          escolher_parser, mostrar_comparacao, parser_disponivel)
+from serializacao_html import (MODO_ARTEFATOS, MODO_MINIFICADO, MODO_PRETTY, MODO_RAW, MODOS_SAIDA,
+                               escrever_fragmentos, fragmentos_saida, gravar_bruto, gravar_html, previa,
+                               reservar_nome_arquivo)
+from selecao_html import fragmentos_selecao, gravar_selecao, selecionar, selecionar_links, trechos_como_texto
+
+def normalizar_esquema(url):
+    """Adiciona 'https://' quando a URL não informa o protocolo"""
+    if not url.startswith(('http://', 'https://')):
+        return 'https://' + url
+    return url
+
+def extensao_saida(modo_saida):
+    """Extensão do arquivo gravado em cada modo de saída"""
+    return '.json' if modo_saida == MODO_ARTEFATOS else '.html'
+
+def _baixar(url, cliente=None, **kwargs):
+    """
+    Faz a requisição HTTP em stream (levanta exceção em erro)
+
+    Args:
+        **kwargs: Repassados para ClienteHTTP.baixar (progresso, timeout...)
+
+    Returns:
+        tuple: (requests.Response, CorpoBaixado com o corpo em RAM ou disco)
+    """
+    from cliente_http import obter_cliente_padrao
+
+    cliente = cliente or obter_cliente_padrao()
+    return cliente.baixar(url, **kwargs)
+
+def _consumidor_incremental(xpath=None, coletar_links=False):
+    """
+    ArvoreIncremental quando a árvore do lxml vai ser usada (XPath ou links),
+    para o parse acontecer durante o download; None nos demais casos
+    """
+    if not (xpath or coletar_links) or not parse_incremental_disponivel():
+        return None
+    return ArvoreIncremental()
+
+def _arquivar(arquivador, url, response, corpo, conteudo=None):
+    """
+    Grava a extração no arquivo compactado ou no armazém por conteúdo
+
+    Returns:
+        str: Localização do registro ('caminho@posição', ou o caminho do
+        conteúdo no armazém)
+    """
+    local = arquivador.gravar(url, response, corpo, conteudo)
+    registrar_saida(local['tamanho'])
+    if local['posicao'] is None:
+        return local['arquivo']
+    return f"{local['arquivo']}@{local['posicao']}"
+
+def extrair_html(url, salvar_arquivo=True, mostrar_preview=True, cliente=None, parser=None,
+                 verificar_parsers=False, modo_saida=MODO_PRETTY, retornar_html=True,
+                 seletor=None, xpath=None, metricas=None, arquivador=None):
     """
     Extrai o HTML de uma URL usando BeautifulSoup
 
@@ -19,80 +87,834 @@ def extrair_html(url, salvar_arquivo=True, mostrar_preview=True):
         url (str): URL para extrair HTML
         salvar_arquivo (bool): Se True, salva em arquivo
         mostrar_preview (bool): Se True, mostra preview do HTML
+        cliente (ClienteHTTP): Cliente com pool de conexões (None = compartilhado)
+        parser (str): 'lxml', 'html.parser', 'html5lib' ou None/'auto' (lxml se instalado)
+        verificar_parsers (bool): Se True, compara as árvores geradas por cada parser
+        modo_saida (str): 'pretty' (prettify), 'minified' (espaços colapsados)
+            ou 'raw' (bytes da resposta, sem parse)
+        retornar_html (bool): Se False, não monta o documento em memória e
+            retorna o caminho do arquivo salvo ('' se não salvar)
+        seletor (str): Seletor CSS; se informado, só os trechos encontrados
+            são processados (um por linha)
+        xpath (str): Expressão XPath (lxml), alternativa ao seletor CSS
+        metricas (MetricasExtracao): Preenchida com o tempo de cada fase
+            (None = cria uma só para os coletores registrados)
+        arquivador (Arquivador | ArmazemConteudo): Se informado, a extração é
+            acrescentada ao arquivo compactado (ou guardada no armazém por
+            conteúdo) em vez de gerar um .html próprio
 
     Returns:
-        str: HTML extraído e formatado
+        str: HTML extraído no modo pedido (ou o caminho do arquivo, com
+        retornar_html=False); None em caso de erro
     """
+    if metricas is None:
+        metricas = MetricasExtracao(url)
+    resultado = None
+    tipo_erro = None
     try:
-        print(f"🔍 Acessando: {url}")
-        print("-" * 50)
-
-        # Headers para simular um navegador real
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-
-        # Fazer requisição
-        print("📡 Fazendo requisição HTTP...")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        print(f"✅ Status: {response.status_code}")
-        print(f"📊 Tamanho da resposta: {len(response.content):,} bytes")
-
-        # Parse com BeautifulSoup
-        print("🔍 Processando HTML com BeautifulSoup...")
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # HTML formatado
-        html_bonito = soup.prettify()
-
-        if salvar_arquivo:
-            # Criar nome do arquivo com timestamp
+        with coletando(metricas):
+            resultado = _processar_html(
+                url, salvar_arquivo, mostrar_preview, cliente, parser, verificar_parsers,
+                modo_saida, retornar_html, seletor, xpath, arquivador
+            )
+    except Exception as e:
+        tipo_erro = type(e).__name__
+        _mostrar_erro(e)
+    metricas.finalizar(resultado is not None, tipo_erro)
+    publicar(metricas)
+    return resultado
+
+def _mostrar_erro(e):
+    """Mostra no console a mensagem de erro de extrair_html()"""
+    import requests
+    from cliente_http import TamanhoExcedido
+
+    if isinstance(e, requests.exceptions.Timeout):
+        print(f"❌ Timeout: A requisição demorou muito tempo")
+    elif isinstance(e, requests.exceptions.ConnectionError):
+        print(f"❌ Erro de conexão: Verifique sua internet ou a URL")
+    elif isinstance(e, requests.exceptions.HTTPError):
+        print(f"❌ Erro HTTP {e.response.status_code}: {e.response.reason}")
+    elif isinstance(e, TamanhoExcedido):
+        print(f"❌ Página muito grande: download abortado ({e})")
+    elif isinstance(e, requests.exceptions.RequestException):
+        print(f"❌ Erro ao acessar URL: {e}")
+    else:
+        print(f"❌ Erro inesperado: {e}")
+        import traceback
+        traceback.print_exc()
+
+def _processar_html(url, salvar_arquivo, mostrar_preview, cliente, parser, verificar_parsers,
+                    modo_saida, retornar_html, seletor, xpath, arquivador=None):
+    """Corpo de extrair_html(): levanta exceção em vez de mostrar o erro"""
+    print(f"🔍 Acessando: {url}")
+    print("-" * 50)
+
+    # Fazer requisição
+    print("📡 Fazendo requisição HTTP...")
+    response, corpo = _baixar(url, cliente, consumidor=_consumidor_incremental(xpath))
+
+    print(f"✅ Status: {response.status_code}")
+    metricas = metricas_atuais()
+    if metricas is not None and metricas.tentativas > 1:
+        print(f"🔁 Conseguido na tentativa {metricas.tentativas}")
+    print(f"📊 Tamanho da resposta: {corpo.tamanho:,} bytes")
+    if corpo.em_disco:
+        print("💽 Corpo grande: gravado em arquivo temporário")
+    if corpo.retomadas:
+        print(f"🔁 Download retomado {corpo.retomadas}x com Range")
+    if getattr(response, 'origem_cache', None):
+        print(f"💾 Cache: {response.origem_cache}")
+
+    with corpo:
+        if verificar_parsers:
+            mostrar_comparacao(comparar_parsers(corpo.abrir()))
+
+        soup = None
+        trechos = None
+        artefatos = None
+        if seletor or xpath:
+            print(f"🎯 Selecionando trechos: {xpath or seletor}")
+            with medir_fase('parse'):
+                trechos = selecionar(corpo.abrir(), seletor, xpath, parser, corpo.codificacao(), corpo.arvore)
+            print(f"✅ {len(trechos):,} trecho(s) encontrado(s)")
+        elif modo_saida == MODO_ARTEFATOS:
+            print("🧾 Coletando texto, links, metadados e tabelas (uma passada)...")
+            artefatos = artefatos_corpo(corpo)
+            print(f"✅ {len(artefatos.texto):,} caracteres de texto | {len(artefatos.links):,} links | "
+                  f"{len(artefatos.tabelas):,} tabela(s) | {len(artefatos.metadados['json_ld']):,} objeto(s) JSON-LD")
+        elif modo_saida != MODO_RAW:
+            # Parse com BeautifulSoup
+            print(f"🔍 Processando HTML com BeautifulSoup ({escolher_parser(parser)})...")
+            with medir_fase('parse'):
+                soup = criar_soup(corpo.abrir(), parser, from_encoding=corpo.codificacao())
+        if corpo.caminho_codificacao:
+            print(f"🔤 Codificação: {corpo.codificacao()} (via {corpo.caminho_codificacao})")
+
+        nome_arquivo = ''
+        if salvar_arquivo and arquivador is not None:
+            conteudo = None
+            if arquivador.usa_conteudo:
+                with medir_fase('serializacao'):
+                    if trechos is not None:
+                        conteudo = ''.join(fragmentos_selecao(trechos, modo_saida))
+                    elif artefatos is not None:
+                        conteudo = artefatos.como_json()
+                    elif soup is not None:
+                        conteudo = ''.join(fragmentos_saida(soup, modo_saida))
+            nome_arquivo = _arquivar(arquivador, url, response, corpo, conteudo)
+            if isinstance(arquivador, ArmazemConteudo):
+                print(f"\n🗃️ Conteúdo guardado no armazém: {nome_arquivo}")
+            else:
+                print(f"\n📦 Registro arquivado em: {nome_arquivo}")
+        elif salvar_arquivo:
+            # Criar nome do arquivo com timestamp (_2, _3... se já existir)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            nome_arquivo = f"html_extraido_{timestamp}.html"
+            nome_arquivo = reservar_nome_arquivo(f"html_extraido_{timestamp}{extensao_saida(modo_saida)}")
 
-            # Salvar arquivo
-            with open(nome_arquivo, 'w', encoding='utf-8') as f:
-                f.write(html_bonito)
+            # Salvar arquivo (gravado aos poucos, sem montar a string inteira)
+            unidade = 'caracteres'
+            if trechos is not None:
+                tamanho = gravar_selecao(trechos, nome_arquivo, modo_saida)
+            elif artefatos is not None:
+                with open(nome_arquivo, 'w', encoding='utf-8') as f:
+                    tamanho = escrever_fragmentos([artefatos.como_json()], f)
+            elif soup is None:
+                tamanho = gravar_bruto(corpo.abrir(), nome_arquivo)
+                unidade = 'bytes'
+            else:
+                tamanho = gravar_html(soup, nome_arquivo, modo_saida)
+            registrar_saida(os.path.getsize(nome_arquivo))
 
-            print(f"\n📄 HTML salvo em: {nome_arquivo}")
-            print(f"📊 Tamanho: {len(html_bonito):,} caracteres")
+            rotulo = "Artefatos salvos" if artefatos is not None else "HTML salvo"
+            print(f"\n📄 {rotulo} em: {nome_arquivo} ({modo_saida})")
+            print(f"📊 Tamanho: {tamanho:,} {unidade}")
             print(f"📍 Local: {os.path.abspath(nome_arquivo)}")
 
         if mostrar_preview:
+            if trechos is not None:
+                trecho = ''.join(fragmentos_selecao(trechos[:20], modo_saida))
+            elif artefatos is not None:
+                trecho = artefatos.texto
+            elif soup is None:
+                trecho = corpo.abrir().read(801).decode(corpo.codificacao(), errors='replace')
+            else:
+                trecho = previa(soup, modo_saida)
             print("\n" + "=" * 60)
             print("PREVIEW (primeiros 800 caracteres):")
             print("=" * 60)
-            print(html_bonito[:800])
-            if len(html_bonito) > 800:
+            print(trecho[:800])
+            if len(trecho) > 800:
                 print("\n... (conteúdo cortado para preview)")
             print("=" * 60)
 
-        return html_bonito
+        if not retornar_html:
+            return nome_arquivo
+        if artefatos is not None:
+            return artefatos.como_json()
+        if soup is None and trechos is None:
+            return decodificar_corpo(corpo)
+        with medir_fase('serializacao'):
+            if trechos is not None:
+                return ''.join(fragmentos_selecao(trechos, modo_saida))
+            return ''.join(fragmentos_saida(soup, modo_saida))
+
+def extrair_resultado(url, cliente=None, parser=None, modo_saida=MODO_PRETTY, seletor=None, xpath=None,
+                      nome_arquivo=None, arquivador=None, retornar_conteudo=True, **kwargs):
+    """
+    Extrai uma URL sem nenhum print e devolve o resultado estruturado
+
+    Args:
+        url (str): URL para extrair
+        cliente (ClienteHTTP): Cliente com pool de conexões (None = compartilhado)
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        modo_saida (str): 'pretty', 'minified' ou 'raw'
+        seletor (str): Seletor CSS para ficar só com os trechos encontrados
+        xpath (str): Expressão XPath, alternativa ao seletor CSS
+        nome_arquivo (str): Gravar a saída nesse arquivo (_2, _3... se já existir)
+        arquivador (Arquivador | ArmazemConteudo): Gravar no arquivo
+            compactado ou no armazém em vez de nome_arquivo
+        retornar_conteudo (bool): Se False, não monta o HTML em memória
+            (``conteudo`` fica None; útil quando só o arquivo interessa)
+        **kwargs: Repassados para ClienteHTTP.baixar (progresso, timeout...)
+
+    Returns:
+        ResultadoExtracao: Preenchido mesmo em caso de erro (sucesso=False)
+    """
+    resultado = ResultadoExtracao(url)
+    metricas = MetricasExtracao(url)
+    try:
+        with coletando(metricas):
+            response, corpo = _baixar(url, cliente, consumidor=_consumidor_incremental(xpath), **kwargs)
+            resultado.url_final = response.url
+            resultado.status = response.status_code
+            resultado.headers = dict(response.headers)
+            resultado.origem_cache = getattr(response, 'origem_cache', None)
+            resultado.bytes_recebidos = corpo.tamanho
+
+            with corpo:
+                conteudo = None
+                if modo_saida == MODO_ARTEFATOS and not (seletor or xpath):
+                    # Os artefatos vão estruturados no resultado e em JSON para arquivo/arquivador
+                    resultado.artefatos = artefatos_corpo(corpo)
+                    with medir_fase('serializacao'):
+                        conteudo = resultado.artefatos.como_json()
+                elif retornar_conteudo or (arquivador is not None and arquivador.usa_conteudo):
+                    conteudo = conteudo_saida(corpo, modo_saida, parser, seletor, xpath)
+                if arquivador is not None:
+                    resultado.arquivo = _arquivar(arquivador, url, response, corpo,
+                                                  conteudo if arquivador.usa_conteudo else None)
+                elif nome_arquivo:
+                    nome_arquivo = reservar_nome_arquivo(nome_arquivo)
+                    if conteudo is None:
+                        resultado.caracteres = gravar_saida(corpo, nome_arquivo, modo_saida, parser, seletor, xpath)
+                    else:
+                        # Já está em memória: grava a string em vez de processar de novo
+                        with open(nome_arquivo, 'w', encoding='utf-8') as f:
+                            resultado.caracteres = escrever_fragmentos([conteudo], f)
+                        registrar_saida(os.path.getsize(nome_arquivo))
+                    resultado.arquivo = os.path.abspath(nome_arquivo)
+                if retornar_conteudo:
+                    resultado.conteudo = conteudo if conteudo is not None else decodificar_corpo(corpo)
+                    resultado.caracteres = len(resultado.conteudo)
+                resultado.codificacao = corpo.codificacao()
+
+        resultado.sucesso = True
 
-    except requests.exceptions.Timeout:
-        print(f"❌ Timeout: A requisição demorou muito tempo")
-        return None
-    except requests.exceptions.ConnectionError:
-        print(f"❌ Erro de conexão: Verifique sua internet ou a URL")
-        return None
-    except requests.exceptions.HTTPError as e:
-        print(f"❌ Erro HTTP {e.response.status_code}: {e.response.reason}")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Erro ao acessar URL: {e}")
-        return None
     except Exception as e:
-        print(f"❌ Erro inesperado: {e}")
-        import traceback
-        traceback.print_exc()
+        resultado.tipo_erro = type(e).__name__
+        resultado.erro = str(e)[:200]
+        response = getattr(e, 'response', None)
+        if response is not None:
+            resultado.status = response.status_code
+            resultado.headers = dict(response.headers)
+
+    metricas.finalizar(resultado.sucesso, resultado.tipo_erro)
+    resultado.metricas = metricas
+    publicar(metricas)
+    return resultado
+
+def extrair_trechos(url, seletor=None, xpath=None, parser=None, modo_saida=MODO_MINIFICADO, cliente=None):
+    """
+    Retorna só os trechos da página que casam com o seletor CSS ou XPath
+
+    Args:
+        url (str): URL para extrair
+        seletor (str): Seletor CSS (ex.: 'div#conteudo', 'article p')
+        xpath (str): Expressão XPath, alternativa ao seletor CSS
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        modo_saida (str): Formatação de cada trecho ('minified', 'pretty' ou 'raw')
+        cliente (ClienteHTTP): Cliente com pool de conexões (None = compartilhado)
+
+    Returns:
+        list: Texto de cada trecho encontrado, em ordem no documento
+
+    Raises:
+        ValueError: Se nem seletor nem xpath forem informados
+        requests.exceptions.RequestException: Em erros de rede ou HTTP
+    """
+    if not (seletor or xpath):
+        raise ValueError("Informe um seletor CSS ou uma expressão XPath")
+    _, corpo = _baixar(url, cliente, consumidor=_consumidor_incremental(xpath))
+    with corpo:
+        return trechos_como_texto(selecionar(corpo.abrir(), seletor, xpath, parser, corpo.codificacao(), corpo.arvore), modo_saida)
+
+def _extrair_silencioso(url, nome_arquivo=None, cliente=None, parser=None, verificar_parsers=False,
+                        modo_saida=MODO_PRETTY, seletor=None, xpath=None, coletar_links=False,
+                        arquivador=None, estagio_cpu=None, vagas_download=None):
+    """
+    Extrai uma URL sem prints nem preview, para uso no modo lote
+
+    Args:
+        url (str): URL para extrair HTML
+        nome_arquivo (str): Caminho para salvar o HTML (None = não salvar)
+        cliente (ClienteHTTP): Cliente com pool de conexões (None = compartilhado)
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        verificar_parsers (bool): Se True, preenche 'parsers_compativeis'
+        modo_saida (str): 'pretty', 'minified' ou 'raw'
+        seletor (str): Seletor CSS para gravar só os trechos encontrados
+        xpath (str): Expressão XPath, alternativa ao seletor CSS
+        coletar_links (bool): Se True, preenche 'links' com os links de
+            páginas HTML (usado pelo rastreador)
+        arquivador (Arquivador | ArmazemConteudo): Grava no arquivo
+            compactado ou no armazém em vez de nome_arquivo ('arquivo'
+            recebe 'caminho@posição' ou o caminho do conteúdo)
+        estagio_cpu (EstagioCPU): Se informado, parse e serialização rodam
+            num processo do pool (a thread só baixa e espera o resultado)
+        vagas_download (threading.Semaphore): Limita os downloads simultâneos
+            quando há mais threads que requisições permitidas
+
+    Returns:
+        dict: Resultado da extração (url, sucesso, status, bytes, erro, ...)
+        com a MetricasExtracao em 'metricas'
+    """
+    inicio = time.perf_counter()
+    metricas = MetricasExtracao(url)
+    resultado = {
+        'url': url,
+        'sucesso': False,
+        'status': None,
+        'bytes': 0,
+        'caracteres': 0,
+        'arquivo': None,
+        'erro': None,
+        'tipo_erro': None,
+        'duracao': 0.0,
+    }
+
+    try:
+        with coletando(metricas):
+            # A árvore do lxml não atravessa processos: com o estágio de CPU, o parse é feito lá
+            consumidor = None if estagio_cpu is not None else _consumidor_incremental(xpath, coletar_links)
+            with vagas_download or contextlib.nullcontext():
+                response, corpo = _baixar(url, cliente, consumidor=consumidor)
+            resultado['status'] = response.status_code
+            resultado['bytes'] = corpo.tamanho
+
+            with corpo:
+                if estagio_cpu is not None and not coletar_links:
+                    _processar_em_processo(estagio_cpu, resultado, metricas, url, response, corpo, nome_arquivo,
+                                           parser, verificar_parsers, modo_saida, seletor, xpath, arquivador)
+                else:
+                    if verificar_parsers:
+                        resultado['parsers_compativeis'] = comparar_parsers(corpo.abrir())['compativeis']
+                    if arquivador is not None:
+                        conteudo = None
+                        if arquivador.usa_conteudo:
+                            conteudo = conteudo_saida(corpo, modo_saida, parser, seletor, xpath)
+                            resultado['caracteres'] = len(conteudo) if conteudo is not None else corpo.tamanho
+                        resultado['arquivo'] = _arquivar(arquivador, url, response, corpo, conteudo)
+                    elif nome_arquivo:
+                        nome_arquivo = reservar_nome_arquivo(nome_arquivo)
+                        resultado['caracteres'] = gravar_saida(corpo, nome_arquivo, modo_saida, parser, seletor, xpath)
+                        resultado['arquivo'] = os.path.abspath(nome_arquivo)
+                    elif seletor or xpath:
+                        with medir_fase('parse'):
+                            resultado['trechos'] = len(selecionar(corpo.abrir(), seletor, xpath, parser,
+                                                                  corpo.codificacao(), corpo.arvore))
+                    elif modo_saida == MODO_ARTEFATOS:
+                        artefatos_corpo(corpo)
+                    elif modo_saida != MODO_RAW and not coletar_links:
+                        with medir_fase('parse'):
+                            criar_soup(corpo.abrir(), parser, from_encoding=corpo.codificacao())
+                if coletar_links:
+                    resultado['url_final'] = response.url
+                    resultado['links'] = []
+                    if 'html' in response.headers.get('Content-Type', 'text/html').lower():
+                        with medir_fase('parse'):
+                            resultado['links'] = selecionar_links(corpo.abrir(), response.url, parser, corpo.codificacao(),
+                                                                  corpo.arvore)
+
+        resultado['sucesso'] = True
+
+    except Exception as e:
+        resultado['tipo_erro'] = type(e).__name__
+        resultado['erro'] = str(e)[:200]
+        response = getattr(e, 'response', None)
+        if response is not None:
+            resultado['status'] = response.status_code
+
+    resultado['duracao'] = time.perf_counter() - inicio
+    metricas.finalizar(resultado['sucesso'], resultado['tipo_erro'])
+    resultado['metricas'] = metricas
+    publicar(metricas)
+    return resultado
+
+def _processar_em_processo(estagio_cpu, resultado, metricas, url, response, corpo, nome_arquivo, parser,
+                           verificar_parsers, modo_saida, seletor, xpath, arquivador):
+    """
+    Parte de CPU de _extrair_silencioso() feita num processo do EstagioCPU
+
+    Só vai para o pool o que precisa de parse: o modo raw e o WARC (que
+    guarda a resposta original) são gravados aqui mesmo, sem copiar o corpo
+    para outro processo. A gravação no arquivador também fica aqui, porque
+    o arquivo compactado é compartilhado pelas threads deste processo.
+    """
+    from estagio_cpu import registrar_medicoes
+
+    usa_conteudo = arquivador is not None and arquivador.usa_conteudo
+    if arquivador is not None:
+        nome_arquivo = None
+        if not usa_conteudo:
+            modo_saida, seletor, xpath = MODO_RAW, None, None
+
+    saida = None
+    if verificar_parsers or seletor or xpath or modo_saida != MODO_RAW:
+        saida = estagio_cpu.processar(
+            corpo, url, nome_arquivo=nome_arquivo, parser=parser, verificar_parsers=verificar_parsers,
+            modo_saida=modo_saida, seletor=seletor, xpath=xpath, retornar_conteudo=usa_conteudo
+        )
+        registrar_medicoes(metricas, saida)
+        resultado['caracteres'] = saida['caracteres']
+        resultado['arquivo'] = saida['arquivo']
+        for chave in ('trechos', 'parsers_compativeis'):
+            if chave in saida:
+                resultado[chave] = saida[chave]
+
+    if arquivador is not None:
+        conteudo = saida['conteudo'] if saida is not None else None
+        if usa_conteudo:
+            resultado['caracteres'] = len(conteudo) if conteudo is not None else corpo.tamanho
+        resultado['arquivo'] = _arquivar(arquivador, url, response, corpo, conteudo)
+    elif nome_arquivo and saida is None:
+        nome_arquivo = reservar_nome_arquivo(nome_arquivo)
+        resultado['caracteres'] = gravar_saida(corpo, nome_arquivo, modo_saida)
+        resultado['arquivo'] = os.path.abspath(nome_arquivo)
+
+def ler_urls_arquivo(caminho):
+    """
+    Lê uma lista de URLs de um arquivo texto (uma por linha)
+
+    Linhas vazias e linhas iniciadas com '#' são ignoradas.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        list: URLs encontradas
+    """
+    urls = []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if linha and not linha.startswith('#'):
+                urls.append(linha)
+    return urls
+
+def extrair_lote(urls, concorrencia=8, salvar_arquivo=True, ao_concluir=None, cliente=None,
+                 parser=None, verificar_parsers=False, modo_saida=MODO_PRETTY, seletor=None, xpath=None,
+                 arquivador=None, processos=0):
+    """
+    Extrai várias URLs em paralelo usando um pool limitado de threads
+
+    As URLs são consumidas aos poucos: no máximo o dobro da concorrência fica
+    submetido ao pool, então ``urls`` pode ser um gerador (um sitemap sendo
+    lido, por exemplo) sem ser materializado antes.
+
+    Com ``processos``, o lote vira dois estágios: as threads só baixam e o
+    parse/serialização vai para um pool de processos (EstagioCPU), com fila
+    limitada entre os dois. Threads esperando o estágio de CPU não contam na
+    concorrência: enquanto os processos trabalham, até ``concorrencia``
+    downloads continuam.
+
+    Args:
+        urls (iterable): URLs para extrair
+        concorrencia (int): Número máximo de requisições simultâneas
+        salvar_arquivo (bool): Se True, salva cada HTML em arquivo próprio
+        ao_concluir (callable): Função chamada com cada resultado ao terminar
+        cliente (ClienteHTTP): Cliente compartilhado pelos workers (None = cria
+            um com uma conexão por worker para cada host)
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        verificar_parsers (bool): Se True, marca documentos em que os parsers divergem
+        modo_saida (str): 'pretty', 'minified' ou 'raw' (sem parse)
+        seletor (str): Seletor CSS para gravar só os trechos encontrados
+        xpath (str): Expressão XPath, alternativa ao seletor CSS
+        arquivador (Arquivador | ArmazemConteudo): Grava tudo em arquivos
+            compactados (ou no armazém por conteúdo) em vez de um .html por URL
+        processos (int): Processos para parse e serialização (0 = nas
+            próprias threads; None = um por núcleo)
+
+    Returns:
+        tuple: (lista de resultados na ordem das URLs, dicionário de resumo)
+    """
+    import threading
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+    from cliente_http import ClienteHTTP
+
+    cliente_proprio = cliente is None
+    if cliente_proprio:
+        cliente = ClienteHTTP(conexoes_por_host=max(1, concorrencia))
+
+    concorrencia = max(1, concorrencia)
+    estagio_cpu = None
+    vagas_download = None
+    threads = concorrencia
+    if processos != 0:
+        from estagio_cpu import EstagioCPU
+
+        estagio_cpu = EstagioCPU(processos)
+        # Threads extras para quem espera na fila do estágio de CPU; os
+        # downloads continuam limitados à concorrência
+        vagas_download = threading.BoundedSemaphore(concorrencia)
+        threads = concorrencia + estagio_cpu.fila
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    resultados = []
+    futuros = {}
+
+    def coletar(prontos):
+        for futuro in prontos:
+            resultado = futuro.result()
+            resultados[futuros.pop(futuro)] = resultado
+            if ao_concluir:
+                ao_concluir(resultado)
+
+    inicio = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for indice, url in enumerate(urls):
+                if len(futuros) >= 2 * threads:
+                    coletar(wait(futuros, return_when=FIRST_COMPLETED).done)
+                # Índice no nome evita sobrescrever arquivos do mesmo segundo
+                nome_arquivo = None
+                if salvar_arquivo:
+                    nome_arquivo = f"html_extraido_{timestamp}_{indice:05d}{extensao_saida(modo_saida)}"
+                resultados.append(None)
+                futuro = executor.submit(
+                    _extrair_silencioso, normalizar_esquema(url), nome_arquivo, cliente,
+                    parser=parser, verificar_parsers=verificar_parsers, modo_saida=modo_saida,
+                    seletor=seletor, xpath=xpath, arquivador=arquivador if salvar_arquivo else None,
+                    estagio_cpu=estagio_cpu, vagas_download=vagas_download
+                )
+                futuros[futuro] = indice
+
+            coletar(as_completed(list(futuros)))
+        duracao = time.perf_counter() - inicio
+
+        resumo = resumir_lote(resultados, duracao)
+        resumo['pool'] = cliente.estatisticas()
+        if cliente.cache is not None:
+            resumo['cache'] = cliente.cache.estatisticas()
+    finally:
+        if estagio_cpu is not None:
+            estagio_cpu.fechar()
+        if cliente_proprio:
+            cliente.fechar()
+
+    return resultados, resumo
+
+def resumir_lote(resultados, duracao):
+    """
+    Calcula o resumo de vazão de um lote
+
+    Args:
+        resultados (list): Resultados retornados por _extrair_silencioso
+        duracao (float): Tempo total do lote em segundos
+
+    Returns:
+        dict: total, sucessos, falhas, urls_por_segundo, bytes_por_segundo e
+        falhas_por_tipo (contagem por classe de erro)
+    """
+    total_bytes = sum(r['bytes'] for r in resultados)
+    falhas = [r for r in resultados if not r['sucesso']]
+    return {
+        'total': len(resultados),
+        'sucessos': len(resultados) - len(falhas),
+        'falhas': len(falhas),
+        'bytes': total_bytes,
+        'duracao': duracao,
+        'urls_por_segundo': len(resultados) / duracao if duracao > 0 else 0.0,
+        'bytes_por_segundo': total_bytes / duracao if duracao > 0 else 0.0,
+        'falhas_por_tipo': dict(Counter(r['tipo_erro'] for r in falhas)),
+    }
+
+def mostrar_resumo_lote(resumo):
+    """Mostra o resumo do lote no console"""
+    print("\n" + "=" * 60)
+    print("📊 RESUMO DO LOTE")
+    print("=" * 60)
+    print(f"🔗 URLs processadas: {resumo['total']:,}")
+    print(f"✅ Sucessos: {resumo['sucessos']:,}")
+    print(f"❌ Falhas: {resumo['falhas']:,}")
+    print(f"⏱️ Tempo total: {resumo['duracao']:.2f} s")
+    print(f"🚀 Vazão: {resumo['urls_por_segundo']:.2f} URLs/s | {resumo['bytes_por_segundo'] / 1024:,.1f} KB/s")
+    if resumo.get('pool'):
+        pool = resumo['pool']
+        print(f"🔌 Conexões: {pool['conexoes_abertas']:,} abertas | {pool['conexoes_reutilizadas']:,} reutilizadas")
+    if resumo.get('cache'):
+        mostrar_estatisticas_cache(resumo['cache'])
+    if resumo['falhas_por_tipo']:
+        print("\n⚠️ Falhas por tipo de erro:")
+        for tipo, quantidade in sorted(resumo['falhas_por_tipo'].items(), key=lambda item: -item[1]):
+            print(f"  • {tipo}: {quantidade:,}")
+
+def mostrar_estatisticas_cache(estatisticas):
+    """Mostra os contadores do cache HTTP no console"""
+    print(
+        f"💾 Cache: {estatisticas['acertos']:,} acertos | {estatisticas['revalidados']:,} revalidados | "
+        f"{estatisticas['falhas']:,} falhas ({estatisticas['entradas']:,} entradas, "
+        f"{estatisticas['bytes'] / (1024 * 1024):,.1f} MB)"
+    )
+
+def criar_cliente_cli(args):
+    """
+    Cria o ClienteHTTP a partir das opções da linha de comando
+
+    Returns:
+        ClienteHTTP: Cliente com pool dimensionado, cache (se pedido),
+        retentativas e limite de requisições por host
+    """
+    from cliente_http import ClienteHTTP
+    from retentativas import LimitadorPorHost, PoliticaRetentativas
+
+    cache = None
+    if args.cache or args.cache_dir or args.refresh:
+        cache = CacheHTTP(
+            diretorio=args.cache_dir or DIRETORIO_PADRAO,
+            tamanho_maximo=int(args.cache_size * 1024 * 1024)
+        )
+    return ClienteHTTP(
+        conexoes_por_host=max(10, args.concurrency),
+        cache=cache,
+        modo_cache=MODO_ATUALIZAR if args.refresh else MODO_USAR,
+        tamanho_maximo=int(args.max_size * 1024 * 1024) or None,
+        limite_memoria=int(args.spool_size * 1024 * 1024),
+        retentativas=PoliticaRetentativas(
+            tentativas=args.retries + 1,
+            espera_base=args.retry_backoff,
+            espera_maxima=args.retry_max_wait
+        ),
+        limitador=LimitadorPorHost(args.rate, args.burst) if args.rate > 0 else None
+    )
+
+def opcoes_processamento_cli(args):
+    """Opções de parse/saída vindas da CLI, comuns ao modo simples e ao lote"""
+    if args.parser not in (None, PARSER_AUTOMATICO) and not parser_disponivel(args.parser):
+        print(f"⚠️ Parser '{args.parser}' não instalado, usando '{escolher_parser(None)}'")
+    return {
+        'parser': args.parser,
+        'verificar_parsers': args.check_parsers,
+        'modo_saida': args.output_mode,
+        'seletor': args.select,
+        'xpath': args.xpath,
+    }
+
+def criar_leitor_sitemap_cli(args, cliente):
+    """LeitorSitemap com o corte --since, usando o mesmo cliente das extrações"""
+    from sitemap import LeitorSitemap
+
+    return LeitorSitemap(cliente=cliente, desde=args.since)
+
+def criar_arquivador_cli(args):
+    """
+    Cria o destino das extrações a partir das opções da linha de comando
+
+    Returns:
+        Arquivador | ArmazemConteudo: Pedido com --archive ou --store, ou None
+    """
+    if args.store:
+        return ArmazemConteudo(args.store, compressao=args.store_compression)
+    if not args.archive:
         return None
+    return Arquivador(
+        diretorio=args.archive,
+        formato=args.archive_format,
+        compressao=args.archive_compression,
+        tamanho_maximo=int(args.archive_size * 1024 * 1024)
+    )
+
+def executar_lote(urls, args, cliente=None, arquivador=None):
+    """
+    Executa o modo lote pela CLI, sem pausas interativas
+
+    Args:
+        urls (iterable): Lista de URLs ou gerador (URLs dos sitemaps)
+
+    Returns:
+        int: Código de saída (0 = todas extraídas, 1 = houve falhas)
+    """
+    concorrencia = args.concurrency
+    quantidade = f"{len(urls):,} URLs" if hasattr(urls, '__len__') else "URLs dos sitemaps"
+    processos = ""
+    if args.workers != 0:
+        from estagio_cpu import processos_padrao
+
+        processos = f" | {args.workers or processos_padrao()} processo(s) de parse"
+    print(f"📦 Modo lote: {quantidade} | concorrência {concorrencia}{processos}")
+    print("-" * 50)
+
+    def ao_concluir(resultado):
+        tentativas = resultado['metricas'].tentativas
+        repeticoes = f", {tentativas} tentativas" if tentativas > 1 else ""
+        if resultado['sucesso']:
+            print(f"✅ {resultado['url']} ({resultado['bytes']:,} bytes, {resultado['duracao']:.2f} s{repeticoes})")
+            if resultado.get('parsers_compativeis') is False:
+                print(f"⚠️ {resultado['url']}: parsers geraram árvores diferentes")
+        else:
+            print(f"❌ {resultado['url']} [{resultado['tipo_erro']}] {resultado['erro']}{repeticoes}")
+
+    resultados, resumo = extrair_lote(
+        urls,
+        concorrencia=concorrencia,
+        salvar_arquivo=not args.no_save,
+        ao_concluir=ao_concluir,
+        cliente=cliente,
+        arquivador=arquivador,
+        processos=args.workers,
+        **opcoes_processamento_cli(args)
+    )
+    mostrar_resumo_lote(resumo)
+    if args.profile:
+        mostrar_perfil([resultado['metricas'] for resultado in resultados])
+
+    return 1 if resumo['falhas'] else 0
+
+def _ler_urls_entrada(entrada):
+    """URLs de um fluxo de texto (uma por linha), lidas conforme chegam"""
+    for linha in entrada:
+        linha = linha.strip()
+        if linha and not linha.startswith('#'):
+            yield normalizar_esquema(linha)
+
+def executar_pipeline(args, entrada=None, saida=None):
+    """
+    Lê URLs da entrada padrão (ou dos sitemaps de --sitemap) e escreve um registro NDJSON por URL na saída
+    padrão, na ordem em que as extrações terminam
+
+    Nada além do NDJSON vai para a saída (avisos vão para stderr) e nada é
+    perguntado: feito para pipes, xargs e parallel. Com --no-save, o HTML vai
+    no próprio registro ('html'); senão, cada página vira um arquivo e o
+    registro traz o caminho em 'arquivo'.
+
+    Returns:
+        int: Código de saída (0 = todas extraídas, 1 = houve falhas)
+    """
+    import json
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    entrada = entrada or sys.stdin
+    saida = saida or sys.stdout
+    concorrencia = max(1, args.concurrency)
+    trava_saida = threading.Lock()
+    # Limita quantas URLs ficam em andamento: stdin pode ser infinito
+    vagas = threading.BoundedSemaphore(concorrencia * 2)
+    falhas = []
+
+    def escrever(futuro):
+        try:
+            resultado = futuro.result()
+            linha = json.dumps(resultado.como_dict(incluir_conteudo=args.no_save), ensure_ascii=False)
+            with trava_saida:
+                saida.write(linha + '\n')
+                saida.flush()
+            if not resultado.sucesso:
+                falhas.append(resultado.url)
+        finally:
+            vagas.release()
+
+    # Qualquer print perdido (avisos de opções, por exemplo) vai para stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        opcoes = opcoes_processamento_cli(args)
+        opcoes.pop('verificar_parsers')
+        cliente = criar_cliente_cli(args)
+        arquivador = _abrir_arquivador_cli(args) if not args.no_save else None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+                if args.sitemap:
+                    fonte = criar_leitor_sitemap_cli(args, cliente).urls(args.sitemap)
+                else:
+                    fonte = _ler_urls_entrada(entrada)
+                for indice, url in enumerate(fonte):
+                    vagas.acquire()
+                    nome_arquivo = None
+                    if not args.no_save and arquivador is None:
+                        nome_arquivo = f"html_extraido_{timestamp}_{indice:05d}{extensao_saida(opcoes['modo_saida'])}"
+                    futuro = executor.submit(
+                        extrair_resultado, url, cliente, nome_arquivo=nome_arquivo,
+                        arquivador=arquivador, retornar_conteudo=args.no_save, **opcoes
+                    )
+                    futuro.add_done_callback(escrever)
+        except KeyboardInterrupt:
+            return 130
+        finally:
+            cliente.fechar()
+            if arquivador is not None:
+                arquivador.fechar()
+
+    return 1 if falhas else 0
+
+def executar_rastreamento(urls, args, cliente=None, arquivador=None):
+    """
+    Executa o rastreamento (--crawl) pela CLI, sem pausas interativas
+
+    Returns:
+        int: Código de saída (0 = todas extraídas, 1 = houve falhas)
+    """
+    from rastreador import ConjuntoUrls, EscopoRastreamento, FiltroBloom, mostrar_resumo_rastreamento, rastrear
+
+    escopo = EscopoRastreamento(
+        mesmo_host=not args.any_host,
+        prefixos=args.prefix,
+        profundidade_maxima=args.max_depth,
+        max_paginas=args.max_pages or None
+    )
+    visto = FiltroBloom(args.bloom) if args.bloom else ConjuntoUrls()
+    print(
+        f"🕸️ Rastreamento: {len(urls):,} URL(s) inicial(is) | profundidade {args.max_depth} | "
+        f"concorrência {args.concurrency} ({args.per_host} por host)"
+    )
+    print("-" * 50)
+
+    def ao_concluir(resultado):
+        nivel = resultado['profundidade']
+        if resultado['sucesso']:
+            print(f"✅ [{nivel}] {resultado['url']} ({resultado['bytes']:,} bytes, {resultado['duracao']:.2f} s)")
+        else:
+            print(f"❌ [{nivel}] {resultado['url']} [{resultado['tipo_erro']}] {resultado['erro']}")
+
+    opcoes = opcoes_processamento_cli(args)
+    resultados, resumo = rastrear(
+        urls,
+        escopo=escopo,
+        concorrencia=args.concurrency,
+        por_host=args.per_host,
+        cliente=cliente,
+        visto=visto,
+        salvar_arquivo=not args.no_save,
+        ao_concluir=ao_concluir,
+        parser=opcoes['parser'],
+        modo_saida=opcoes['modo_saida'],
+        arquivador=arquivador
+    )
+    mostrar_resumo_lote(resumo)
+    mostrar_resumo_rastreamento(resumo)
+    if args.profile:
+        mostrar_perfil([resultado['metricas'] for resultado in resultados])
+
+    return 1 if resumo['falhas'] else 0
 
 def main():
     """Função principal para execução CLI"""
@@ -104,15 +926,333 @@ Exemplos:
   python extrator_html.py https://exemplo.com
   python extrator_html.py --no-save https://exemplo.com
   python extrator_html.py --no-preview https://exemplo.com
+  python extrator_html.py https://a.com https://b.com --concurrency 4
+  python extrator_html.py --url-file urls.txt --concurrency 16
+  python extrator_html.py --url-file urls.txt --concurrency 64 --workers auto
+  python extrator_html.py --url-file urls.txt --rate 2 --retries 4
+  python extrator_html.py --sitemap https://exemplo.com/sitemap.xml --since 7d --concurrency 16
+  python extrator_html.py --cache https://exemplo.com
+  python extrator_html.py --cache --refresh https://exemplo.com
+  python extrator_html.py --parser html.parser --check-parsers https://exemplo.com
+  python extrator_html.py --output-mode raw --url-file urls.txt
+  python extrator_html.py --select "div#conteudo" https://exemplo.com
+  python extrator_html.py --xpath "//article//a/@href" https://exemplo.com
+  python extrator_html.py --output-mode artifacts --url-file urls.txt
+  python extrator_html.py --url-file urls.txt --profile --metrics-log metricas.jsonl
+  python extrator_html.py --url-file urls.txt --archive arquivo --archive-format warc
+  python extrator_html.py --url-file urls.txt --store armazem
+  python extrator_html.py --store armazem --store-gc --store-keep 3
+  python extrator_html.py --watch monitorar.txt --interval 30m --jitter 0.2
+  cat urls.txt | python extrator_html.py --pipeline --no-save > resultados.ndjson
+  python extrator_html.py --serve 127.0.0.1:8700 --concurrency 8 --result-cache 500
+  python extrator_html.py --crawl --max-depth 3 --prefix https://exemplo.com/docs/ https://exemplo.com/docs/
         """
     )
 
-    parser.add_argument('url', nargs='?', help='URL para extrair HTML')
+    parser.add_argument('urls', nargs='*', metavar='url', help='URL(s) para extrair HTML')
     parser.add_argument('--no-save', action='store_true', help='Não salvar em arquivo')
     parser.add_argument('--no-preview', action='store_true', help='Não mostrar preview')
+    parser.add_argument('--url-file', metavar='ARQUIVO', help='Arquivo com uma URL por linha (modo lote)')
+    parser.add_argument('--concurrency', type=int, default=8, metavar='N',
+                        help='Requisições simultâneas no modo lote (padrão: 8)')
+    parser.add_argument('--workers', default='0', metavar='N',
+                        help='Processos para parse e serialização no modo lote, fora do GIL '
+                             '(padrão: 0 = nas próprias threads; auto = um por núcleo)')
+    parser.add_argument('--cache', action='store_true',
+                        help=f'Usar cache HTTP em disco (padrão: {DIRETORIO_PADRAO})')
+    parser.add_argument('--cache-dir', metavar='DIR', help='Diretório do cache (ativa o cache)')
+    parser.add_argument('--cache-size', type=float, default=200, metavar='MB',
+                        help='Tamanho máximo do cache em MB (padrão: 200)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignorar cópias em cache e baixar de novo (atualiza o cache)')
+    parser.add_argument('--max-size', type=float, default=100, metavar='MB',
+                        help='Abortar downloads maiores que isso (padrão: 100, 0 = sem limite)')
+    parser.add_argument('--spool-size', type=float, default=8, metavar='MB',
+                        help='Corpo mantido em memória antes de ir para disco (padrão: 8)')
+    parser.add_argument('--parser', choices=(PARSER_AUTOMATICO,) + PARSERS_SUPORTADOS, default=PARSER_AUTOMATICO,
+                        help='Parser do BeautifulSoup (padrão: auto = lxml se instalado)')
+    parser.add_argument('--check-parsers', action='store_true',
+                        help='Comparar as árvores geradas por cada parser instalado')
+    parser.add_argument('--output-mode', choices=MODOS_SAIDA, default=MODO_PRETTY,
+                        help='pretty = formatado (padrão), minified = sem espaços extras, raw = bytes originais sem parse, '
+                             'artifacts = JSON com texto, links, metadados (meta/OpenGraph/JSON-LD) e tabelas')
+    seletores = parser.add_mutually_exclusive_group()
+    seletores.add_argument('--select', metavar='CSS', help='Extrair só os elementos do seletor CSS')
+    seletores.add_argument('--xpath', metavar='EXPR', help='Extrair só os nós da expressão XPath (lxml)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Ler URLs da entrada padrão e escrever um JSON por URL na saída (NDJSON), sem prints nem perguntas')
+    parser.add_argument('--profile', action='store_true',
+                        help='Mostrar o tempo de cada fase (DNS, conexão, TLS, TTFB, download, parse, ...) em percentis')
+    parser.add_argument('--metrics-log', metavar='ARQUIVO',
+                        help='Gravar as métricas de cada extração em JSON lines (uma linha por URL)')
+    rede = parser.add_argument_group('retentativas e limite por host')
+    rede.add_argument('--retries', type=int, default=2, metavar='N',
+                      help='Repetir até N vezes timeouts, conexões derrubadas e respostas 429/5xx (padrão: 2, 0 = não repetir)')
+    rede.add_argument('--retry-backoff', type=float, default=0.5, metavar='SEG',
+                      help='Espera antes da primeira repetição, dobrando a cada uma, com jitter (padrão: 0.5)')
+    rede.add_argument('--retry-max-wait', type=float, default=30, metavar='SEG',
+                      help='Espera máxima entre tentativas; Retry-After maior que isso desiste (padrão: 30)')
+    rede.add_argument('--rate', type=float, default=0, metavar='N',
+                      help='Requisições por segundo em cada host, somando todas as threads (padrão: 0 = sem limite)')
+    rede.add_argument('--burst', type=int, metavar='N',
+                      help='Requisições seguidas permitidas antes do --rate valer (padrão: 1 ou a taxa)')
+    arquivamento = parser.add_argument_group('arquivamento compactado (--archive)')
+    arquivamento.add_argument('--archive', metavar='DIR',
+                              help='Acrescentar as páginas a arquivos compactados nesse diretório em vez de um .html por URL')
+    arquivamento.add_argument('--archive-format', choices=FORMATOS_ARQUIVO, default=FORMATO_WARC,
+                              help='warc = resposta HTTP original (padrão), jsonl = HTML no modo de saída')
+    arquivamento.add_argument('--archive-compression', choices=COMPRESSOES, default=COMPRESSAO_GZIP,
+                              help='gzip (padrão) ou zstd (só jsonl, requer zstandard)')
+    arquivamento.add_argument('--archive-size', type=float, default=1024, metavar='MB',
+                              help='Tamanho de cada arquivo antes de abrir o próximo (padrão: 1024)')
+    armazem = parser.add_argument_group('armazém endereçado por conteúdo (--store)')
+    armazem.add_argument('--store', metavar='DIR',
+                         help='Guardar as saídas deduplicadas por hash nesse diretório (conteúdo idêntico é gravado uma vez)')
+    armazem.add_argument('--store-compression', choices=COMPRESSOES_ARMAZEM, default=COMPRESSAO_GZIP,
+                         help='Compressão dos conteúdos novos: none, gzip (padrão) ou zstd (requer zstandard)')
+    armazem.add_argument('--store-gc', action='store_true',
+                         help='Apagar os conteúdos sem nenhuma extração no manifesto e sair')
+    armazem.add_argument('--store-keep', type=int, metavar='N',
+                         help='Com --store-gc, manter só as N extrações mais recentes de cada URL')
+    monitoramento = parser.add_argument_group('monitoramento de mudanças (--watch)')
+    monitoramento.add_argument('--watch', metavar='ARQUIVO',
+                               help='Verificar periodicamente as URLs do arquivo (uma por linha, intervalo opcional: "URL 15m")')
+    monitoramento.add_argument('--interval', default='1h', metavar='TEMPO',
+                               help='Intervalo das URLs sem intervalo próprio: 90s, 15m, 2h, 1d (padrão: 1h)')
+    monitoramento.add_argument('--jitter', type=float, default=0.1, metavar='FRAÇÃO',
+                               help='Variação aleatória de cada intervalo (padrão: 0.1 = ±10%%)')
+    monitoramento.add_argument('--watch-dir', default='monitor_extrator', metavar='DIR',
+                               help='Diretório do histórico de versões (padrão: monitor_extrator)')
+    servidor = parser.add_argument_group('servidor local (--serve)')
+    servidor.add_argument('--serve', nargs='?', const='', metavar='ENDEREÇO',
+                          help='Atender POST /extract em host:porta ou unix:/caminho.sock (padrão: 127.0.0.1:8700), '
+                               'com --concurrency threads de trabalho')
+    servidor.add_argument('--queue-size', type=int, default=64, metavar='N',
+                          help='Pedidos esperando na fila antes de responder 429 (padrão: 64)')
+    servidor.add_argument('--request-timeout', type=float, default=30, metavar='SEG',
+                          help='Prazo padrão e máximo de cada pedido (padrão: 30)')
+    servidor.add_argument('--result-cache', type=int, default=0, metavar='N',
+                          help='Guardar em memória os N resultados mais recentes (padrão: 0 = desligado)')
+    servidor.add_argument('--result-cache-ttl', type=float, default=300, metavar='SEG',
+                          help='Validade de cada resultado guardado (padrão: 300)')
+    servidor.add_argument('--access-log', action='store_true',
+                          help='Mostrar cada pedido recebido no console')
+    sitemaps = parser.add_argument_group('sitemaps (--sitemap)')
+    sitemaps.add_argument('--sitemap', action='append', metavar='FONTE',
+                          help='Extrair as URLs de um sitemap, índice de sitemaps ou lista de URLs '
+                               '(URL ou arquivo, XML/texto, .gz aceito; pode repetir)')
+    sitemaps.add_argument('--since', metavar='DATA',
+                          help='Pular entradas com lastmod anterior: 2024-05-17, 2024-05-17T10:00:00Z ou idade (36h, 7d)')
+    rastreamento = parser.add_argument_group('rastreamento (--crawl)')
+    rastreamento.add_argument('--crawl', action='store_true',
+                              help='Seguir os links das páginas a partir das URLs informadas')
+    rastreamento.add_argument('--max-depth', type=int, default=2, metavar='N',
+                              help='Cliques a partir das URLs iniciais (padrão: 2)')
+    rastreamento.add_argument('--max-pages', type=int, default=1000, metavar='N',
+                              help='Máximo de páginas baixadas (padrão: 1000, 0 = sem limite)')
+    rastreamento.add_argument('--per-host', type=int, default=2, metavar='N',
+                              help='Requisições simultâneas por host (padrão: 2)')
+    rastreamento.add_argument('--prefix', action='append', metavar='URL',
+                              help='Só seguir URLs que começam com este prefixo (pode repetir)')
+    rastreamento.add_argument('--any-host', action='store_true',
+                              help='Seguir links para outros hosts (padrão: só os hosts iniciais)')
+    rastreamento.add_argument('--bloom', type=int, metavar='N',
+                              help='Usar filtro de Bloom dimensionado para N URLs (rastreamentos enormes)')
     parser.add_argument('--version', action='version', version='Extrator HTML v1.0.0')
 
     args = parser.parse_args()
+    if args.archive and args.archive_format == FORMATO_WARC and args.archive_compression != COMPRESSAO_GZIP:
+        parser.error("--archive-format warc só aceita --archive-compression gzip")
+    if args.archive and args.store:
+        parser.error("use --archive ou --store, não os dois")
+    if (args.store_gc or args.store_keep is not None) and not args.store:
+        parser.error("--store-gc e --store-keep precisam de --store DIR")
+    if args.store_keep is not None and not args.store_gc:
+        parser.error("--store-keep só vale junto com --store-gc")
+    if args.watch and (args.crawl or args.url_file or args.urls):
+        parser.error("--watch lê as URLs do próprio arquivo; não combine com URLs, --url-file ou --crawl")
+    if args.serve is not None and (args.crawl or args.url_file or args.urls or args.watch):
+        parser.error("--serve recebe as URLs pela API; não combine com URLs, --url-file, --crawl ou --watch")
+    if args.serve is not None and (args.archive or args.store):
+        parser.error("--serve devolve o HTML na resposta; não combine com --archive ou --store")
+    if args.sitemap and (args.crawl or args.watch or args.serve is not None):
+        parser.error("--sitemap alimenta o modo lote ou o --pipeline; não combine com --crawl, --watch ou --serve")
+    if args.output_mode == MODO_ARTEFATOS and (args.select or args.xpath):
+        parser.error("--output-mode artifacts lê a página inteira; não combine com --select ou --xpath")
+    if args.since and not args.sitemap:
+        parser.error("--since só vale junto com --sitemap")
+    if args.since:
+        from sitemap import interpretar_desde
+
+        try:
+            args.since = interpretar_desde(args.since)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.pipeline and (args.crawl or args.url_file or args.urls or args.watch or args.serve is not None):
+        parser.error("--pipeline lê as URLs da entrada padrão (ou de --sitemap); não combine com URLs, --url-file, --crawl, --watch ou --serve")
+    if args.pipeline and (args.profile or args.check_parsers):
+        parser.error("--pipeline só escreve NDJSON; não combine com --profile ou --check-parsers")
+    if args.workers == 'auto':
+        args.workers = None
+    elif args.workers.isdigit():
+        args.workers = int(args.workers)
+    else:
+        parser.error("--workers deve ser um número (0 = desligado) ou auto")
+    if args.workers != 0 and (args.crawl or args.watch or args.serve is not None or args.pipeline):
+        parser.error("--workers vale para o modo lote; não combine com --crawl, --watch, --serve ou --pipeline")
+    if args.retries < 0 or args.rate < 0 or (args.burst is not None and args.burst < 1):
+        parser.error("--retries e --rate não podem ser negativos e --burst deve ser pelo menos 1")
+    if not 0 <= args.jitter <= 1:
+        parser.error("--jitter deve estar entre 0 e 1")
+
+    registro_metricas = None
+    if args.metrics_log:
+        registro_metricas = RegistroMetricasJSONL(args.metrics_log)
+        adicionar_coletor(registro_metricas)
+    try:
+        _executar_cli(args)
+    finally:
+        if registro_metricas is not None:
+            remover_coletor(registro_metricas)
+            registro_metricas.fechar()
+
+def _abrir_arquivador_cli(args):
+    """criar_arquivador_cli() com mensagem de erro e saída em caso de falha"""
+    try:
+        return criar_arquivador_cli(args)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ Erro ao abrir o arquivamento: {e}")
+        sys.exit(2)
+
+def executar_monitoramento(args):
+    """
+    Executa o monitoramento (--watch) até Ctrl+C
+
+    Returns:
+        int: Código de saída
+    """
+    from monitoramento import (RESULTADO_ERRO, RESULTADO_IGUAL, RESULTADO_MUDOU, RESULTADO_NAO_MODIFICADA,
+                               RESULTADO_PRIMEIRA, HistoricoMudancas, Monitor, interpretar_intervalo,
+                               ler_lista_monitoramento)
+
+    try:
+        itens = ler_lista_monitoramento(args.watch, interpretar_intervalo(args.interval))
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro ao ler a lista de monitoramento: {e}")
+        return 2
+    if not itens:
+        print("❌ Nenhuma URL encontrada!")
+        return 2
+
+    print(f"👀 Monitorando {len(itens):,} URL(s) | concorrência {args.concurrency} | jitter ±{args.jitter:.0%}")
+    print(f"🗂️ Histórico em: {os.path.abspath(args.watch_dir)} (Ctrl+C para parar)")
+    print("-" * 50)
+
+    def ao_verificar(resultado):
+        agora = datetime.now().strftime('%H:%M:%S')
+        if resultado['resultado'] == RESULTADO_MUDOU:
+            print(f"🔔 {agora} {resultado['url']} mudou → versão {resultado['versao']} "
+                  f"(+{resultado['adicionadas']:,} / -{resultado['removidas']:,} linhas)")
+        elif resultado['resultado'] == RESULTADO_PRIMEIRA:
+            print(f"📸 {agora} {resultado['url']} primeira versão guardada")
+        elif resultado['resultado'] == RESULTADO_ERRO:
+            print(f"❌ {agora} {resultado['url']} {resultado['erro']}")
+
+    opcoes = opcoes_processamento_cli(args)
+    cliente = criar_cliente_cli(args)
+    with HistoricoMudancas(args.watch_dir) as historico:
+        monitor = Monitor(itens, historico, cliente=cliente, concorrencia=args.concurrency,
+                          jitter=args.jitter, parser=opcoes['parser'], ao_verificar=ao_verificar)
+        try:
+            contadores = monitor.executar()
+        except KeyboardInterrupt:
+            print("\n⏹️ Parando o monitoramento...")
+            contadores = dict(monitor.contadores, verificacoes=sum(monitor.contadores.values()))
+        finally:
+            cliente.fechar()
+
+    print(
+        f"📊 {contadores['verificacoes']:,} verificações | {contadores[RESULTADO_MUDOU]:,} mudanças | "
+        f"{contadores[RESULTADO_NAO_MODIFICADA]:,} 304 | {contadores[RESULTADO_IGUAL]:,} sem mudança | "
+        f"{contadores[RESULTADO_ERRO]:,} erros"
+    )
+    return 0
+
+def executar_servidor(args):
+    """
+    Atende pedidos de extração pela API HTTP local até Ctrl+C
+
+    Returns:
+        int: Código de saída
+    """
+    import signal
+
+    from servidor_extracao import (ENDERECO_PADRAO, PREFIXO_UNIX, CacheResultados, ServicoExtracao,
+                                   criar_servidor, descrever_endereco, remover_socket_unix)
+
+    endereco = args.serve or ENDERECO_PADRAO
+    cache = None
+    if args.result_cache > 0:
+        cache = CacheResultados(args.result_cache, args.result_cache_ttl)
+    servico = ServicoExtracao(
+        criar_cliente_cli(args),
+        workers=args.concurrency,
+        tamanho_fila=args.queue_size,
+        timeout=args.request_timeout,
+        cache_resultados=cache
+    )
+    try:
+        servidor = criar_servidor(endereco, servico, verboso=args.access_log)
+    except (OSError, ValueError) as e:
+        print(f"❌ Não foi possível abrir o servidor: {e}")
+        servico.fechar()
+        return 2
+
+    print(f"🛰️ Servidor de extração em {descrever_endereco(servidor)} | {servico.workers} workers | "
+          f"fila {args.queue_size} | prazo {args.request_timeout:g} s")
+    print('   POST /extract {"url": "..."} | GET /metrics | GET /health (Ctrl+C para parar)')
+    print("-" * 50)
+
+    # Gerenciadores de serviço param com SIGTERM: encerra do mesmo jeito que o Ctrl+C
+    def ao_terminar(*_):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, ao_terminar)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Parando o servidor...")
+    finally:
+        servidor.server_close()
+        servico.fechar()
+        if endereco.startswith(PREFIXO_UNIX):
+            remover_socket_unix(endereco[len(PREFIXO_UNIX):])
+    return 0
+
+def executar_coleta_armazem(args):
+    """
+    Poda o manifesto (--store-keep) e apaga os conteúdos sem referência
+
+    Returns:
+        int: Código de saída
+    """
+    armazem = _abrir_arquivador_cli(args)
+    try:
+        if args.store_keep is not None:
+            removidas = armazem.podar(manter=args.store_keep)
+            print(f"✂️ {removidas:,} extração(ões) antiga(s) removida(s) do manifesto")
+        coleta = armazem.coletar_lixo()
+        print(f"🧹 {coleta['removidos']:,} conteúdo(s) sem referência apagado(s) "
+              f"({coleta['liberados'] / (1024 * 1024):,.1f} MB liberados)")
+        mostrar_estatisticas_armazem(armazem.estatisticas())
+    finally:
+        armazem.fechar()
+    return 0
+
+def _executar_cli(args):
+    """Executa o modo simples ou o modo lote a partir das opções já lidas"""
+    # Antes do cabeçalho: no modo pipeline a saída padrão é só NDJSON
+    if args.pipeline:
+        sys.exit(executar_pipeline(args))
 
     print("=" * 60)
     print("🌐 EXTRATOR DE HTML - BeautifulSoup")
@@ -120,9 +1260,54 @@ Exemplos:
     print("=" * 60)
     print()
 
+    if args.store_gc:
+        sys.exit(executar_coleta_armazem(args))
+    if args.watch:
+        sys.exit(executar_monitoramento(args))
+    if args.serve is not None:
+        sys.exit(executar_servidor(args))
+
+    # Modo lote/rastreamento: várias URLs, arquivo de URLs ou sitemaps, sem pausas interativas
+    if args.crawl or args.url_file or args.sitemap or len(args.urls) > 1:
+        urls = list(args.urls)
+        if args.url_file:
+            try:
+                urls.extend(ler_urls_arquivo(args.url_file))
+            except OSError as e:
+                print(f"❌ Erro ao ler arquivo de URLs: {e}")
+                sys.exit(2)
+        if not urls and not args.sitemap:
+            print("❌ Nenhuma URL encontrada!")
+            sys.exit(2)
+        cliente = criar_cliente_cli(args)
+        arquivador = _abrir_arquivador_cli(args)
+        try:
+            if args.crawl:
+                codigo = executar_rastreamento(urls, args, cliente=cliente, arquivador=arquivador)
+            elif args.sitemap:
+                from itertools import chain
+
+                from sitemap import mostrar_resumo_sitemap
+
+                leitor = criar_leitor_sitemap_cli(args, cliente)
+                codigo = executar_lote(chain(urls, leitor.urls(args.sitemap)), args,
+                                       cliente=cliente, arquivador=arquivador)
+                mostrar_resumo_sitemap(leitor)
+                if leitor.erros:
+                    codigo = 1
+            else:
+                codigo = executar_lote(urls, args, cliente=cliente, arquivador=arquivador)
+            if isinstance(arquivador, ArmazemConteudo):
+                mostrar_estatisticas_armazem(arquivador.estatisticas())
+        finally:
+            cliente.fechar()
+            if arquivador is not None:
+                arquivador.fechar()
+        sys.exit(codigo)
+
     # Verificar se URL foi passada como argumento
-    if args.url:
-        url = args.url
+    if args.urls:
+        url = args.urls[0]
     else:
         # Solicitar URL ao usuário
         print("📎 Cole a URL aqui:")
@@ -137,16 +1322,33 @@ Exemplos:
     # Validar URL básica
     if not url.startswith(('http://', 'https://')):
         print("⚠️  Adicionando 'https://' à URL...")
-        url = 'https://' + url
+        url = normalizar_esquema(url)
 
-    # Extrair HTML
+    # Extrair HTML (o CLI só precisa do arquivo, não do documento em memória)
+    cliente = criar_cliente_cli(args)
+    arquivador = _abrir_arquivador_cli(args)
+    metricas = MetricasExtracao(url)
     html_resultado = extrair_html(
         url=url,
         salvar_arquivo=not args.no_save,
-        mostrar_preview=not args.no_preview
+        mostrar_preview=not args.no_preview,
+        cliente=cliente,
+        retornar_html=False,
+        metricas=metricas,
+        arquivador=arquivador,
+        **opcoes_processamento_cli(args)
     )
+    if isinstance(arquivador, ArmazemConteudo):
+        mostrar_estatisticas_armazem(arquivador.estatisticas())
+    if arquivador is not None:
+        arquivador.fechar()
+    if args.profile:
+        mostrar_perfil([metricas])
+    if cliente.cache is not None:
+        mostrar_estatisticas_cache(cliente.cache.estatisticas())
+    cliente.fechar()
 
-    if html_resultado:
+    if html_resultado is not None:
         print(f"\n✅ Extração concluída com sucesso!")
     else:
         print(f"\n❌ Falha na extração!")
@@ -155,4 +1357,8 @@ Exemplos:
     input("\nPressione ENTER para sair...")
 
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        # Os processos de --workers reexecutam o .exe do PyInstaller
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
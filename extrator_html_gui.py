@@ -5,14 +5,27 @@ Interface gráfica para extrair HTML de URLs usando BeautifulSoup
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
-import requests
-from bs4 import BeautifulSoup
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
-import threading
+import queue
 import os
 import sys
 
+from cliente_http import obter_cliente_padrao
+from armazem import ArmazemConteudo
+from cache_http import CacheHTTP, MODO_DESLIGADO, MODOS_CACHE
+from fila_extracao import (ESTADO_BAIXANDO, ESTADO_CANCELADA, ESTADO_CONCLUIDA, ESTADO_ERRO,
+                           FilaExtracao)
+from parsers_html import PARSER_AUTOMATICO, parsers_disponiveis
+from retentativas import LimitadorPorHost
+from serializacao_html import reservar_nome_arquivo
+from visualizador_html import BarraBusca, VisualizadorHTML
+
+# Intervalo (ms) em que a interface busca mensagens das threads de trabalho
+INTERVALO_FILA_MS = 50
+# Intervalo (ms) entre atualizações de progresso, bytes e tempo na fila
+INTERVALO_ATUALIZACAO_MS = 250
+
 class ExtratorHTMLGUI:
     def __init__(self, root):
         self.root = root
@@ -24,14 +37,36 @@ class ExtratorHTMLGUI:
         self.html_atual = ""
         self.url_atual = ""
 
+        # Cliente HTTP com pool de conexões reaproveitado entre extrações
+        self.cliente = obter_cliente_padrao()
+
+        # Armazém deduplicado para o salvamento automático (criado ao ligar)
+        self.armazem = None
+        self.armazem_ativo = False
+
         # Configurar ícone (opcional)
         try:
             self.root.iconbitmap('icon.ico')  # Se tiver um ícone
         except:
             pass
 
+        # As threads de trabalho nunca chamam o Tk: mandam funções para esta
+        # fila e a interface as executa no loop principal
+        self.fila_interface = queue.Queue()
+
+        # Fila de extrações com quantidade fixa de threads
+        self.fila = FilaExtracao(
+            self.cliente,
+            ao_terminar=lambda tarefa: self._na_interface(self._tarefa_terminada, tarefa),
+            salvar=self.salvar_automatico
+        )
+        self._linhas_finais = set()
+        self._progresso_ativo = False
+
         self.criar_interface()
         self.root.protocol("WM_DELETE_WINDOW", self.ao_fechar)
+        self.root.after(INTERVALO_FILA_MS, self._processar_fila)
+        self.root.after(INTERVALO_ATUALIZACAO_MS, self._atualizar_fila)
 
     def criar_interface(self):
         """Cria a interface gráfica"""
@@ -119,38 +154,128 @@ class ExtratorHTMLGUI:
         )
         self.btn_limpar.pack(side=tk.LEFT)
 
+        # Salvamento automático no armazém deduplicado em vez de um .html por extração
+        self.usar_armazem = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            btn_frame,
+            text="🗃️ Deduplicar",
+            variable=self.usar_armazem,
+            command=self._alternar_armazem
+        ).pack(side=tk.RIGHT, padx=(15, 0))
+
+        # Modo do cache HTTP em disco
+        self.modo_cache = tk.StringVar(value=MODO_DESLIGADO)
+        self.combo_cache = ttk.Combobox(
+            btn_frame,
+            textvariable=self.modo_cache,
+            values=MODOS_CACHE,
+            state='readonly',
+            width=12
+        )
+        self.combo_cache.pack(side=tk.RIGHT)
+        ttk.Label(btn_frame, text="💾 Cache:", font=('Arial', 9)).pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Parser do BeautifulSoup (auto = lxml se instalado)
+        self.parser_html = tk.StringVar(value=PARSER_AUTOMATICO)
+        self.combo_parser = ttk.Combobox(
+            btn_frame,
+            textvariable=self.parser_html,
+            values=[PARSER_AUTOMATICO] + parsers_disponiveis(),
+            state='readonly',
+            width=12
+        )
+        self.combo_parser.pack(side=tk.RIGHT, padx=(0, 15))
+        ttk.Label(btn_frame, text="🧩 Parser:", font=('Arial', 9)).pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Requisições por segundo em cada host, somando as threads da fila (0 = sem limite)
+        self.taxa_host = tk.StringVar(value='0')
+        ttk.Spinbox(
+            btn_frame,
+            from_=0,
+            to=50,
+            increment=0.5,
+            textvariable=self.taxa_host,
+            width=5
+        ).pack(side=tk.RIGHT, padx=(0, 15))
+        ttk.Label(btn_frame, text="⏱️ Req/s por host:", font=('Arial', 9)).pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Fila em cima e resultado embaixo, com divisória ajustável
+        paineis = ttk.PanedWindow(main_frame, orient=tk.VERTICAL)
+        paineis.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+
+        # Frame da fila de extrações
+        fila_frame = ttk.LabelFrame(paineis, text="📋 Fila de Extrações", padding="5")
+        fila_frame.columnconfigure(0, weight=1)
+        fila_frame.rowconfigure(1, weight=1)
+        paineis.add(fila_frame, weight=1)
+
+        entrada_frame = ttk.Frame(fila_frame)
+        entrada_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        entrada_frame.columnconfigure(0, weight=1)
+
+        self.urls_texto = tk.Text(entrada_frame, height=3, font=('Arial', 9), wrap=tk.NONE)
+        self.urls_texto.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=(0, 5))
+
+        ttk.Button(
+            entrada_frame,
+            text="➕ Enfileirar URLs",
+            command=self.enfileirar_urls
+        ).grid(row=0, column=1, sticky=tk.N)
+
+        colunas = ('url', 'estado', 'progresso', 'bytes', 'tempo')
+        self.arvore_fila = ttk.Treeview(fila_frame, columns=colunas, show='headings', height=6)
+        for coluna, titulo, largura, ancora in (
+            ('url', "URL", 420, tk.W),
+            ('estado', "Estado", 180, tk.W),
+            ('progresso', "Progresso", 80, tk.E),
+            ('bytes', "Bytes", 100, tk.E),
+            ('tempo', "Tempo", 70, tk.E),
+        ):
+            self.arvore_fila.heading(coluna, text=titulo)
+            self.arvore_fila.column(coluna, width=largura, anchor=ancora, stretch=(coluna == 'url'))
+        self.arvore_fila.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.arvore_fila.bind('<Double-1>', lambda e: self.abrir_resultado())
+
+        fila_scrollbar = ttk.Scrollbar(fila_frame, orient=tk.VERTICAL, command=self.arvore_fila.yview)
+        fila_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.arvore_fila.configure(yscrollcommand=fila_scrollbar.set)
+
+        acoes_frame = ttk.Frame(fila_frame)
+        acoes_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+
+        ttk.Button(acoes_frame, text="📂 Abrir Resultado", command=self.abrir_resultado).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(acoes_frame, text="⛔ Cancelar", command=self.cancelar_selecionadas).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(acoes_frame, text="🧹 Remover Terminadas", command=self.remover_terminadas).pack(side=tk.LEFT)
+
+        self.resumo_fila = ttk.Label(acoes_frame, text="", font=('Arial', 9), foreground="gray")
+        self.resumo_fila.pack(side=tk.RIGHT)
+
         # Frame de resultado
-        resultado_frame = ttk.LabelFrame(main_frame, text="📄 HTML Extraído", padding="5")
-        resultado_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        resultado_frame = ttk.LabelFrame(paineis, text="📄 HTML Extraído", padding="5")
+        paineis.add(resultado_frame, weight=3)
         resultado_frame.columnconfigure(0, weight=1)
         resultado_frame.rowconfigure(0, weight=1)
 
-        # Área de texto com scrollbars
-        text_frame = ttk.Frame(resultado_frame)
-        text_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        text_frame.columnconfigure(0, weight=1)
-        text_frame.rowconfigure(0, weight=1)
-
-        self.texto_html = scrolledtext.ScrolledText(
-            text_frame, 
-            width=120, 
-            height=30,
+        # Visualizador: só as linhas visíveis vão para o widget
+        self.visualizador = VisualizadorHTML(
+            resultado_frame,
+            width=120,
+            height=20,
             font=('Consolas', 9, 'normal'),
-            wrap=tk.NONE,
             bg='#f8f9fa',
             fg='#2d3748',
             insertbackground='black'
         )
-        self.texto_html.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.texto_html.yview)
-        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.texto_html.configure(yscrollcommand=v_scrollbar.set)
+        self.visualizador.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
-        h_scrollbar = ttk.Scrollbar(text_frame, orient=tk.HORIZONTAL, command=self.texto_html.xview)
-        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
-        self.texto_html.configure(xscrollcommand=h_scrollbar.set)
+        # Busca (Ctrl+F): fica escondida até ser chamada
+        self.barra_busca = BarraBusca(resultado_frame, self.visualizador)
+        self.barra_busca.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.barra_busca.grid_remove()
+        self.root.bind('<Control-f>', lambda e: self.barra_busca.mostrar())
+        self.root.bind('<Control-F>', lambda e: self.barra_busca.mostrar())
+        self.root.bind('<F3>', lambda e: self.barra_busca.proxima())
+        self.root.bind('<Shift-F3>', lambda e: self.barra_busca.anterior())
 
         # Status bar
         status_frame = ttk.Frame(main_frame)
@@ -179,121 +304,223 @@ class ExtratorHTMLGUI:
         info_text = (
             "💡 Dicas: "
             "• Cole a URL e pressione ENTER ou clique em 'Extrair HTML' "
-            "• Use Ctrl+F para buscar no HTML "
+            "• Várias URLs (uma por linha) vão para a fila "
+            "• Ctrl+F busca no HTML (Enter/F3 = próxima, Shift+Enter/Shift+F3 = anterior) "
             "• O arquivo é salvo automaticamente com timestamp"
         )
         ttk.Label(info_frame, text=info_text, font=('Arial', 8), foreground="gray").pack(anchor=tk.W)
 
-    def extrair_thread(self):
-        """Executa extração em thread separada"""
-        if self.url_entry.get().strip():
-            thread = threading.Thread(target=self.extrair_html)
-            thread.daemon = True
-            thread.start()
-        else:
-            messagebox.showwarning("Aviso", "Por favor, insira uma URL válida!")
+    def _na_interface(self, funcao, *args, **kwargs):
+        """Agenda ``funcao`` para rodar na thread do Tk (seguro em qualquer thread)"""
+        self.fila_interface.put((funcao, args, kwargs))
 
-    def extrair_html(self):
-        """Extrai HTML da URL fornecida"""
-        url = self.url_entry.get().strip()
+    def _processar_fila(self):
+        """Executa o que as threads de trabalho mandaram para a interface"""
+        while True:
+            try:
+                funcao, args, kwargs = self.fila_interface.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                funcao(*args, **kwargs)
+            except Exception:
+                # Um callback com erro não pode parar a fila: os próximos resultados ainda chegam
+                self.root.report_callback_exception(*sys.exc_info())
+        self.root.after(INTERVALO_FILA_MS, self._processar_fila)
 
+    def extrair_thread(self):
+        """Enfileira a URL do campo e mostra o resultado quando terminar"""
+        url = self.url_entry.get().strip()
         if not url:
+            messagebox.showwarning("Aviso", "Por favor, insira uma URL válida!")
             return
 
-        self.url_atual = url
-
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
             self.url_entry.delete(0, tk.END)
             self.url_entry.insert(0, url)
 
-        # Atualizar interface
         self.status_label.config(text="⏳ Extraindo HTML...", foreground="orange")
-        self.btn_extrair.config(state='disabled')
-        self.progress.start(10)
-        self.root.update()
+        self._enfileirar([url], abrir=True)
+
+    def enfileirar_urls(self):
+        """Enfileira as URLs coladas na caixa da fila (uma por linha)"""
+        urls = []
+        for linha in self.urls_texto.get('1.0', tk.END).splitlines():
+            url = linha.strip()
+            if not url or url.startswith('#'):
+                continue
+            if not url.startswith(('http://', 'https://')):
+                url = 'https://' + url
+            urls.append(url)
+
+        if not urls:
+            messagebox.showwarning("Aviso", "Cole uma ou mais URLs, uma por linha!")
+            return
 
+        self.urls_texto.delete('1.0', tk.END)
+        self._enfileirar(urls)
+        self.status_label.config(text=f"📋 {len(urls):,} URL(s) adicionada(s) à fila", foreground="blue")
+
+    def _enfileirar(self, urls, abrir=False):
+        # Valores dos widgets são lidos aqui, na thread do Tk
+        modo_cache = self.modo_cache.get()
+        if modo_cache != MODO_DESLIGADO and self.cliente.cache is None:
+            self.cliente.cache = CacheHTTP()
+        parser = self.parser_html.get()
+        self._aplicar_taxa_host()
+
+        for url in urls:
+            tarefa = self.fila.adicionar(url, modo_cache, parser, abrir=abrir)
+            self.arvore_fila.insert('', tk.END, iid=str(tarefa.id), values=self._valores_tarefa(tarefa))
+        self._atualizar_progresso()
+
+    def _aplicar_taxa_host(self):
+        """Troca o limitador do cliente se o valor de req/s por host mudou"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            }
-
-            print(f"📡 Fazendo requisição para: {url}")
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            print(f"✅ Resposta recebida: {len(response.content):,} bytes")
-
-            # Parse com BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-            self.html_atual = soup.prettify()
-
-            # Limpar e inserir no texto
-            self.texto_html.delete(1.0, tk.END)
-            self.texto_html.insert(1.0, self.html_atual)
-
-            # Ir para o início
-            self.texto_html.see(1.0)
-
-            # Estatísticas
-            tamanho = len(self.html_atual)
-            linhas = self.html_atual.count('\n')
-            palavras = len(self.html_atual.split())
-
-            self.status_label.config(
-                text=f"✅ Extraído com sucesso! {tamanho:,} caracteres | {linhas:,} linhas | {palavras:,} palavras", 
-                foreground="green"
-            )
-
-            # Habilitar botões
-            self.btn_salvar.config(state='normal')
-            self.btn_copiar.config(state='normal')
-
-            # Salvar automaticamente
-            self.salvar_automatico()
-
-        except requests.exceptions.Timeout:
-            error_msg = "⏰ Timeout: A página demorou muito para carregar"
-            self.status_label.config(text=error_msg, foreground="red")
-            messagebox.showerror("Timeout", "A requisição demorou muito tempo.\nTente novamente ou verifique a URL.")
+            taxa = max(0.0, float(self.taxa_host.get().replace(',', '.')))
+        except ValueError:
+            taxa = 0.0
+        atual = self.cliente.limitador.taxa if self.cliente.limitador is not None else 0.0
+        if taxa != atual:
+            self.cliente.limitador = LimitadorPorHost(taxa) if taxa > 0 else None
+
+    @staticmethod
+    def _valores_tarefa(tarefa):
+        """Colunas da linha da tarefa na fila"""
+        estado = tarefa.erro[0] if tarefa.estado == ESTADO_ERRO else tarefa.estado
+        progresso = tarefa.progresso()
+        if progresso is not None:
+            progresso = f"{progresso:.0%}"
+        else:
+            progresso = "…" if tarefa.estado == ESTADO_BAIXANDO else ""
+        tempo = f"{tarefa.tempo_decorrido():.1f} s" if tarefa.inicio is not None else ""
+        return (tarefa.url, estado, progresso, f"{tarefa.recebidos:,}", tempo)
+
+    def _atualizar_fila(self):
+        """Atualiza progresso, bytes e tempo das tarefas ainda não finalizadas na tela"""
+        for tarefa in list(self.fila.tarefas.values()):
+            if tarefa.id in self._linhas_finais:
+                continue
+            self.arvore_fila.item(str(tarefa.id), values=self._valores_tarefa(tarefa))
+            if tarefa.terminada:
+                self._linhas_finais.add(tarefa.id)
+
+        ativas = self.fila.ativas()
+        total = len(self.fila.tarefas)
+        self.resumo_fila.config(text=f"{ativas:,} em andamento | {total - ativas:,} terminada(s)" if total else "")
+        self._atualizar_progresso()
+        self.root.after(INTERVALO_ATUALIZACAO_MS, self._atualizar_fila)
+
+    def _atualizar_progresso(self):
+        ativas = self.fila.ativas() > 0
+        if ativas and not self._progresso_ativo:
+            self.progress.start(10)
+        elif not ativas and self._progresso_ativo:
+            self.progress.stop()
+        self._progresso_ativo = ativas
 
-        except requests.exceptions.ConnectionError:
-            error_msg = "🌐 Erro de conexão: Verifique sua internet"
-            self.status_label.config(text=error_msg, foreground="red")
-            messagebox.showerror("Erro de Conexão", "Não foi possível conectar à URL.\nVerifique sua conexão com a internet.")
+    def _tarefa_terminada(self, tarefa):
+        """Tarefa terminou (thread do Tk); abre o resultado se foi pedida pelo campo de URL"""
+        if tarefa.id not in self.fila.tarefas:
+            return
+        self.arvore_fila.item(str(tarefa.id), values=self._valores_tarefa(tarefa))
+        self._linhas_finais.add(tarefa.id)
+        self._atualizar_progresso()
 
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"❌ HTTP {e.response.status_code}: {e.response.reason}"
-            self.status_label.config(text=error_msg, foreground="red")
-            messagebox.showerror("Erro HTTP", f"Erro {e.response.status_code}: {e.response.reason}")
+        if not tarefa.abrir:
+            return
+        if tarefa.estado == ESTADO_CONCLUIDA:
+            self._mostrar_resultado(tarefa)
+        elif tarefa.estado == ESTADO_ERRO:
+            status, titulo, mensagem = tarefa.erro
+            self.status_label.config(text=status, foreground="red")
+            messagebox.showerror(titulo, mensagem)
+        elif tarefa.estado == ESTADO_CANCELADA:
+            self.status_label.config(text="⛔ Extração cancelada", foreground="gray")
+
+    def _mostrar_resultado(self, tarefa):
+        """Mostra o documento de uma tarefa concluída, sem baixar de novo"""
+        self.html_atual = tarefa.html
+        self.url_atual = tarefa.url
+        self.visualizador.carregar(tarefa.html, tarefa.inicios)
+        self.barra_busca.documento_trocado()
+        self.status_label.config(text=tarefa.status, foreground="green")
+
+        # Habilitar botões
+        self.btn_salvar.config(state='normal')
+        self.btn_copiar.config(state='normal')
+
+    def _tarefas_selecionadas(self):
+        return [self.fila.tarefas[int(iid)] for iid in self.arvore_fila.selection()
+                if int(iid) in self.fila.tarefas]
+
+    def abrir_resultado(self):
+        """Mostra o resultado da tarefa selecionada na fila"""
+        tarefas = self._tarefas_selecionadas()
+        if not tarefas:
+            messagebox.showwarning("Aviso", "Selecione uma tarefa na fila!")
+            return
 
-        except Exception as e:
-            error_msg = f"❌ Erro inesperado: {str(e)[:100]}"
-            self.status_label.config(text=error_msg, foreground="red")
-            messagebox.showerror("Erro Inesperado", f"Erro ao processar a página:\n{str(e)}")
-            print(f"Erro detalhado: {e}")
-            import traceback
-            traceback.print_exc()
-
-        finally:
-            self.btn_extrair.config(state='normal')
-            self.progress.stop()
+        tarefa = tarefas[0]
+        if tarefa.estado == ESTADO_CONCLUIDA:
+            self._mostrar_resultado(tarefa)
+        elif tarefa.estado == ESTADO_ERRO:
+            self.status_label.config(text=tarefa.erro[0], foreground="red")
+        else:
+            self.status_label.config(text=f"⏳ Tarefa {tarefa.estado}: {tarefa.url}", foreground="orange")
+
+    def cancelar_selecionadas(self):
+        """Cancela as tarefas selecionadas que ainda não terminaram"""
+        canceladas = sum(1 for tarefa in self._tarefas_selecionadas() if self.fila.cancelar(tarefa.id))
+        if canceladas:
+            self.status_label.config(text=f"⛔ {canceladas:,} tarefa(s) cancelada(s)", foreground="gray")
+
+    def remover_terminadas(self):
+        """Tira da fila (e da memória) as tarefas terminadas"""
+        ids = self.fila.remover_terminadas()
+        for id in ids:
+            self.arvore_fila.delete(str(id))
+        self._linhas_finais.difference_update(ids)
+
+    def _alternar_armazem(self):
+        """Liga/desliga o armazém (thread do Tk; as threads de trabalho só leem o atributo)"""
+        if self.usar_armazem.get() and self.armazem is None:
+            try:
+                self.armazem = ArmazemConteudo()
+            except Exception as e:
+                self.usar_armazem.set(False)
+                messagebox.showerror("Erro", f"Erro ao abrir o armazém:\n{str(e)}")
+                return
+        self.armazem_ativo = self.usar_armazem.get()
+
+    def salvar_automatico(self, html=None, url=None):
+        """Salva automaticamente com timestamp (não usa widgets; pode rodar na thread de trabalho)"""
+        html = self.html_atual if html is None else html
+        url = self.url_atual if url is None else url
+        if not html.strip():
+            return
 
-    def salvar_automatico(self):
-        """Salva automaticamente com timestamp"""
-        if not self.html_atual.strip():
+        if self.armazem_ativo:
+            try:
+                local = self.armazem.guardar(url, html)
+                if local['gravado']:
+                    print(f"🗃️ Conteúdo novo no armazém: {local['arquivo']}")
+                else:
+                    print(f"🗃️ Conteúdo idêntico já no armazém: {local['hash'][:16]}… (nada gravado)")
+            except Exception as e:
+                print(f"⚠️ Erro ao salvar no armazém: {e}")
             return
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo = f"html_extraido_{timestamp}.html"
 
         try:
+            # _2, _3... quando já existe um arquivo do mesmo segundo
+            nome_arquivo = reservar_nome_arquivo(f"html_extraido_{timestamp}.html")
             with open(nome_arquivo, 'w', encoding='utf-8') as f:
-                f.write(f"<!-- HTML extraído de: {self.url_atual} -->\n")
+                f.write(f"<!-- HTML extraído de: {url} -->\n")
                 f.write(f"<!-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} -->\n\n")
-                f.write(self.html_atual)
+                f.write(html)
 
             print(f"💾 Arquivo salvo automaticamente: {nome_arquivo}")
 
@@ -349,7 +576,8 @@ class ExtratorHTMLGUI:
     def limpar_tudo(self):
         """Limpa todos os campos"""
         self.url_entry.delete(0, tk.END)
-        self.texto_html.delete(1.0, tk.END)
+        self.visualizador.limpar()
+        self.barra_busca.documento_trocado()
         self.html_atual = ""
         self.url_atual = ""
         self.btn_salvar.config(state='disabled')
@@ -359,6 +587,9 @@ class ExtratorHTMLGUI:
     def ao_fechar(self):
         """Ação ao fechar a janela"""
         if messagebox.askokcancel("Sair", "Deseja realmente sair?"):
+            self.fila.fechar()
+            if self.armazem is not None:
+                self.armazem.fechar()
             self.root.destroy()
 
 def main():
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Fila de extrações da GUI
+Tarefas executadas por um número fixo de threads, com progresso do
+download, cancelamento individual e resultado guardado para reabrir sem
+baixar de novo
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+import requests
+
+from codificacao_html import resolver_codificacao
+from parsers_html import criar_soup, escolher_parser
+from visualizador_html import contar_palavras, indexar_linhas
+
+WORKERS_PADRAO = 4
+
+ESTADO_NA_FILA = 'na fila'
+ESTADO_BAIXANDO = 'baixando'
+ESTADO_PROCESSANDO = 'processando'
+ESTADO_CONCLUIDA = 'concluída'
+ESTADO_ERRO = 'erro'
+ESTADO_CANCELADA = 'cancelada'
+ESTADOS_FINAIS = (ESTADO_CONCLUIDA, ESTADO_ERRO, ESTADO_CANCELADA)
+
+class ExtracaoCancelada(Exception):
+    """A tarefa foi cancelada pelo usuário"""
+
+class TarefaExtracao:
+    """
+    Uma URL na fila
+
+    Os atributos são escritos pela thread de trabalho e só lidos pela
+    interface, que os consulta periodicamente; nenhum widget é tocado aqui.
+    """
+
+    def __init__(self, id, url, modo_cache, parser, abrir=False):
+        """
+        Args:
+            id (int): Identificador da tarefa na fila
+            url (str): URL a extrair
+            modo_cache (str): Modo do cache HTTP nesta extração
+            parser (str): Parser escolhido (ou 'auto')
+            abrir (bool): Mostrar o resultado assim que terminar
+        """
+        self.id = id
+        self.url = url
+        self.modo_cache = modo_cache
+        self.parser = parser
+        self.abrir = abrir
+        self.estado = ESTADO_NA_FILA
+        self.recebidos = 0
+        self.total = None
+        self.inicio = None
+        self.fim = None
+        self.html = None
+        self.inicios = None
+        self.status = None
+        self.erro = None
+        self.cancelamento = threading.Event()
+
+    @property
+    def terminada(self):
+        return self.estado in ESTADOS_FINAIS
+
+    def tempo_decorrido(self):
+        """Segundos desde que a tarefa saiu da fila (0 se ainda não saiu)"""
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    def progresso(self):
+        """Fração baixada (0 a 1) ou None quando o tamanho não é conhecido"""
+        if self.estado in (ESTADO_PROCESSANDO, ESTADO_CONCLUIDA):
+            return 1.0
+        if not self.total:
+            return None
+        return min(1.0, self.recebidos / self.total)
+
+    def _ao_receber(self, recebidos, total):
+        # Chamado pelo cliente HTTP a cada bloco; é aqui que o cancelamento
+        # interrompe um download em andamento
+        if self.cancelamento.is_set():
+            raise ExtracaoCancelada()
+        self.recebidos = recebidos
+        self.total = total
+
+def descrever_erro(erro):
+    """
+    Textos de um erro de extração para a interface
+
+    Returns:
+        tuple: (texto da barra de status, título do diálogo, mensagem do diálogo)
+    """
+    if isinstance(erro, requests.exceptions.Timeout):
+        return ("⏰ Timeout: A página demorou muito para carregar",
+                "Timeout", "A requisição demorou muito tempo.\nTente novamente ou verifique a URL.")
+    if isinstance(erro, requests.exceptions.ConnectionError):
+        return ("🌐 Erro de conexão: Verifique sua internet",
+                "Erro de Conexão", "Não foi possível conectar à URL.\nVerifique sua conexão com a internet.")
+    if isinstance(erro, requests.exceptions.HTTPError) and erro.response is not None:
+        return (f"❌ HTTP {erro.response.status_code}: {erro.response.reason}",
+                "Erro HTTP", f"Erro {erro.response.status_code}: {erro.response.reason}")
+    return (f"❌ Erro inesperado: {str(erro)[:100]}",
+            "Erro Inesperado", f"Erro ao processar a página:\n{str(erro)}")
+
+class FilaExtracao:
+    """
+    Fila de extrações com quantidade fixa de threads de trabalho
+
+    Colar dezenas de URLs não cria dezenas de threads: as tarefas esperam na
+    fila até uma das ``workers`` threads ficar livre.
+    """
+
+    def __init__(self, cliente, workers=WORKERS_PADRAO, ao_terminar=None, salvar=None):
+        """
+        Args:
+            cliente (ClienteHTTP): Cliente compartilhado pelas threads
+            workers (int): Extrações simultâneas
+            ao_terminar (callable): Chamada com a tarefa ao terminar (na thread de trabalho)
+            salvar (callable): Chamada com (html, url) para salvar cada resultado
+        """
+        self.cliente = cliente
+        self.ao_terminar = ao_terminar
+        self.salvar = salvar
+        self.tarefas = {}
+        self._ids = itertools.count(1)
+        self._pendentes = queue.Queue()
+        self._threads = []
+        for numero in range(max(1, workers)):
+            thread = threading.Thread(target=self._trabalhar, name=f"extrator-{numero}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def adicionar(self, url, modo_cache, parser, abrir=False):
+        """Enfileira uma URL e devolve a TarefaExtracao criada"""
+        tarefa = TarefaExtracao(next(self._ids), url, modo_cache, parser, abrir=abrir)
+        self.tarefas[tarefa.id] = tarefa
+        self._pendentes.put(tarefa)
+        return tarefa
+
+    def cancelar(self, id):
+        """
+        Cancela uma tarefa
+
+        Na fila ela é descartada quando chegar a vez; baixando, o download é
+        interrompido no próximo bloco; no parse, o resultado é descartado.
+
+        Returns:
+            bool: False se a tarefa já tinha terminado
+        """
+        tarefa = self.tarefas.get(id)
+        if tarefa is None or tarefa.terminada:
+            return False
+        tarefa.cancelamento.set()
+        if tarefa.estado == ESTADO_NA_FILA:
+            tarefa.estado = ESTADO_CANCELADA
+        return True
+
+    def remover_terminadas(self):
+        """Esquece as tarefas terminadas (libera o HTML guardado); devolve os ids"""
+        ids = [id for id, tarefa in self.tarefas.items() if tarefa.terminada]
+        for id in ids:
+            del self.tarefas[id]
+        return ids
+
+    def ativas(self):
+        """Quantidade de tarefas na fila ou em andamento"""
+        return sum(1 for tarefa in self.tarefas.values() if not tarefa.terminada)
+
+    def fechar(self):
+        """Cancela o que falta e encerra as threads"""
+        for id in list(self.tarefas):
+            self.cancelar(id)
+        for _ in self._threads:
+            self._pendentes.put(None)
+
+    def _trabalhar(self):
+        while True:
+            tarefa = self._pendentes.get()
+            if tarefa is None:
+                return
+            if tarefa.cancelamento.is_set():
+                continue
+            self._executar(tarefa)
+
+    def _executar(self, tarefa):
+        tarefa.inicio = time.perf_counter()
+        tarefa.estado = ESTADO_BAIXANDO
+        try:
+            print(f"📡 Fazendo requisição para: {tarefa.url}")
+            response = self.cliente.obter(tarefa.url, modo_cache=tarefa.modo_cache, progresso=tarefa._ao_receber)
+            tarefa.recebidos = len(response.content)
+            origem = response.origem_cache
+            print(f"✅ Resposta recebida: {len(response.content):,} bytes")
+            pool = self.cliente.estatisticas()
+            print(f"🔌 Conexões: {pool['conexoes_abertas']:,} abertas | {pool['conexoes_reutilizadas']:,} reutilizadas")
+            if origem:
+                cache = self.cliente.cache.estatisticas()
+                print(f"💾 Cache: {origem} | {cache['acertos']:,} acertos | "
+                      f"{cache['revalidados']:,} revalidados | {cache['falhas']:,} falhas")
+
+            tarefa.estado = ESTADO_PROCESSANDO
+            parser = escolher_parser(tarefa.parser)
+            print(f"🔍 Processando HTML com BeautifulSoup ({parser})...")
+            codificacao, _ = resolver_codificacao(response.content, response.headers.get('Content-Type'))
+            html = criar_soup(response.content, parser, from_encoding=codificacao).prettify()
+            del response
+            if tarefa.cancelamento.is_set():
+                raise ExtracaoCancelada()
+
+            # Índice de linhas e estatísticas prontos para o visualizador
+            tarefa.inicios = indexar_linhas(html)
+            linhas = html.count('\n')
+            palavras = contar_palavras(html)
+            tarefa.html = html
+            origem = f" | 💾 cache: {origem}" if origem else ""
+            tarefa.status = (f"✅ Extraído com sucesso! {len(html):,} caracteres | {linhas:,} linhas | "
+                             f"{palavras:,} palavras{origem}")
+            tarefa.estado = ESTADO_CONCLUIDA
+
+            if self.salvar:
+                self.salvar(html, tarefa.url)
+
+        except ExtracaoCancelada:
+            tarefa.estado = ESTADO_CANCELADA
+            print(f"⛔ Cancelada: {tarefa.url}")
+
+        except Exception as e:
+            tarefa.erro = descrever_erro(e)
+            tarefa.estado = ESTADO_ERRO
+            print(f"❌ {tarefa.url}: {e}")
+
+        finally:
+            tarefa.fim = time.perf_counter()
+            if self.ao_terminar:
+                self.ao_terminar(tarefa)
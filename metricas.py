@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Métricas
+Tempo de cada fase da extração (espera por limite de taxa ou retentativa,
+DNS, conexão, TLS, TTFB, download, parse, serialização e gravação), bytes
+de entrada e saída e pico de memória, com log em JSON lines e coletores
+externos
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# Fases na ordem em que acontecem ('espera' = limite de taxa do host e
+# pausas entre tentativas)
+FASES = ('espera', 'dns', 'conexao', 'tls', 'ttfb', 'download', 'parse', 'serializacao', 'gravacao')
+FASES_REDE = ('dns', 'conexao', 'tls')
+
+PERCENTIS = (50, 90, 99)
+
+class MetricasExtracao:
+    """
+    Medições de uma extração
+
+    As fases são acumuladas em segundos; uma fase que não aconteceu (ex.: DNS
+    com conexão reaproveitada do pool) simplesmente não aparece em ``fases``.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.inicio = datetime.now()
+        self.fases = {}
+        self.status = None
+        self.sucesso = False
+        self.tipo_erro = None
+        self.origem_cache = None
+        self.bytes_recebidos = 0
+        self.bytes_saida = 0
+        self.duracao = 0.0
+        self.pico_memoria = None
+        self.codificacao = None
+        self.caminho_codificacao = None
+        self.tempo_codificacao = 0.0
+        self.tentativas = 1
+        self._relogio = time.perf_counter()
+
+    def adicionar(self, fase, segundos):
+        """Soma ``segundos`` ao tempo da fase"""
+        self.fases[fase] = self.fases.get(fase, 0.0) + max(0.0, segundos)
+
+    def tempo_rede(self):
+        """Tempo gasto até agora abrindo conexões (DNS + TCP + TLS)"""
+        return sum(self.fases.get(fase, 0.0) for fase in FASES_REDE)
+
+    @property
+    def conexao_nova(self):
+        """True se a extração precisou abrir uma conexão (não veio do pool)"""
+        return 'conexao' in self.fases
+
+    def finalizar(self, sucesso, tipo_erro=None):
+        """Fecha a medição: duração total, resultado e pico de memória"""
+        self.duracao = time.perf_counter() - self._relogio
+        self.sucesso = sucesso
+        if tipo_erro:
+            self.tipo_erro = tipo_erro
+        self.pico_memoria = pico_memoria_processo()
+
+    def como_dict(self):
+        """Dicionário pronto para JSON"""
+        return {
+            'url': self.url,
+            'inicio': self.inicio.isoformat(timespec='milliseconds'),
+            'sucesso': self.sucesso,
+            'status': self.status,
+            'tipo_erro': self.tipo_erro,
+            'origem_cache': self.origem_cache,
+            'conexao_nova': self.conexao_nova,
+            'bytes_recebidos': self.bytes_recebidos,
+            'bytes_saida': self.bytes_saida,
+            'duracao': round(self.duracao, 6),
+            'fases': {fase: round(self.fases[fase], 6) for fase in FASES if fase in self.fases},
+            'pico_memoria': self.pico_memoria,
+            'codificacao': self.codificacao,
+            'caminho_codificacao': self.caminho_codificacao,
+            'tempo_codificacao': round(self.tempo_codificacao, 6),
+            'tentativas': self.tentativas,
+        }
+
+_local = threading.local()
+
+def metricas_atuais():
+    """MetricasExtracao sendo coletada na thread atual (ou None)"""
+    return getattr(_local, 'metricas', None)
+
+@contextmanager
+def coletando(metricas):
+    """Faz as fases medidas nesta thread irem para ``metricas``"""
+    anterior = metricas_atuais()
+    _local.metricas = metricas
+    try:
+        yield metricas
+    finally:
+        _local.metricas = anterior
+
+def registrar_fase(fase, segundos):
+    """Soma o tempo na medição da thread atual, se houver"""
+    metricas = metricas_atuais()
+    if metricas is not None:
+        metricas.adicionar(fase, segundos)
+
+def registrar_saida(quantidade):
+    """Soma os bytes gravados na medição da thread atual, se houver"""
+    metricas = metricas_atuais()
+    if metricas is not None:
+        metricas.bytes_saida += quantidade
+
+def registrar_codificacao(codificacao, caminho, segundos):
+    """Anota na medição da thread atual como a codificação foi descoberta"""
+    metricas = metricas_atuais()
+    if metricas is not None:
+        metricas.codificacao = codificacao
+        metricas.caminho_codificacao = caminho
+        metricas.tempo_codificacao += segundos
+
+@contextmanager
+def medir_fase(fase):
+    """Cronometra o bloco como ``fase`` (não faz nada sem medição ativa)"""
+    metricas = metricas_atuais()
+    if metricas is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.adicionar(fase, time.perf_counter() - inicio)
+
+def pico_memoria_processo():
+    """
+    Pico de memória residente do processo em bytes
+
+    É o pico do processo inteiro até agora (inclui memória alocada pelo lxml
+    em C); com várias extrações simultâneas não dá para separar por URL.
+
+    Returns:
+        int: Bytes, ou None se o sistema não informar (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa em bytes, Linux em KB
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+_coletores = []
+_lock_coletores = threading.Lock()
+
+def adicionar_coletor(coletor):
+    """
+    Registra uma função chamada com cada MetricasExtracao finalizada
+
+    O coletor é chamado na thread que fez a extração; erros dentro dele são
+    mostrados no console e não interrompem a extração.
+    """
+    with _lock_coletores:
+        _coletores.append(coletor)
+
+def remover_coletor(coletor):
+    """Remove um coletor registrado com adicionar_coletor()"""
+    with _lock_coletores:
+        if coletor in _coletores:
+            _coletores.remove(coletor)
+
+def publicar(metricas):
+    """Entrega a medição a todos os coletores registrados"""
+    with _lock_coletores:
+        coletores = list(_coletores)
+    for coletor in coletores:
+        try:
+            coletor(metricas)
+        except Exception as e:
+            print(f"⚠️ Coletor de métricas falhou: {e}")
+
+class RegistroMetricasJSONL:
+    """
+    Coletor que grava uma linha JSON por extração
+
+    Pode ser usado por várias threads ao mesmo tempo e como context manager.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __call__(self, metricas):
+        linha = json.dumps(metricas.como_dict(), ensure_ascii=False)
+        with self._lock:
+            self._arquivo.write(linha + '\n')
+            self._arquivo.flush()
+
+    def fechar(self):
+        with self._lock:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def percentil(valores, p):
+    """Percentil ``p`` (0-100) por interpolação linear; valores já ordenados"""
+    if not valores:
+        return 0.0
+    posicao = (len(valores) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(valores) - 1)
+    return valores[baixo] + (valores[alto] - valores[baixo]) * (posicao - baixo)
+
+def agregar_metricas(lista_metricas):
+    """
+    Percentis de cada fase sobre várias extrações
+
+    Args:
+        lista_metricas (list): MetricasExtracao finalizadas
+
+    Returns:
+        dict: Por fase (e 'total'): amostras, media, p50, p90, p99 e maximo (segundos)
+    """
+    amostras = {fase: [] for fase in FASES + ('total',)}
+    for metricas in lista_metricas:
+        for fase, segundos in metricas.fases.items():
+            amostras.setdefault(fase, []).append(segundos)
+        amostras['total'].append(metricas.duracao)
+
+    agregado = {}
+    for fase, valores in amostras.items():
+        if not valores:
+            continue
+        valores.sort()
+        linha = {'amostras': len(valores), 'media': sum(valores) / len(valores), 'maximo': valores[-1]}
+        for p in PERCENTIS:
+            linha[f'p{p}'] = percentil(valores, p)
+        agregado[fase] = linha
+    return agregado
+
+def mostrar_perfil(lista_metricas):
+    """Mostra no console a tabela de percentis por fase"""
+    agregado = agregar_metricas(lista_metricas)
+    print("\n" + "=" * 60)
+    print("⏱️ PERFIL POR FASE (ms)")
+    print("=" * 60)
+    colunas = ''.join(f"{f'p{p}':>9}" for p in PERCENTIS)
+    print(f"{'fase':<14}{'n':>6}{'média':>9}{colunas}{'máx':>9}")
+    for fase, linha in agregado.items():
+        valores = ''.join(f"{linha[f'p{p}'] * 1000:>9.1f}" for p in PERCENTIS)
+        print(f"{fase:<14}{linha['amostras']:>6,}{linha['media'] * 1000:>9.1f}{valores}{linha['maximo'] * 1000:>9.1f}")
+
+    recebidos = sum(m.bytes_recebidos for m in lista_metricas)
+    saida = sum(m.bytes_saida for m in lista_metricas)
+    novas = sum(1 for m in lista_metricas if m.conexao_nova)
+    print(f"\n📥 Entrada: {recebidos:,} bytes | 📤 Saída: {saida:,} bytes | 🔌 Conexões novas: {novas:,}/{len(lista_metricas):,}")
+    caminhos = Counter(m.caminho_codificacao for m in lista_metricas if m.caminho_codificacao)
+    if caminhos:
+        tempo = sum(m.tempo_codificacao for m in lista_metricas)
+        resumo = ' | '.join(f"{caminho} {quantidade:,}" for caminho, quantidade in caminhos.most_common())
+        print(f"🔤 Codificação: {resumo} ({tempo * 1000:,.1f} ms)")
+    repetidas = [m.tentativas for m in lista_metricas if m.tentativas > 1]
+    if repetidas:
+        print(f"🔁 Retentativas: {sum(repetidas) - len(repetidas):,} em {len(repetidas):,} extração(ões)")
+    picos = [m.pico_memoria for m in lista_metricas if m.pico_memoria]
+    if picos:
+        print(f"🧠 Pico de memória do processo: {max(picos) / (1024 * 1024):,.1f} MB")
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Monitoramento de mudanças
+Verifica uma lista de URLs periodicamente (intervalo por URL, com jitter)
+em um único processo, com requisições condicionais, impressão digital
+rápida dos bytes (o parse só roda quando ela muda), impressão do conteúdo
+normalizado e diff compacto gravado só quando a página muda
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from difflib import SequenceMatcher
+
+from cache_http import MODO_DESLIGADO, normalizar_url
+from cliente_http import ClienteHTTP
+from extrator_html import normalizar_esquema
+from metricas import medir_fase
+from parsers_html import criar_soup
+from serializacao_html import fragmentos_pretty
+
+DIRETORIO_PADRAO = 'monitor_extrator'
+INTERVALO_PADRAO = 3600.0
+JITTER_PADRAO = 0.1
+# Espera máxima do agendador sem nada vencido (só para notar o pedido de parada)
+ESPERA_MAXIMA = 60.0
+# Linhas (antigas + novas, fora o começo e o fim em comum) acima das quais a
+# versão é guardada inteira: o SequenceMatcher é quadrático no pior caso
+LIMITE_LINHAS_DIFF = 20000
+
+RESULTADO_MUDOU = 'mudou'
+RESULTADO_PRIMEIRA = 'primeira'
+RESULTADO_NAO_MODIFICADA = 'nao_modificada'  # 304
+RESULTADO_IGUAL = 'igual'                    # 200 com o mesmo conteúdo normalizado
+RESULTADO_ERRO = 'erro'
+
+_UNIDADES = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_INTERVALO = re.compile(r'^(\d+(?:\.\d+)?)([smhd]?)$')
+_ESPACOS = re.compile(rb'\s+')
+
+def interpretar_intervalo(texto):
+    """
+    Converte '90', '90s', '15m', '2h' ou '1d' em segundos
+
+    Raises:
+        ValueError: Formato inválido ou intervalo não positivo
+    """
+    casamento = _INTERVALO.match(texto.strip().lower())
+    if not casamento:
+        raise ValueError(f"Intervalo inválido: '{texto}' (use 90, 90s, 15m, 2h ou 1d)")
+    segundos = float(casamento.group(1)) * _UNIDADES[casamento.group(2) or 's']
+    if segundos <= 0:
+        raise ValueError(f"Intervalo deve ser maior que zero: '{texto}'")
+    return segundos
+
+def ler_lista_monitoramento(caminho, intervalo_padrao=INTERVALO_PADRAO):
+    """
+    Lê a lista de URLs a monitorar
+
+    Uma URL por linha, opcionalmente seguida do intervalo
+    (``https://exemplo.com/ 15m``). Linhas vazias e iniciadas com '#' são
+    ignoradas; uma URL repetida fica só uma vez, com o último intervalo.
+
+    Returns:
+        list: Tuplas (url, intervalo em segundos)
+
+    Raises:
+        ValueError: Linha com intervalo inválido (a mensagem cita a linha)
+    """
+    itens = {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for numero, linha in enumerate(f, 1):
+            partes = linha.split()
+            if not partes or partes[0].startswith('#'):
+                continue
+            try:
+                intervalo = interpretar_intervalo(partes[1]) if len(partes) > 1 else intervalo_padrao
+            except ValueError as e:
+                raise ValueError(f"{caminho}:{numero}: {e}") from None
+            url = normalizar_esquema(partes[0])
+            itens[normalizar_url(url)] = (url, intervalo)
+    return list(itens.values())
+
+def impressao_digital(texto):
+    """Resumo de 16 bytes (BLAKE2b) do conteúdo normalizado"""
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+def impressao_rapida(blocos):
+    """
+    Resumo de 16 bytes (BLAKE2b) dos bytes crus, com espaços em sequência
+    reduzidos a um, calculado bloco a bloco (ver CorpoBaixado.iterar)
+
+    Muito mais barato que o parse: se bater com a da última verificação, a
+    página não mudou e nem é preciso montar a árvore.
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    espaco_pendente = False
+    for bloco in blocos:
+        bloco = _ESPACOS.sub(b' ', bloco)
+        # Espaços divididos entre dois blocos contam como um só
+        if espaco_pendente and bloco.startswith(b' '):
+            bloco = bloco[1:]
+        if bloco:
+            resumo.update(bloco)
+            espaco_pendente = bloco.endswith(b' ')
+    return resumo.hexdigest()
+
+def calcular_diff(antigas, novas, limite=LIMITE_LINHAS_DIFF):
+    """
+    Diferença compacta entre duas listas de linhas
+
+    Só as operações que mudam algo são guardadas, com as linhas novas:
+    ``[[inicio, fim, [linhas...]], ...]`` troca antigas[inicio:fim]. O
+    começo e o fim em comum são descontados antes do SequenceMatcher.
+
+    Returns:
+        tuple: (operações, linhas adicionadas, linhas removidas), ou None se
+        o trecho diferente passar de ``limite`` linhas
+    """
+    comeco = 0
+    maximo = min(len(antigas), len(novas))
+    while comeco < maximo and antigas[comeco] == novas[comeco]:
+        comeco += 1
+    fim = 0
+    while fim < maximo - comeco and antigas[-1 - fim] == novas[-1 - fim]:
+        fim += 1
+    meio_antigas = antigas[comeco:len(antigas) - fim]
+    meio_novas = novas[comeco:len(novas) - fim]
+    if len(meio_antigas) + len(meio_novas) > limite:
+        return None
+
+    operacoes = []
+    adicionadas = removidas = 0
+    for tipo, i1, i2, j1, j2 in SequenceMatcher(None, meio_antigas, meio_novas, autojunk=False).get_opcodes():
+        if tipo == 'equal':
+            continue
+        operacoes.append([comeco + i1, comeco + i2, meio_novas[j1:j2]])
+        adicionadas += j2 - j1
+        removidas += i2 - i1
+    return operacoes, adicionadas, removidas
+
+def aplicar_diff(antigas, operacoes):
+    """Reconstrói as linhas novas a partir das antigas e de calcular_diff()"""
+    novas = []
+    posicao = 0
+    for inicio, fim, linhas in operacoes:
+        novas.extend(antigas[posicao:inicio])
+        novas.extend(linhas)
+        posicao = fim
+    novas.extend(antigas[posicao:])
+    return novas
+
+class HistoricoMudancas:
+    """
+    Estado do monitoramento e versões de cada URL (SQLite)
+
+    Para cada URL fica a última versão inteira (comprimida, usada para o
+    próximo diff), as impressões digitais e os validadores HTTP; cada mudança
+    grava só o diff em relação à versão anterior. A primeira versão é
+    guardada inteira, assim como as que mudam demais para um diff barato
+    (ver LIMITE_LINHAS_DIFF). Pode ser usado por várias threads ao mesmo
+    tempo.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO):
+        self.diretorio = os.path.abspath(diretorio)
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._banco = sqlite3.connect(os.path.join(self.diretorio, 'monitor.sqlite3'), check_same_thread=False)
+        self._banco.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                chave TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                impressao TEXT,
+                impressao_bruta TEXT,
+                atual BLOB,
+                versao INTEGER NOT NULL DEFAULT 0,
+                verificado_em REAL,
+                alterado_em REAL
+            );
+            CREATE TABLE IF NOT EXISTS versoes (
+                chave TEXT NOT NULL,
+                versao INTEGER NOT NULL,
+                capturado_em REAL NOT NULL,
+                impressao TEXT NOT NULL,
+                completo INTEGER NOT NULL,
+                dados BLOB NOT NULL,
+                adicionadas INTEGER NOT NULL,
+                removidas INTEGER NOT NULL,
+                PRIMARY KEY (chave, versao)
+            );
+            """
+        )
+        # Bancos criados antes da impressão rápida não têm a coluna
+        colunas = {linha[1] for linha in self._banco.execute('PRAGMA table_info(urls)')}
+        if 'impressao_bruta' not in colunas:
+            self._banco.execute('ALTER TABLE urls ADD COLUMN impressao_bruta TEXT')
+        self._banco.commit()
+
+    def estado(self, url):
+        """
+        Validadores e impressões digitais guardados da URL
+
+        Returns:
+            dict: etag, last_modified, impressao, impressao_bruta, versao (ou
+            None se nunca vista)
+        """
+        with self._lock:
+            linha = self._banco.execute(
+                'SELECT etag, last_modified, impressao, impressao_bruta, versao FROM urls WHERE chave = ?',
+                (normalizar_url(url),)
+            ).fetchone()
+        if linha is None:
+            return None
+        return {'etag': linha[0], 'last_modified': linha[1], 'impressao': linha[2], 'impressao_bruta': linha[3],
+                'versao': linha[4]}
+
+    def registrar_verificacao(self, url, etag=None, last_modified=None, impressao_bruta=None):
+        """Marca a URL como verificada sem mudança (atualiza validadores e impressão rápida se vierem)"""
+        with self._lock:
+            self._banco.execute(
+                'UPDATE urls SET verificado_em = ?, etag = COALESCE(?, etag), '
+                'last_modified = COALESCE(?, last_modified), impressao_bruta = COALESCE(?, impressao_bruta) '
+                'WHERE chave = ?',
+                (time.time(), etag, last_modified, impressao_bruta, normalizar_url(url))
+            )
+            self._banco.commit()
+
+    def registrar_versao(self, url, texto, impressao, etag=None, last_modified=None, impressao_bruta=None):
+        """
+        Guarda uma versão nova da URL (inteira na primeira vez, diff depois)
+
+        Returns:
+            dict: versao, adicionadas e removidas (linhas)
+        """
+        chave = normalizar_url(url)
+        agora = time.time()
+        novas = texto.splitlines(keepends=True)
+        with self._lock:
+            linha = self._banco.execute('SELECT atual, versao FROM urls WHERE chave = ?', (chave,)).fetchone()
+
+        atual = zlib.compress(texto.encode('utf-8'))
+        if linha is None or linha[0] is None:
+            versao = 1
+            dados, completo = atual, 1
+            adicionadas, removidas = len(novas), 0
+        else:
+            versao = linha[1] + 1
+            antigas = zlib.decompress(linha[0]).decode('utf-8').splitlines(keepends=True)
+            diff = calcular_diff(antigas, novas)
+            if diff is None:
+                # Mudou demais para um diff barato: guarda a versão inteira e
+                # conta as linhas que entraram e saíram, sem alinhar
+                dados, completo = atual, 1
+                contagem_antigas, contagem_novas = Counter(antigas), Counter(novas)
+                adicionadas = sum((contagem_novas - contagem_antigas).values())
+                removidas = sum((contagem_antigas - contagem_novas).values())
+            else:
+                operacoes, adicionadas, removidas = diff
+                dados, completo = zlib.compress(json.dumps(operacoes, ensure_ascii=False).encode('utf-8')), 0
+
+        with self._lock:
+            self._banco.execute(
+                'INSERT INTO urls (chave, url, etag, last_modified, impressao, impressao_bruta, atual, versao, '
+                'verificado_em, alterado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(chave) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, '
+                'impressao = excluded.impressao, impressao_bruta = excluded.impressao_bruta, '
+                'atual = excluded.atual, versao = excluded.versao, '
+                'verificado_em = excluded.verificado_em, alterado_em = excluded.alterado_em',
+                (chave, url, etag, last_modified, impressao, impressao_bruta, atual, versao, agora, agora)
+            )
+            self._banco.execute(
+                'INSERT OR REPLACE INTO versoes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (chave, versao, agora, impressao, completo, dados, adicionadas, removidas)
+            )
+            self._banco.commit()
+        return {'versao': versao, 'adicionadas': adicionadas, 'removidas': removidas}
+
+    def versoes(self, url):
+        """
+        Versões guardadas da URL, da mais antiga para a mais nova
+
+        Returns:
+            list: Tuplas (versao, capturado_em, adicionadas, removidas)
+        """
+        with self._lock:
+            return self._banco.execute(
+                'SELECT versao, capturado_em, adicionadas, removidas FROM versoes WHERE chave = ? ORDER BY versao',
+                (normalizar_url(url),)
+            ).fetchall()
+
+    def reconstruir(self, url, versao=None):
+        """
+        Texto normalizado de uma versão (None = a mais recente)
+
+        Returns:
+            str: Conteúdo da versão, ou None se ela não existir
+        """
+        chave = normalizar_url(url)
+        with self._lock:
+            if versao is None:
+                linha = self._banco.execute('SELECT atual FROM urls WHERE chave = ?', (chave,)).fetchone()
+                return zlib.decompress(linha[0]).decode('utf-8') if linha and linha[0] else None
+            linhas = self._banco.execute(
+                'SELECT completo, dados FROM versoes WHERE chave = ? AND versao <= ? ORDER BY versao',
+                (chave, versao)
+            ).fetchall()
+        if len(linhas) != versao:
+            return None
+
+        texto = []
+        for completo, dados in linhas:
+            dados = zlib.decompress(dados).decode('utf-8')
+            if completo:
+                texto = dados.splitlines(keepends=True)
+            else:
+                texto = aplicar_diff(texto, json.loads(dados))
+        return ''.join(texto)
+
+    def fechar(self):
+        with self._lock:
+            self._banco.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+class Monitor:
+    """
+    Agendador de verificações periódicas
+
+    Uma fila de prioridade (heap) guarda o próximo horário de cada URL; a
+    thread do agendador dorme até o primeiro vencimento (ou até uma
+    verificação terminar) e só então envia as URLs vencidas para o pool, sem
+    nunca passar de ``concorrencia`` verificações simultâneas. Sem nada
+    vencido o processo fica parado, então milhares de URLs custam só a
+    memória do heap.
+    """
+
+    def __init__(self, itens, historico, cliente=None, concorrencia=8, jitter=JITTER_PADRAO,
+                 parser=None, ao_verificar=None):
+        """
+        Args:
+            itens (list): Tuplas (url, intervalo em segundos)
+            historico (HistoricoMudancas): Onde ficam estado e versões
+            cliente (ClienteHTTP): Cliente compartilhado (None = cria um, sem cache)
+            concorrencia (int): Verificações simultâneas
+            jitter (float): Variação aleatória do intervalo (0.1 = ±10%)
+            parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+            ao_verificar (callable): Chamada com o dicionário de cada verificação
+        """
+        self.itens = list(itens)
+        self.historico = historico
+        self.concorrencia = max(1, concorrencia)
+        self.jitter = max(0.0, min(jitter, 1.0))
+        self.parser = parser
+        self.ao_verificar = ao_verificar
+        self._cliente_proprio = cliente is None
+        self.cliente = cliente or ClienteHTTP(conexoes_por_host=2, hosts_no_pool=max(20, self.concorrencia))
+        self._parar = threading.Event()
+        self.contadores = dict.fromkeys(
+            (RESULTADO_PRIMEIRA, RESULTADO_MUDOU, RESULTADO_NAO_MODIFICADA, RESULTADO_IGUAL, RESULTADO_ERRO), 0
+        )
+
+    def _proximo(self, intervalo):
+        return intervalo * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def parar(self):
+        """Pede para executar() terminar (as verificações em andamento acabam antes)"""
+        self._parar.set()
+
+    def executar(self, max_verificacoes=None):
+        """
+        Roda o agendador até parar() (ou até ``max_verificacoes`` verificações)
+
+        Returns:
+            dict: Contagem de verificações por resultado
+        """
+        agora = time.monotonic()
+        # Primeira rodada espalhada na janela de jitter para não disparar tudo junto
+        fila = [(agora + random.uniform(0, intervalo * self.jitter), indice, url, intervalo)
+                for indice, (url, intervalo) in enumerate(self.itens)]
+        heapq.heapify(fila)
+
+        feitas = 0
+        enviadas = 0
+        em_andamento = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+                while not self._parar.is_set():
+                    agora = time.monotonic()
+                    while (fila and fila[0][0] <= agora and len(em_andamento) < self.concorrencia
+                           and (max_verificacoes is None or enviadas < max_verificacoes)):
+                        _, indice, url, intervalo = heapq.heappop(fila)
+                        em_andamento[executor.submit(self.verificar, url)] = (indice, url, intervalo)
+                        enviadas += 1
+
+                    if max_verificacoes is not None and enviadas >= max_verificacoes and not em_andamento:
+                        break
+
+                    espera = ESPERA_MAXIMA
+                    if fila and len(em_andamento) < self.concorrencia:
+                        espera = min(espera, max(0.0, fila[0][0] - agora))
+                    if em_andamento:
+                        concluidas, _ = wait(em_andamento, timeout=espera, return_when=FIRST_COMPLETED)
+                    else:
+                        self._parar.wait(espera)
+                        concluidas = ()
+
+                    for futuro in concluidas:
+                        indice, url, intervalo = em_andamento.pop(futuro)
+                        resultado = futuro.result()
+                        feitas += 1
+                        self.contadores[resultado['resultado']] += 1
+                        heapq.heappush(fila, (time.monotonic() + self._proximo(intervalo), indice, url, intervalo))
+                        if self.ao_verificar:
+                            self.ao_verificar(resultado)
+        finally:
+            if self._cliente_proprio:
+                self.cliente.fechar()
+        return dict(self.contadores, verificacoes=feitas)
+
+    def verificar(self, url):
+        """
+        Verifica uma URL agora
+
+        Returns:
+            dict: url, resultado ('primeira', 'mudou', 'nao_modificada',
+            'igual' ou 'erro'), status, versao, adicionadas, removidas,
+            duracao e erro
+        """
+        inicio = time.perf_counter()
+        resultado = {'url': url, 'resultado': RESULTADO_ERRO, 'status': None, 'versao': None,
+                     'adicionadas': 0, 'removidas': 0, 'erro': None}
+        try:
+            estado = self.historico.estado(url)
+            headers = {}
+            if estado:
+                if estado['etag']:
+                    headers['If-None-Match'] = estado['etag']
+                if estado['last_modified']:
+                    headers['If-Modified-Since'] = estado['last_modified']
+
+            response, corpo = self.cliente.baixar(url, modo_cache=MODO_DESLIGADO, headers=headers)
+            resultado['status'] = response.status_code
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            with corpo:
+                if response.status_code == 304:
+                    self.historico.registrar_verificacao(url, etag, last_modified)
+                    resultado['resultado'] = RESULTADO_NAO_MODIFICADA
+                    resultado['versao'] = estado['versao'] if estado else None
+                    return resultado
+
+                # Bytes iguais (a menos de espaços): nem monta a árvore
+                with medir_fase('parse'):
+                    impressao_bruta = impressao_rapida(corpo.iterar())
+                if estado and estado['impressao_bruta'] == impressao_bruta:
+                    self.historico.registrar_verificacao(url, etag, last_modified)
+                    resultado['resultado'] = RESULTADO_IGUAL
+                    resultado['versao'] = estado['versao']
+                    return resultado
+
+                # Conteúdo normalizado: a árvore reformatada ignora diferenças
+                # de espaço e de formatação da marcação original
+                with medir_fase('parse'):
+                    soup = criar_soup(corpo.abrir(), self.parser, from_encoding=corpo.codificacao())
+                with medir_fase('serializacao'):
+                    texto = ''.join(fragmentos_pretty(soup))
+            del soup
+            impressao = impressao_digital(texto)
+
+            if estado and estado['impressao'] == impressao:
+                self.historico.registrar_verificacao(url, etag, last_modified, impressao_bruta)
+                resultado['resultado'] = RESULTADO_IGUAL
+                resultado['versao'] = estado['versao']
+                return resultado
+
+            versao = self.historico.registrar_versao(url, texto, impressao, etag, last_modified, impressao_bruta)
+            resultado.update(versao)
+            resultado['resultado'] = RESULTADO_PRIMEIRA if versao['versao'] == 1 else RESULTADO_MUDOU
+
+        except Exception as e:
+            resultado['erro'] = f"[{type(e).__name__}] {str(e)[:200]}"
+        finally:
+            resultado['duracao'] = time.perf_counter() - inicio
+        return resultado
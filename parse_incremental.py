@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Parse incremental
+Monta a árvore do lxml enquanto o corpo ainda está chegando, alimentando o
+parser push bloco a bloco, para o parse acontecer junto com o download em
+vez de depois dele
+"""
+
+import time
+
+from codificacao_html import LIMITE_META, codificacao_declarada
+from metricas import registrar_fase
+
+# O feed() do lxml paga um custo fixo por chamada: blocos pequenos (rede
+# lenta, chunked) são juntados até esse tamanho antes de ir para o parser
+TAMANHO_MINIMO_FEED = 64 * 1024
+
+def parse_incremental_disponivel():
+    """True se o lxml (parser push em C) estiver instalado"""
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class ArvoreIncremental:
+    """
+    Consumidor dos blocos de ClienteHTTP.baixar(consumidor=...)
+
+    Guarda só o começo do corpo até descobrir a codificação declarada (BOM,
+    Content-Type ou <meta>, ver LIMITE_META); sem declaração, aposta em
+    UTF-8. Depois disso os blocos vão para o ``etree.HTMLParser`` em lotes
+    de pelo menos TAMANHO_MINIMO_FEED bytes.
+    No fim, ``concluir()`` só aceita a árvore se ela viu o corpo inteiro e a
+    aposta bateu com a codificação resolvida do documento; senão devolve
+    None e quem chamou faz o parse normal a partir do corpo.
+
+    O tempo de ``feed()`` é somado à fase 'parse', que então se sobrepõe à
+    fase 'download'.
+    """
+
+    def __init__(self):
+        self.recebidos = 0
+        self.codificacao = None
+        self.falhou = False
+        self._parser = None
+        self._pendente = []
+        self._tamanho_pendente = 0
+        self._content_type = None
+
+    def iniciar(self, content_type=None):
+        """Começa (ou recomeça, num novo download completo) do zero"""
+        self.recebidos = 0
+        self.codificacao = None
+        self.falhou = False
+        self._parser = None
+        self._pendente = []
+        self._tamanho_pendente = 0
+        self._content_type = content_type
+        # PDF, imagem, JSON...: nem adianta montar a árvore
+        if content_type and 'html' not in content_type.lower() and 'xml' not in content_type.lower():
+            self.falhou = True
+
+    def alimentar(self, bloco):
+        """Entrega o próximo bloco do corpo ao parser"""
+        self.recebidos += len(bloco)
+        if self.falhou:
+            return
+        self._pendente.append(bloco)
+        self._tamanho_pendente += len(bloco)
+        minimo = LIMITE_META if self._parser is None else TAMANHO_MINIMO_FEED
+        if self._tamanho_pendente >= minimo:
+            self._descarregar()
+
+    def _descarregar(self):
+        """Entrega ao parser (criado no primeiro lote) o que está pendente"""
+        dados = b''.join(self._pendente)
+        self._pendente = []
+        self._tamanho_pendente = 0
+        if self._parser is None:
+            self._criar_parser(dados)
+        self._alimentar_parser(dados)
+
+    def _criar_parser(self, inicio):
+        from lxml import etree
+
+        declarada = codificacao_declarada(inicio, self._content_type)
+        self.codificacao = declarada[0] if declarada else 'utf-8'
+        self._parser = etree.HTMLParser(encoding=self.codificacao)
+
+    def _alimentar_parser(self, bloco):
+        inicio = time.perf_counter()
+        try:
+            self._parser.feed(bloco)
+        except Exception:
+            # Documento que o parser push não aceita: fica para o parse normal
+            self.falhou = True
+        registrar_fase('parse', time.perf_counter() - inicio)
+
+    def concluir(self, corpo):
+        """
+        Fecha o parser e devolve a raiz da árvore
+
+        Args:
+            corpo (CorpoBaixado): Corpo completo, para conferir tamanho e codificação
+
+        Returns:
+            lxml.etree._Element: Raiz do documento, ou None se a árvore não
+            puder ser usada (corpo veio do cache, download recomeçado no
+            meio, codificação diferente da apostada, erro do parser)
+        """
+        if self.falhou or self.recebidos != corpo.tamanho or self.recebidos == 0:
+            return None
+        if self._pendente:
+            self._descarregar()
+            if self.falhou:
+                return None
+        if corpo.codificacao() != self.codificacao:
+            return None
+        inicio = time.perf_counter()
+        try:
+            raiz = self._parser.close()
+        except Exception:
+            raiz = None
+        registrar_fase('parse', time.perf_counter() - inicio)
+        self._parser = None
+        return raiz
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Parsers
+Escolha do parser usado pelo BeautifulSoup (lxml, html.parser ou html5lib)
+e verificação de compatibilidade entre eles
+"""
+
+import hashlib
+import importlib.util
+import time
+
+PARSER_AUTOMATICO = 'auto'
+
+# Ordem de preferência: lxml (C, mais rápido) antes do html.parser (Python puro)
+PARSERS_SUPORTADOS = ('lxml', 'html.parser', 'html5lib')
+PARSERS_AUTOMATICOS = ('lxml', 'html.parser')
+
+# Módulo que precisa estar instalado para cada parser
+_MODULOS_PARSER = {
+    'lxml': 'lxml',
+    'html.parser': 'html.parser',
+    'html5lib': 'html5lib',
+}
+
+def parser_disponivel(nome):
+    """True se o parser estiver instalado"""
+    modulo = _MODULOS_PARSER.get(nome)
+    return modulo is not None and importlib.util.find_spec(modulo) is not None
+
+def parsers_disponiveis():
+    """Lista os parsers suportados que estão instalados"""
+    return [nome for nome in PARSERS_SUPORTADOS if parser_disponivel(nome)]
+
+def escolher_parser(preferido=None):
+    """
+    Resolve o nome do parser a ser usado
+
+    Args:
+        preferido (str): 'lxml', 'html.parser', 'html5lib', 'auto' ou None
+
+    Returns:
+        str: O parser pedido, se estiver instalado; senão o mais rápido disponível
+    """
+    if preferido and preferido != PARSER_AUTOMATICO and parser_disponivel(preferido):
+        return preferido
+    for nome in PARSERS_AUTOMATICOS:
+        if parser_disponivel(nome):
+            return nome
+    return 'html.parser'
+
+def criar_soup(conteudo, parser=None, **kwargs):
+    """
+    Faz o parse com BeautifulSoup usando o parser escolhido
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        parser (str): Parser preferido (None/'auto' = mais rápido disponível)
+        **kwargs: Argumentos extras repassados para BeautifulSoup
+
+    Returns:
+        BeautifulSoup: Árvore do documento
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(conteudo, escolher_parser(parser), **kwargs)
+
+def _estrutura(soup):
+    """Sequência (profundidade, tag) de todos os elementos, em ordem"""
+    # A profundidade é relativa ao <html>, pois alguns parsers criam nós extras acima
+    pilha = [(soup.html or soup, 0)]
+    while pilha:
+        tag, nivel = pilha.pop()
+        yield (nivel, tag.name)
+        filhos = [filho for filho in tag.children if filho.name]
+        pilha.extend((filho, nivel + 1) for filho in reversed(filhos))
+
+def comparar_parsers(conteudo, parsers=None):
+    """
+    Faz o parse do mesmo documento com vários parsers e compara as árvores
+
+    Documentos com HTML malformado costumam gerar árvores diferentes em cada
+    parser (tags fechadas em lugares diferentes, <tbody> inserido etc.).
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        parsers (list): Parsers para comparar (None = todos os instalados)
+
+    Returns:
+        dict: compativeis (bool), resultados por parser (tags, assinatura,
+        tempo) e divergencia (primeira diferença encontrada ou None)
+    """
+    from bs4 import BeautifulSoup
+
+    if hasattr(conteudo, 'read'):
+        conteudo = conteudo.read()
+    parsers = [nome for nome in (parsers or PARSERS_SUPORTADOS) if parser_disponivel(nome)]
+
+    resultados = {}
+    estruturas = {}
+    for nome in parsers:
+        inicio = time.perf_counter()
+        soup = BeautifulSoup(conteudo, nome)
+        tempo = time.perf_counter() - inicio
+        estrutura = list(_estrutura(soup))
+        estruturas[nome] = estrutura
+        resultados[nome] = {
+            'tags': len(estrutura),
+            'assinatura': hashlib.sha1(repr(estrutura).encode('utf-8')).hexdigest()[:12],
+            'tempo': tempo,
+        }
+
+    divergencia = None
+    if len(parsers) > 1:
+        referencia = parsers[0]
+        for nome in parsers[1:]:
+            if resultados[nome]['assinatura'] == resultados[referencia]['assinatura']:
+                continue
+            a, b = estruturas[referencia], estruturas[nome]
+            posicao = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+            divergencia = {
+                'parsers': (referencia, nome),
+                'posicao': posicao,
+                referencia: a[posicao] if posicao < len(a) else None,
+                nome: b[posicao] if posicao < len(b) else None,
+            }
+            break
+
+    return {
+        'compativeis': divergencia is None,
+        'resultados': resultados,
+        'divergencia': divergencia,
+    }
+
+def mostrar_comparacao(comparacao):
+    """Mostra no console o resultado de comparar_parsers()"""
+    print("\n" + "=" * 60)
+    print("🧪 COMPARAÇÃO DE PARSERS")
+    print("=" * 60)
+    for nome, dados in comparacao['resultados'].items():
+        print(f"  • {nome:<12} {dados['tags']:>8,} tags | {dados['tempo'] * 1000:>9.1f} ms | {dados['assinatura']}")
+
+    if comparacao['compativeis']:
+        print("✅ Todos os parsers geraram a mesma árvore")
+    else:
+        divergencia = comparacao['divergencia']
+        a, b = divergencia['parsers']
+        print(f"⚠️ Árvores diferentes entre {a} e {b} no elemento #{divergencia['posicao']:,}:")
+        print(f"  {a}: {divergencia[a]}")
+        print(f"  {b}: {divergencia[b]}")
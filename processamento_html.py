@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Processamento do corpo
+Parse, seleção e serialização de um corpo já baixado no modo de saída
+pedido, compartilhados pela CLI, pelo servidor e pelos processos do
+estágio de CPU
+"""
+
+import os
+
+from metricas import medir_fase, registrar_saida
+from parsers_html import criar_soup
+from selecao_html import fragmentos_selecao, gravar_selecao, selecionar
+from serializacao_html import (MODO_ARTEFATOS, MODO_PRETTY, MODO_RAW, escrever_fragmentos, fragmentos_saida,
+                               gravar_bruto, gravar_html)
+
+def gravar_saida(corpo, nome_arquivo, modo_saida=MODO_PRETTY, parser=None, seletor=None, xpath=None):
+    """
+    Grava o corpo no arquivo no modo de saída pedido, aos poucos
+
+    Com seletor CSS ou XPath, só os trechos encontrados são gravados.
+
+    Returns:
+        int: Bytes gravados (modo raw) ou caracteres gravados (demais modos)
+    """
+    if seletor or xpath:
+        with medir_fase('parse'):
+            trechos = selecionar(corpo.abrir(), seletor, xpath, parser, corpo.codificacao(), corpo.arvore)
+        tamanho = gravar_selecao(trechos, nome_arquivo, modo_saida)
+    elif modo_saida == MODO_RAW:
+        tamanho = gravar_bruto(corpo.abrir(), nome_arquivo)
+    elif modo_saida == MODO_ARTEFATOS:
+        artefatos = artefatos_corpo(corpo)
+        with open(nome_arquivo, 'w', encoding='utf-8') as f:
+            tamanho = escrever_fragmentos([artefatos.como_json()], f)
+    else:
+        with medir_fase('parse'):
+            soup = criar_soup(corpo.abrir(), parser, from_encoding=corpo.codificacao())
+        tamanho = gravar_html(soup, nome_arquivo, modo_saida)
+    registrar_saida(os.path.getsize(nome_arquivo))
+    return tamanho
+
+def conteudo_saida(corpo, modo_saida=MODO_PRETTY, parser=None, seletor=None, xpath=None):
+    """
+    HTML no modo de saída pedido, como string (para o arquivamento em JSON lines)
+
+    Returns:
+        str: Documento ou trechos processados (JSON no modo artifacts); None
+        no modo raw sem seletor
+    """
+    if seletor or xpath:
+        with medir_fase('parse'):
+            trechos = selecionar(corpo.abrir(), seletor, xpath, parser, corpo.codificacao(), corpo.arvore)
+        with medir_fase('serializacao'):
+            return ''.join(fragmentos_selecao(trechos, modo_saida))
+    if modo_saida == MODO_RAW:
+        return None
+    if modo_saida == MODO_ARTEFATOS:
+        artefatos = artefatos_corpo(corpo)
+        with medir_fase('serializacao'):
+            return artefatos.como_json()
+    with medir_fase('parse'):
+        soup = criar_soup(corpo.abrir(), parser, from_encoding=corpo.codificacao())
+    with medir_fase('serializacao'):
+        return ''.join(fragmentos_saida(soup, modo_saida))
+
+def artefatos_corpo(corpo):
+    """Texto, links, metadados e tabelas do corpo, em uma passada (ver artefatos_html)"""
+    from artefatos_html import extrair_artefatos
+
+    with medir_fase('parse'):
+        return extrair_artefatos(corpo.abrir(), corpo.url or '', corpo.codificacao())
+
+def decodificar_corpo(corpo):
+    """Decodifica os bytes do corpo com a codificação resolvida do documento"""
+    return corpo.ler().decode(corpo.codificacao(), errors='replace')
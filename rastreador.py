@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Rastreador
+Segue os links das páginas extraídas (mesmo host, prefixo, profundidade e
+limite de páginas), com URLs deduplicadas e concorrência limitada por host
+"""
+
+import hashlib
+import math
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from cache_http import normalizar_url
+from cliente_http import ClienteHTTP
+from extrator_html import _extrair_silencioso, extensao_saida, normalizar_esquema, resumir_lote
+from serializacao_html import MODO_PRETTY
+
+class ConjuntoUrls:
+    """
+    Conjunto exato de URLs já vistas
+
+    Guarda só um resumo de 8 bytes (BLAKE2b) de cada URL normalizada em vez
+    da string inteira.
+    """
+
+    def __init__(self):
+        self._resumos = set()
+
+    @staticmethod
+    def _resumo(url):
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+
+    def adicionar(self, url):
+        """Adiciona a URL; retorna True se ela ainda não tinha sido vista"""
+        resumo = self._resumo(url)
+        if resumo in self._resumos:
+            return False
+        self._resumos.add(resumo)
+        return True
+
+    def __contains__(self, url):
+        return self._resumo(url) in self._resumos
+
+    def __len__(self):
+        return len(self._resumos)
+
+class FiltroBloom:
+    """
+    Filtro de Bloom para rastreamentos com milhões de URLs
+
+    Usa memória fixa, calculada pela capacidade e pela taxa de falso
+    positivo. Um falso positivo faz uma URL nova ser tratada como já vista
+    (e pulada); URLs vistas nunca são repetidas.
+    """
+
+    def __init__(self, capacidade, taxa_erro=0.001):
+        """
+        Args:
+            capacidade (int): Quantidade esperada de URLs
+            taxa_erro (float): Probabilidade de falso positivo com a capacidade cheia
+        """
+        capacidade = max(1, capacidade)
+        self.bits = max(8, math.ceil(-capacidade * math.log(taxa_erro) / (math.log(2) ** 2)))
+        self.funcoes = max(1, round(self.bits / capacidade * math.log(2)))
+        self._mapa = bytearray((self.bits + 7) // 8)
+        self._quantidade = 0
+
+    def _posicoes(self, url):
+        # Hash duplo: k posições a partir de dois valores de 64 bits
+        resumo = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(resumo[:8], 'little')
+        h2 = int.from_bytes(resumo[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.funcoes)]
+
+    def adicionar(self, url):
+        """Adiciona a URL; retorna True se ela (provavelmente) não tinha sido vista"""
+        nova = False
+        for posicao in self._posicoes(url):
+            byte, bit = divmod(posicao, 8)
+            if not self._mapa[byte] & (1 << bit):
+                self._mapa[byte] |= 1 << bit
+                nova = True
+        if nova:
+            self._quantidade += 1
+        return nova
+
+    def __contains__(self, url):
+        return all(self._mapa[p // 8] & (1 << (p % 8)) for p in self._posicoes(url))
+
+    def __len__(self):
+        return self._quantidade
+
+class EscopoRastreamento:
+    """Regras de quais links o rastreador segue"""
+
+    def __init__(self, mesmo_host=True, prefixos=None, profundidade_maxima=2, max_paginas=1000):
+        """
+        Args:
+            mesmo_host (bool): Só seguir links para os hosts das URLs iniciais
+            prefixos (list): Só seguir URLs que começam com um desses prefixos
+                (comparados já normalizados; None = qualquer caminho)
+            profundidade_maxima (int): Cliques a partir das URLs iniciais (0 = só elas)
+            max_paginas (int): Total de páginas baixadas (None = sem limite)
+        """
+        self.mesmo_host = mesmo_host
+        self.prefixos = [normalizar_url(prefixo) for prefixo in (prefixos or [])]
+        self.profundidade_maxima = profundidade_maxima
+        self.max_paginas = max_paginas
+        self.hosts = set()
+
+    def adicionar_inicial(self, url):
+        """Registra o host de uma URL inicial"""
+        self.hosts.add(_host(normalizar_url(url)))
+
+    def permite(self, url, profundidade):
+        """True se a URL (normalizada) está dentro do escopo"""
+        if profundidade > self.profundidade_maxima:
+            return False
+        if self.mesmo_host and _host(url) not in self.hosts:
+            return False
+        if self.prefixos and not url.startswith(tuple(self.prefixos)):
+            return False
+        return True
+
+def _host(url):
+    """host[:porta] da URL, em minúsculas"""
+    return urlsplit(url).netloc.lower()
+
+def rastrear(urls, escopo=None, concorrencia=16, por_host=2, cliente=None, visto=None,
+             salvar_arquivo=True, ao_concluir=None, parser=None, modo_saida=MODO_PRETTY, arquivador=None):
+    """
+    Extrai as URLs iniciais e as páginas ligadas a elas, dentro do escopo
+
+    Um único despachante mantém uma fila por host e só envia uma página para
+    o pool de threads quando o host dela tem menos de ``por_host`` downloads
+    em andamento; os hosts são atendidos em rodízio. Assim nenhum worker fica
+    parado esperando vaga de um host ocupado e nenhuma origem recebe mais que
+    ``por_host`` requisições simultâneas.
+
+    Args:
+        urls (list): URLs iniciais (profundidade 0)
+        escopo (EscopoRastreamento): Regras de escopo (None = padrão)
+        concorrencia (int): Downloads simultâneos no total
+        por_host (int): Downloads simultâneos por host
+        cliente (ClienteHTTP): Cliente compartilhado (None = cria um)
+        visto (ConjuntoUrls | FiltroBloom): Conjunto de URLs já vistas
+        salvar_arquivo (bool): Se True, salva cada página em arquivo próprio
+        ao_concluir (callable): Função chamada com cada resultado ao terminar
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        modo_saida (str): 'pretty', 'minified' ou 'raw'
+        arquivador (Arquivador | ArmazemConteudo): Grava as páginas em arquivos
+            compactados ou no armazém por conteúdo
+
+    Returns:
+        tuple: (lista de resultados na ordem de conclusão, dicionário de resumo)
+    """
+    escopo = escopo or EscopoRastreamento()
+    visto = visto if visto is not None else ConjuntoUrls()
+    concorrencia = max(1, concorrencia)
+    por_host = max(1, por_host)
+
+    cliente_proprio = cliente is None
+    if cliente_proprio:
+        cliente = ClienteHTTP(conexoes_por_host=por_host, hosts_no_pool=max(20, concorrencia))
+
+    filas = {}             # host -> deque de (url, profundidade)
+    rodizio = deque()      # hosts com URLs esperando
+    ativos = Counter()     # host -> downloads em andamento
+    contadores = Counter()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def enfileirar(url, profundidade):
+        try:
+            chave = normalizar_url(url)
+        except ValueError:
+            contadores['invalidas'] += 1
+            return
+        if not chave.startswith(('http://', 'https://')):
+            contadores['invalidas'] += 1
+            return
+        if not escopo.permite(chave, profundidade):
+            contadores['fora_do_escopo'] += 1
+            return
+        if not visto.adicionar(chave):
+            contadores['repetidas'] += 1
+            return
+        if escopo.max_paginas is not None and contadores['descobertas'] >= escopo.max_paginas:
+            contadores['acima_do_limite'] += 1
+            return
+        contadores['descobertas'] += 1
+        host = _host(chave)
+        if host not in filas:
+            filas[host] = deque()
+            rodizio.append(host)
+        filas[host].append((url, profundidade))
+
+    for url in urls:
+        url = normalizar_esquema(url.strip())
+        escopo.adicionar_inicial(url)
+    for url in urls:
+        enfileirar(normalizar_esquema(url.strip()), 0)
+
+    resultados = []
+    futuros = {}
+    inicio = time.perf_counter()
+
+    def despachar(executor):
+        # Rodízio entre hosts: cada volta envia no máximo uma URL por host
+        voltas_sem_envio = 0
+        while rodizio and len(futuros) < concorrencia and voltas_sem_envio < len(rodizio):
+            host = rodizio[0]
+            rodizio.rotate(-1)
+            fila = filas[host]
+            if ativos[host] >= por_host:
+                voltas_sem_envio += 1
+                continue
+            url, profundidade = fila.popleft()
+            if not fila:
+                del filas[host]
+                rodizio.remove(host)
+            voltas_sem_envio = 0
+            ativos[host] += 1
+            indice = contadores['enviadas']
+            contadores['enviadas'] += 1
+            nome_arquivo = None
+            if salvar_arquivo:
+                nome_arquivo = f"html_extraido_{timestamp}_{indice:05d}{extensao_saida(modo_saida)}"
+            # Na profundidade máxima os links seriam todos descartados: nem extrai
+            futuro = executor.submit(
+                _extrair_silencioso, url, nome_arquivo, cliente,
+                parser=parser, modo_saida=modo_saida, coletar_links=profundidade < escopo.profundidade_maxima,
+                arquivador=arquivador if salvar_arquivo else None
+            )
+            futuros[futuro] = (host, profundidade)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            despachar(executor)
+            while futuros:
+                concluidos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    host, profundidade = futuros.pop(futuro)
+                    ativos[host] -= 1
+                    resultado = futuro.result()
+                    resultado['profundidade'] = profundidade
+
+                    # Redirecionamento: o destino também conta como visto
+                    url_final = resultado.get('url_final')
+                    if url_final and url_final != resultado['url']:
+                        try:
+                            visto.adicionar(normalizar_url(url_final))
+                        except ValueError:
+                            pass
+
+                    for link in resultado.pop('links', None) or []:
+                        enfileirar(link, profundidade + 1)
+                    resultados.append(resultado)
+                    if ao_concluir:
+                        ao_concluir(resultado)
+                despachar(executor)
+        duracao = time.perf_counter() - inicio
+
+        resumo = resumir_lote(resultados, duracao)
+        resumo['rastreamento'] = {
+            'descobertas': contadores['descobertas'],
+            'repetidas': contadores['repetidas'],
+            'fora_do_escopo': contadores['fora_do_escopo'],
+            'acima_do_limite': contadores['acima_do_limite'],
+            'invalidas': contadores['invalidas'],
+            'hosts': len({_host(r['url']) for r in resultados}),
+            'profundidade': max((r['profundidade'] for r in resultados), default=0),
+        }
+        resumo['pool'] = cliente.estatisticas()
+        if cliente.cache is not None:
+            resumo['cache'] = cliente.cache.estatisticas()
+    finally:
+        if cliente_proprio:
+            cliente.fechar()
+
+    return resultados, resumo
+
+def mostrar_resumo_rastreamento(resumo):
+    """Mostra no console os números da fronteira do rastreamento"""
+    rastreamento = resumo['rastreamento']
+    print(
+        f"🕸️ Rastreamento: {rastreamento['descobertas']:,} páginas descobertas em "
+        f"{rastreamento['hosts']:,} host(s), profundidade {rastreamento['profundidade']}"
+    )
+    print(
+        f"   {rastreamento['repetidas']:,} links repetidos | {rastreamento['fora_do_escopo']:,} fora do escopo | "
+        f"{rastreamento['acima_do_limite']:,} acima do limite de páginas"
+    )
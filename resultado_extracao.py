@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Resultado estruturado
+Tudo o que uma extração produziu (URL final, status, headers, tamanhos,
+tempos, erro e conteúdo ou arquivo gerado) em um objeto, para quem usa o
+extrator como biblioteca ou lê o NDJSON do modo pipeline
+"""
+
+class ResultadoExtracao:
+    """
+    Resultado de extrair_resultado()
+
+    Em caso de erro, ``sucesso`` fica False e ``tipo_erro``/``erro`` dizem o
+    que aconteceu; os campos que chegaram a ser preenchidos (status de um
+    erro HTTP, por exemplo) continuam disponíveis.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.url_final = None
+        self.sucesso = False
+        self.status = None
+        self.headers = {}
+        self.origem_cache = None
+        self.bytes_recebidos = 0
+        self.caracteres = 0
+        self.codificacao = None
+        self.conteudo = None
+        # ArtefatosHTML no modo de saída 'artifacts' (conteudo traz o mesmo em JSON)
+        self.artefatos = None
+        self.arquivo = None
+        self.erro = None
+        self.tipo_erro = None
+        self.metricas = None
+
+    @property
+    def duracao(self):
+        """Segundos da extração inteira (0 se ainda não terminou)"""
+        return self.metricas.duracao if self.metricas is not None else 0.0
+
+    @property
+    def tentativas(self):
+        """Requisições feitas até o resultado (1 = sem retentativa)"""
+        return self.metricas.tentativas if self.metricas is not None else 1
+
+    @property
+    def fases(self):
+        """Tempo de cada fase em segundos (ver metricas.FASES)"""
+        return self.metricas.como_dict()['fases'] if self.metricas is not None else {}
+
+    def como_dict(self, incluir_conteudo=True):
+        """
+        Dicionário pronto para JSON
+
+        Args:
+            incluir_conteudo (bool): Se False, omite o HTML (só o caminho do
+                arquivo); no modo 'artifacts', os artefatos vão em 'artefatos'
+                no lugar do HTML
+        """
+        dados = {
+            'url': self.url,
+            'url_final': self.url_final,
+            'sucesso': self.sucesso,
+            'status': self.status,
+            'headers': self.headers,
+            'origem_cache': self.origem_cache,
+            'bytes': self.bytes_recebidos,
+            'caracteres': self.caracteres,
+            'codificacao': self.codificacao,
+            'arquivo': self.arquivo,
+            'erro': self.erro,
+            'tipo_erro': self.tipo_erro,
+            'tentativas': self.tentativas,
+            'duracao': round(self.duracao, 6),
+            'fases': self.fases,
+        }
+        if incluir_conteudo and self.artefatos is not None:
+            dados['artefatos'] = self.artefatos.como_dict()
+        elif incluir_conteudo:
+            dados['html'] = self.conteudo
+        return dados
+
+    def __repr__(self):
+        estado = f"status={self.status}" if self.sucesso else f"erro={self.tipo_erro}"
+        return f"<ResultadoExtracao {self.url} {estado}>"
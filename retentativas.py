@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Retentativas e limite por host
+Quando repetir uma requisição que falhou (backoff exponencial com jitter,
+respeitando Retry-After) e quantas requisições por segundo cada host recebe
+(balde de fichas compartilhado por todas as threads)
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+# Respostas que costumam passar sozinhas: sobrecarga, limite de taxa, gateway
+STATUS_REPETIVEIS = (408, 425, 429, 500, 502, 503, 504)
+
+TENTATIVAS_PADRAO = 3
+ESPERA_BASE_PADRAO = 0.5
+ESPERA_MAXIMA_PADRAO = 30.0
+
+def interpretar_retry_after(valor):
+    """
+    Segundos pedidos por um header Retry-After ('120' ou data HTTP)
+
+    Returns:
+        float: Segundos a esperar (0 se a data já passou), ou None se o
+        valor estiver ausente ou inválido
+    """
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+class PoliticaRetentativas:
+    """
+    Quando e quanto esperar antes de repetir uma requisição que falhou
+
+    Repete timeouts, conexões recusadas/derrubadas e respostas com status em
+    ``status``. A espera cresce em dobro a cada tentativa (espera_base, 2x,
+    4x...) até ``espera_maxima``, sorteada entre 0 e esse teto (jitter
+    completo) para as threads não voltarem todas ao mesmo tempo. Um
+    Retry-After da resposta substitui o cálculo; se ele pedir mais que
+    ``espera_maxima``, a falha é repassada sem nova tentativa.
+    """
+
+    def __init__(self, tentativas=TENTATIVAS_PADRAO, espera_base=ESPERA_BASE_PADRAO,
+                 espera_maxima=ESPERA_MAXIMA_PADRAO, jitter=True, status=STATUS_REPETIVEIS):
+        """
+        Args:
+            tentativas (int): Total de tentativas, contando a primeira (1 = sem repetir)
+            espera_base (float): Espera antes da segunda tentativa, sem jitter (segundos)
+            espera_maxima (float): Teto de cada espera (segundos)
+            jitter (bool): Sortear a espera entre 0 e o valor calculado
+            status (tuple): Status HTTP que valem nova tentativa
+        """
+        self.tentativas = max(1, tentativas)
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.jitter = jitter
+        self.status = frozenset(status)
+
+    def repetivel(self, erro):
+        """True se a falha costuma ser temporária"""
+        if isinstance(erro, requests.exceptions.HTTPError):
+            return erro.response is not None and erro.response.status_code in self.status
+        # Erro de certificado não melhora tentando de novo
+        if isinstance(erro, requests.exceptions.SSLError):
+            return False
+        return isinstance(erro, (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                                 requests.exceptions.ChunkedEncodingError))
+
+    def espera(self, erro, tentativa):
+        """
+        Segundos até a próxima tentativa
+
+        Args:
+            erro (Exception): Falha da tentativa que acabou de terminar
+            tentativa (int): Número dessa tentativa (a primeira é 1)
+
+        Returns:
+            float: Segundos a esperar, ou None para desistir e repassar o erro
+        """
+        if tentativa >= self.tentativas or not self.repetivel(erro):
+            return None
+        response = getattr(erro, 'response', None)
+        if response is not None:
+            pedida = interpretar_retry_after(response.headers.get('Retry-After'))
+            if pedida is not None:
+                return pedida if pedida <= self.espera_maxima else None
+        teto = min(self.espera_maxima, self.espera_base * 2 ** (tentativa - 1))
+        return random.uniform(0, teto) if self.jitter else teto
+
+class LimitadorPorHost:
+    """
+    Balde de fichas por host, compartilhado por todas as threads
+
+    Cada requisição gasta uma ficha; o balde enche ``taxa`` fichas por
+    segundo até ``rajada``. Sem ficha, a thread reserva a próxima e dorme
+    até ela existir, fora da trava, então hosts diferentes não se atrapalham.
+    ``pausar()`` segura o host inteiro (ex.: 429 com Retry-After), não só a
+    thread que recebeu a resposta.
+    """
+
+    def __init__(self, taxa, rajada=None):
+        """
+        Args:
+            taxa (float): Requisições por segundo permitidas em cada host
+            rajada (int): Requisições seguidas permitidas com o balde cheio
+                (None = uma, ou a taxa se ela passar de 1)
+        """
+        if taxa <= 0:
+            raise ValueError("a taxa deve ser maior que zero")
+        self.taxa = taxa
+        self.rajada = max(1.0, float(rajada if rajada is not None else taxa))
+        self._baldes = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc.lower()
+
+    def reservar(self, url):
+        """
+        Gasta uma ficha do host da URL
+
+        Returns:
+            float: Segundos que o chamador deve esperar antes de requisitar
+        """
+        host = self._host(url)
+        with self._lock:
+            agora = time.monotonic()
+            fichas, atualizado = self._baldes.get(host, (self.rajada, agora))
+            fichas = min(self.rajada, fichas + (agora - atualizado) * self.taxa) - 1
+            self._baldes[host] = (fichas, agora)
+        # Ficha negativa = reservada para daqui a -fichas/taxa segundos
+        return max(0.0, -fichas / self.taxa)
+
+    def aguardar(self, url):
+        """
+        Dorme até a requisição para o host da URL ser permitida
+
+        Returns:
+            float: Segundos esperados
+        """
+        espera = self.reservar(url)
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def pausar(self, url, segundos):
+        """Segura todas as requisições ao host da URL pelos próximos ``segundos``"""
+        host = self._host(url)
+        with self._lock:
+            agora = time.monotonic()
+            fichas, atualizado = self._baldes.get(host, (self.rajada, agora))
+            if agora > atualizado:
+                fichas = min(self.rajada, fichas + (agora - atualizado) * self.taxa)
+                atualizado = agora
+            # O balde "volta a encher" só no fim da pausa, com uma ficha só:
+            # o host recomeça na taxa normal em vez de receber uma rajada
+            self._baldes[host] = (min(fichas, 1.0), max(atualizado, agora + segundos))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Seleção de trechos
+Extrai só os trechos pedidos por seletor CSS ou XPath, limitando o parse
+à parte do documento que interessa sempre que possível
+"""
+
+import re
+from urllib.parse import urljoin
+
+from parsers_html import criar_soup, escolher_parser
+from serializacao_html import MODO_PRETTY, MODO_RAW, escrever_fragmentos, fragmentos_saida
+
+# Links que não levam a outra página
+_ESQUEMAS_IGNORADOS = ('#', 'javascript:', 'mailto:', 'tel:', 'data:')
+
+# Seletor composto simples: tag, #id, .classe ou combinações (div#main.box)
+_SELETOR_SIMPLES = re.compile(r'([a-zA-Z][\w-]*)?(#[\w-]+)?((?:\.[\w-]+)*)')
+
+def strainer_para_seletor(seletor):
+    """
+    Converte um seletor CSS simples em SoupStrainer
+
+    Só seletores sem combinadores, vírgulas ou pseudo-classes podem ser
+    convertidos; nos demais casos o documento inteiro precisa ser lido.
+
+    Args:
+        seletor (str): Seletor CSS
+
+    Returns:
+        SoupStrainer: Filtro equivalente ou None
+    """
+    from bs4 import SoupStrainer
+
+    encontrado = _SELETOR_SIMPLES.fullmatch(seletor.strip())
+    if not encontrado or not any(encontrado.groups()):
+        return None
+    nome, id_, classes = encontrado.groups()
+
+    atributos = {}
+    if id_:
+        atributos['id'] = id_[1:]
+    classes = [classe for classe in (classes or '').split('.') if classe]
+    if len(classes) == 1:
+        # Durante o parse o atributo class ainda é a string inteira ("box big")
+        atributos['class'] = re.compile(rf'(^|\s){re.escape(classes[0])}(\s|$)')
+    # Várias classes: o strainer filtra por tag/id e o select() confere as classes
+    return SoupStrainer(nome, atributos)
+
+def selecionar_css(conteudo, seletor, parser=None, codificacao=None):
+    """
+    Retorna os elementos que casam com o seletor CSS
+
+    Para seletores simples (``div``, ``#id``, ``.classe``, ``div#id.classe``)
+    o BeautifulSoup só monta na memória os elementos que casam (SoupStrainer),
+    sem materializar o resto da página.
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        seletor (str): Seletor CSS (sintaxe do soupsieve)
+        parser (str): Parser do BeautifulSoup (None = mais rápido disponível)
+        codificacao (str): Codificação já conhecida dos bytes (None = detectar)
+
+    Returns:
+        list: Tags encontradas, em ordem no documento
+    """
+    strainer = strainer_para_seletor(seletor)
+    # O html5lib ignora parse_only e sempre monta a árvore inteira
+    if strainer is not None and escolher_parser(parser) != 'html5lib':
+        soup = criar_soup(conteudo, parser, from_encoding=codificacao, parse_only=strainer)
+    else:
+        soup = criar_soup(conteudo, parser, from_encoding=codificacao)
+    return soup.select(seletor)
+
+def _raiz_lxml(conteudo, codificacao=None):
+    """Raiz do documento montada pelo lxml direto dos bytes/arquivo (None se vazio)"""
+    from lxml import etree
+
+    parser = etree.HTMLParser(encoding=codificacao)
+    if hasattr(conteudo, 'read'):
+        return etree.parse(conteudo, parser).getroot()
+    return etree.fromstring(conteudo, parser)
+
+def selecionar_xpath(conteudo, expressao, codificacao=None, raiz=None):
+    """
+    Avalia uma expressão XPath com o lxml
+
+    O lxml lê o documento direto do arquivo, em C, sem montar a árvore do
+    BeautifulSoup.
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        expressao (str): Expressão XPath 1.0
+        codificacao (str): Codificação já conhecida dos bytes (None = detectar)
+        raiz (lxml.etree._Element): Árvore já montada (ex.: durante o
+            download, ver parse_incremental); ``conteudo`` é ignorado
+
+    Returns:
+        list: Elementos do lxml e/ou textos (para text(), @atributo etc.)
+
+    Raises:
+        ImportError: Se o lxml não estiver instalado
+    """
+    if raiz is None:
+        raiz = _raiz_lxml(conteudo, codificacao)
+    if raiz is None:
+        return []
+
+    resultado = raiz.xpath(expressao)
+    if not isinstance(resultado, list):
+        # count(), boolean() etc. retornam um valor só
+        return [resultado]
+    return resultado
+
+def selecionar(conteudo, seletor=None, xpath=None, parser=None, codificacao=None, raiz=None):
+    """
+    Aplica o seletor CSS ou a expressão XPath (o que for informado)
+
+    Args:
+        raiz (lxml.etree._Element): Árvore já montada, usada pelo XPath
+
+    Returns:
+        list: Trechos encontrados
+    """
+    if xpath:
+        return selecionar_xpath(conteudo, xpath, codificacao, raiz)
+    return selecionar_css(conteudo, seletor, parser, codificacao)
+
+def selecionar_links(conteudo, url_base, parser=None, codificacao=None, raiz=None):
+    """
+    Lista os links (<a href> e <area href>) da página, já absolutos
+
+    Respeita o <base href> da página. Com lxml instalado o documento é lido
+    direto em C, sem montar a árvore do BeautifulSoup.
+
+    Args:
+        conteudo (bytes | str | arquivo): HTML de entrada
+        url_base (str): URL da página (depois de redirecionamentos)
+        parser (str): Parser do BeautifulSoup, usado só sem lxml
+        codificacao (str): Codificação já conhecida dos bytes (None = detectar)
+        raiz (lxml.etree._Element): Árvore já montada (ex.: durante o download)
+
+    Returns:
+        list: URLs sem repetição, em ordem no documento
+    """
+    try:
+        import lxml  # noqa: F401
+        lxml_disponivel = True
+    except ImportError:
+        lxml_disponivel = False
+
+    if raiz is not None or lxml_disponivel:
+        if raiz is None:
+            raiz = _raiz_lxml(conteudo, codificacao)
+        if raiz is None:
+            return []
+        base = raiz.xpath('string(//base/@href)')
+        hrefs = raiz.xpath('//a/@href | //area/@href')
+    else:
+        from bs4 import SoupStrainer
+
+        soup = criar_soup(conteudo, parser, from_encoding=codificacao,
+                          parse_only=SoupStrainer(['a', 'area', 'base']))
+        tag_base = soup.find('base', href=True)
+        base = tag_base['href'] if tag_base else ''
+        hrefs = [tag['href'] for tag in soup.find_all(['a', 'area'], href=True)]
+
+    if base.strip():
+        url_base = urljoin(url_base, base.strip())
+    return links_absolutos(hrefs, url_base)
+
+def links_absolutos(hrefs, url_base):
+    """
+    Deixa os hrefs absolutos, sem fragmento e sem repetição
+
+    Âncoras da própria página, javascript:, mailto:, tel: e data: são
+    descartados.
+
+    Args:
+        hrefs (iterable): Valores de href como estão no documento
+        url_base (str): URL contra a qual os relativos são resolvidos (já
+            considerando o <base href>)
+
+    Returns:
+        list: URLs em ordem de primeira aparição
+    """
+    links = {}
+    for href in hrefs:
+        href = href.strip()
+        if href and not href.lower().startswith(_ESQUEMAS_IGNORADOS):
+            links[urljoin(url_base, href).split('#', 1)[0]] = None
+    return list(links)
+
+def _fragmentos_item(item, modo):
+    """Pedaços de texto de um trecho selecionado"""
+    from bs4 import Tag
+
+    if isinstance(item, Tag):
+        if modo == MODO_RAW:
+            yield str(item)
+        else:
+            yield from fragmentos_saida(item, modo)
+    elif hasattr(item, 'xpath'):
+        from lxml import etree
+        yield etree.tostring(
+            item, encoding='unicode', method='html',
+            pretty_print=(modo == MODO_PRETTY), with_tail=False
+        )
+    else:
+        yield str(item)
+
+def fragmentos_selecao(trechos, modo=MODO_PRETTY):
+    """
+    Gera o texto dos trechos selecionados, um por linha
+
+    Args:
+        trechos (list): Resultado de selecionar()
+        modo (str): 'pretty', 'minified' ou 'raw' (HTML do trecho sem reformatar)
+
+    Yields:
+        str: Pedaços de texto
+    """
+    for item in trechos:
+        texto_final = ''
+        for peca in _fragmentos_item(item, modo):
+            texto_final = peca
+            yield peca
+        if not texto_final.endswith('\n'):
+            yield '\n'
+
+def trechos_como_texto(trechos, modo=MODO_PRETTY):
+    """Lista com o texto de cada trecho selecionado"""
+    return [''.join(_fragmentos_item(item, modo)) for item in trechos]
+
+def gravar_selecao(trechos, nome_arquivo, modo=MODO_PRETTY):
+    """
+    Grava os trechos selecionados no arquivo, aos poucos
+
+    Returns:
+        int: Quantidade de caracteres gravados
+    """
+    with open(nome_arquivo, 'w', encoding='utf-8') as f:
+        return escrever_fragmentos(fragmentos_selecao(trechos, modo), f)
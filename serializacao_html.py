@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Serialização
+Modos de saída (raw, minified, pretty) gravados no arquivo aos poucos,
+sem montar o documento inteiro em uma única string
+"""
+
+import os
+import re
+import shutil
+import time
+
+from metricas import medir_fase, registrar_fase
+
+MODO_RAW = 'raw'            # Bytes da resposta, sem parse
+MODO_MINIFICADO = 'minified'  # Espaços em branco colapsados
+MODO_PRETTY = 'pretty'      # Igual ao soup.prettify()
+MODO_ARTEFATOS = 'artifacts'  # JSON com texto, links, metadados e tabelas (artefatos_html)
+MODOS_SAIDA = (MODO_PRETTY, MODO_MINIFICADO, MODO_RAW, MODO_ARTEFATOS)
+
+# Peças acumuladas antes de cada write() no arquivo
+TAMANHO_BUFFER = 64 * 1024
+
+# Conteúdo dessas tags é gravado sem mexer nos espaços
+_TAGS_LITERAIS = {'pre', 'textarea', 'script', 'style'}
+_ESPACOS = re.compile(r'\s+')
+
+def _formatter(soup, formatter):
+    if isinstance(formatter, str):
+        return soup.formatter_for_name(formatter)
+    return formatter
+
+def _suporta_eventos(soup):
+    """True se a versão do bs4 tem a serialização não recursiva (4.12.1+)"""
+    return all(hasattr(soup, nome) for nome in ('_event_stream', '_format_tag', '_indent_string'))
+
+def fragmentos_pretty(soup, formatter='minimal'):
+    """
+    Gera o mesmo texto de ``soup.prettify()`` em pedaços
+
+    Segue o algoritmo do Tag.decode() do BeautifulSoup, mas entrega cada
+    peça assim que ela fica pronta em vez de juntar tudo no final.
+
+    Args:
+        soup (BeautifulSoup | Tag): Árvore a serializar
+        formatter (str | Formatter): Formatter do bs4 (padrão: 'minimal')
+
+    Yields:
+        str: Pedaços do documento formatado
+    """
+    from bs4 import BeautifulSoup, NavigableString, Tag
+
+    if not _suporta_eventos(soup):
+        yield soup.prettify(formatter=formatter)
+        return
+
+    formatter = _formatter(soup, formatter)
+    if isinstance(soup, BeautifulSoup) and soup.is_xml:
+        yield '<?xml version="1.0" encoding="utf-8"?>\n'
+
+    nivel = 0
+    tag_literal = None
+    for evento, elemento in soup._event_stream():
+        if evento in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
+            peca = elemento._format_tag('utf-8', formatter, opening=True)
+        elif evento is Tag.END_ELEMENT_EVENT:
+            peca = elemento._format_tag('utf-8', formatter, opening=False)
+            nivel -= 1
+        else:
+            peca = elemento.output_ready(formatter)
+
+        # Dentro de <pre>/<textarea> nada é reindentado
+        indentar_antes = indentar_depois = tag_literal is None
+        if evento is Tag.START_ELEMENT_EVENT and tag_literal is None and not elemento._should_pretty_print():
+            indentar_antes, indentar_depois = True, False
+            tag_literal = elemento
+        elif evento is Tag.END_ELEMENT_EVENT and elemento is tag_literal:
+            indentar_antes, indentar_depois = False, True
+            tag_literal = None
+
+        if indentar_antes or indentar_depois:
+            if isinstance(elemento, NavigableString):
+                peca = peca.strip()
+            if peca:
+                peca = soup._indent_string(peca, nivel, formatter, indentar_antes, indentar_depois)
+        if evento is Tag.START_ELEMENT_EVENT:
+            nivel += 1
+        if peca:
+            yield peca
+
+def fragmentos_minificado(soup, formatter='minimal'):
+    """
+    Gera o documento com espaços em branco colapsados, em pedaços
+
+    Sequências de espaços viram um único espaço e trechos só de espaço entre
+    tags são removidos quando têm quebra de linha (indentação). O conteúdo de
+    <pre>, <textarea>, <script> e <style> é mantido como está.
+
+    Args:
+        soup (BeautifulSoup | Tag): Árvore a serializar
+        formatter (str | Formatter): Formatter do bs4 (padrão: 'minimal')
+
+    Yields:
+        str: Pedaços do documento minificado
+    """
+    from bs4 import Tag
+    from bs4.element import PreformattedString
+
+    if not _suporta_eventos(soup):
+        yield _ESPACOS.sub(' ', str(soup))
+        return
+
+    formatter = _formatter(soup, formatter)
+    literais = 0
+    for evento, elemento in soup._event_stream():
+        if evento in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
+            if evento is Tag.START_ELEMENT_EVENT and elemento.name in _TAGS_LITERAIS:
+                literais += 1
+            yield elemento._format_tag('utf-8', formatter, opening=True)
+        elif evento is Tag.END_ELEMENT_EVENT:
+            if elemento.name in _TAGS_LITERAIS:
+                literais -= 1
+            yield elemento._format_tag('utf-8', formatter, opening=False)
+        else:
+            peca = elemento.output_ready(formatter)
+            if literais or isinstance(elemento, PreformattedString):
+                # Comentários, doctype e CDATA também ficam intactos
+                yield peca
+            elif peca.isspace():
+                if '\n' not in peca:
+                    yield ' '
+            else:
+                yield _ESPACOS.sub(' ', peca)
+
+def escrever_fragmentos(fragmentos, arquivo):
+    """
+    Grava os fragmentos em um arquivo texto, em blocos de ~64 KB
+
+    Com métricas ativas, o tempo dentro de write() conta como gravação e o
+    resto (gerar os fragmentos) como serialização.
+
+    Args:
+        fragmentos (iterable): Pedaços de texto
+        arquivo: Arquivo texto aberto para escrita
+
+    Returns:
+        int: Quantidade de caracteres gravados
+    """
+    inicio = time.perf_counter()
+    tempo_escrita = 0.0
+    total = 0
+    buffer = []
+    tamanho_buffer = 0
+    for peca in fragmentos:
+        buffer.append(peca)
+        tamanho_buffer += len(peca)
+        if tamanho_buffer >= TAMANHO_BUFFER:
+            bloco = ''.join(buffer)
+            antes = time.perf_counter()
+            arquivo.write(bloco)
+            tempo_escrita += time.perf_counter() - antes
+            total += tamanho_buffer
+            buffer = []
+            tamanho_buffer = 0
+    if buffer:
+        bloco = ''.join(buffer)
+        antes = time.perf_counter()
+        arquivo.write(bloco)
+        tempo_escrita += time.perf_counter() - antes
+        total += tamanho_buffer
+
+    registrar_fase('gravacao', tempo_escrita)
+    registrar_fase('serializacao', time.perf_counter() - inicio - tempo_escrita)
+    return total
+
+def fragmentos_saida(soup, modo):
+    """Fragmentos do documento no modo 'pretty' ou 'minified'"""
+    if modo == MODO_MINIFICADO:
+        return fragmentos_minificado(soup)
+    return fragmentos_pretty(soup)
+
+def reservar_nome_arquivo(nome_arquivo):
+    """
+    Cria o arquivo vazio com o nome pedido ou, se já existir, com _2, _3...
+
+    A criação é exclusiva (O_EXCL), então duas extrações no mesmo segundo,
+    mesmo em threads ou processos diferentes, nunca recebem o mesmo nome.
+
+    Args:
+        nome_arquivo (str): Nome desejado (ex.: html_extraido_20240101_120000.html)
+
+    Returns:
+        str: Nome efetivamente reservado
+    """
+    raiz, extensao = os.path.splitext(nome_arquivo)
+    numero = 1
+    while True:
+        candidato = nome_arquivo if numero == 1 else f"{raiz}_{numero}{extensao}"
+        try:
+            os.close(os.open(candidato, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            return candidato
+        except FileExistsError:
+            numero += 1
+
+def gravar_bruto(arquivo_origem, nome_arquivo):
+    """
+    Copia os bytes da resposta para o arquivo, sem parse
+
+    Args:
+        arquivo_origem: Arquivo binário com o corpo (posicionado no início)
+        nome_arquivo (str): Arquivo de destino
+
+    Returns:
+        int: Quantidade de bytes gravados
+    """
+    with medir_fase('gravacao'), open(nome_arquivo, 'wb') as f:
+        shutil.copyfileobj(arquivo_origem, f, TAMANHO_BUFFER)
+        return f.tell()
+
+def gravar_html(soup, nome_arquivo, modo=MODO_PRETTY, cabecalho=''):
+    """
+    Serializa a árvore direto no arquivo, sem montar a string inteira
+
+    Args:
+        soup (BeautifulSoup): Árvore a serializar
+        nome_arquivo (str): Arquivo de destino (UTF-8)
+        modo (str): 'pretty' ou 'minified'
+        cabecalho (str): Texto gravado antes do documento
+
+    Returns:
+        int: Quantidade de caracteres gravados
+    """
+    with open(nome_arquivo, 'w', encoding='utf-8') as f:
+        if cabecalho:
+            f.write(cabecalho)
+        return len(cabecalho) + escrever_fragmentos(fragmentos_saida(soup, modo), f)
+
+def previa(soup, modo=MODO_PRETTY, limite=800):
+    """Primeiros caracteres da saída, sem serializar o resto do documento"""
+    partes = []
+    tamanho = 0
+    for peca in fragmentos_saida(soup, modo):
+        partes.append(peca)
+        tamanho += len(peca)
+        if tamanho > limite:
+            break
+    return ''.join(partes)
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Servidor local
+API HTTP (TCP ou socket Unix) que mantém bibliotecas carregadas, conexões
+abertas e um número fixo de threads de trabalho entre extrações:
+``POST /extract`` extrai uma URL, ``GET /metrics`` expõe contadores no
+formato de texto do Prometheus e ``GET /health`` diz se o serviço está de pé
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from extrator_html import normalizar_esquema
+from metricas import MetricasExtracao, agregar_metricas, coletando, publicar
+from parsers_html import PARSER_AUTOMATICO, PARSERS_SUPORTADOS
+from processamento_html import artefatos_corpo, conteudo_saida, decodificar_corpo
+from serializacao_html import MODO_ARTEFATOS, MODO_PRETTY, MODOS_SAIDA
+
+ENDERECO_PADRAO = '127.0.0.1:8700'
+PREFIXO_UNIX = 'unix:'
+WORKERS_PADRAO = 4
+FILA_PADRAO = 64
+TIMEOUT_PADRAO = 30.0
+# Pedidos maiores que isso são recusados antes de ler o JSON
+LIMITE_PEDIDO = 1024 * 1024
+# Extrações recentes usadas nos percentis do /metrics
+JANELA_METRICAS = 1000
+
+class PedidoInvalido(ValueError):
+    """Corpo do POST /extract malformado ou com opções inválidas"""
+
+class TempoEsgotado(Exception):
+    """A extração passou do prazo do pedido"""
+
+def interpretar_pedido(dados, timeout_maximo=TIMEOUT_PADRAO):
+    """
+    Valida o JSON do POST /extract
+
+    Campos (os mesmos nomes das opções da CLI): url (obrigatório),
+    output_mode, select, xpath, parser, timeout e cache (False = não usar nem
+    guardar no cache de resultados).
+
+    Returns:
+        dict: Opções normalizadas
+
+    Raises:
+        PedidoInvalido: Se faltar a URL ou alguma opção for inválida
+    """
+    if not isinstance(dados, dict):
+        raise PedidoInvalido("o corpo deve ser um objeto JSON")
+    url = dados.get('url')
+    if not isinstance(url, str) or not url.strip():
+        raise PedidoInvalido("informe 'url'")
+    modo = dados.get('output_mode', MODO_PRETTY)
+    if modo not in MODOS_SAIDA:
+        raise PedidoInvalido(f"output_mode deve ser um de: {', '.join(MODOS_SAIDA)}")
+    parser = dados.get('parser', PARSER_AUTOMATICO)
+    if parser not in (PARSER_AUTOMATICO,) + PARSERS_SUPORTADOS:
+        raise PedidoInvalido(f"parser deve ser um de: {', '.join((PARSER_AUTOMATICO,) + PARSERS_SUPORTADOS)}")
+    seletor, xpath = dados.get('select'), dados.get('xpath')
+    if seletor is not None and not isinstance(seletor, str):
+        raise PedidoInvalido("select deve ser um texto (seletor CSS)")
+    if xpath is not None and not isinstance(xpath, str):
+        raise PedidoInvalido("xpath deve ser um texto (expressão XPath)")
+    if seletor and xpath:
+        raise PedidoInvalido("use select ou xpath, não os dois")
+    if modo == MODO_ARTEFATOS and (seletor or xpath):
+        raise PedidoInvalido("output_mode artifacts lê a página inteira; não combine com select ou xpath")
+    try:
+        timeout = float(dados.get('timeout', timeout_maximo))
+    except (TypeError, ValueError):
+        raise PedidoInvalido("timeout deve ser um número de segundos")
+    if timeout <= 0:
+        raise PedidoInvalido("timeout deve ser maior que zero")
+    cache = dados.get('cache', True)
+    if not isinstance(cache, bool):
+        raise PedidoInvalido("cache deve ser true ou false")
+    return {
+        'url': normalizar_esquema(url.strip()),
+        'modo_saida': modo,
+        'parser': parser,
+        'seletor': seletor or None,
+        'xpath': xpath or None,
+        'timeout': min(timeout, timeout_maximo),
+        'cache': cache,
+    }
+
+class CacheResultados:
+    """
+    Resultados recentes em memória (LRU com validade), por URL e opções
+
+    Pedidos repetidos dentro de ``validade`` segundos são respondidos sem
+    baixar nem processar a página de novo.
+    """
+
+    def __init__(self, maximo, validade):
+        self.maximo = maximo
+        self.validade = validade
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(opcoes):
+        return (opcoes['url'], opcoes['modo_saida'], opcoes['parser'], opcoes['seletor'], opcoes['xpath'])
+
+    def obter(self, opcoes):
+        """Resultado guardado ainda válido, ou None"""
+        chave = self.chave(opcoes)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and time.monotonic() - item[0] <= self.validade:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[1]
+            if item is not None:
+                del self._itens[chave]
+            self.falhas += 1
+            return None
+
+    def guardar(self, opcoes, resultado):
+        chave = self.chave(opcoes)
+        with self._lock:
+            self._itens[chave] = (time.monotonic(), resultado)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+
+    def __len__(self):
+        return len(self._itens)
+
+class TrabalhoExtracao:
+    """Um pedido esperando (ou ocupando) uma thread de trabalho"""
+
+    def __init__(self, opcoes):
+        self.opcoes = opcoes
+        self.prazo = time.monotonic() + opcoes['timeout']
+        self.resultado = None
+        self.pronto = threading.Event()
+        self.abandonado = threading.Event()
+
+    def restante(self):
+        """Segundos até o prazo (pode ser negativo)"""
+        return self.prazo - time.monotonic()
+
+    def _verificar_prazo(self, recebidos=None, total=None):
+        # Também é o callback de progresso do download: interrompe no próximo bloco
+        if self.abandonado.is_set() or self.restante() <= 0:
+            raise TempoEsgotado()
+
+class ServicoExtracao:
+    """
+    Threads de trabalho, fila limitada e cliente HTTP compartilhados
+
+    A fila tem tamanho fixo: com ela cheia o pedido é recusado na hora (429)
+    em vez de acumular trabalho que já chegaria atrasado.
+    """
+
+    def __init__(self, cliente, workers=WORKERS_PADRAO, tamanho_fila=FILA_PADRAO,
+                 timeout=TIMEOUT_PADRAO, cache_resultados=None):
+        """
+        Args:
+            cliente (ClienteHTTP): Cliente com pool de conexões (e cache HTTP, se houver)
+            workers (int): Extrações simultâneas
+            tamanho_fila (int): Pedidos esperando além dos que estão em andamento
+            timeout (float): Prazo padrão (e máximo) de cada pedido em segundos
+            cache_resultados (CacheResultados): Cache de resultados prontos (None = desligado)
+        """
+        self.cliente = cliente
+        self.timeout = timeout
+        self.cache_resultados = cache_resultados
+        self.inicio = time.monotonic()
+        self.ocupados = 0
+        self.respostas = Counter()
+        self.resultados = Counter()
+        self.abandonados = 0
+        self.recentes = deque(maxlen=JANELA_METRICAS)
+        self._lock = threading.Lock()
+        self._pendentes = queue.Queue(maxsize=max(1, tamanho_fila))
+        self._threads = []
+        for numero in range(max(1, workers)):
+            thread = threading.Thread(target=self._trabalhar, name=f"servidor-{numero}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def workers(self):
+        return len(self._threads)
+
+    def extrair(self, dados):
+        """
+        Atende um POST /extract
+
+        Args:
+            dados: JSON já decodificado do corpo do pedido
+
+        Returns:
+            tuple: (código HTTP, dicionário da resposta)
+        """
+        try:
+            opcoes = interpretar_pedido(dados, self.timeout)
+        except PedidoInvalido as e:
+            return self._responder(400, {'sucesso': False, 'erro': str(e)})
+
+        if self.cache_resultados is not None and opcoes['cache']:
+            guardado = self.cache_resultados.obter(opcoes)
+            if guardado is not None:
+                return self._responder(200, dict(guardado, resultado_em_cache=True))
+
+        trabalho = TrabalhoExtracao(opcoes)
+        try:
+            self._pendentes.put_nowait(trabalho)
+        except queue.Full:
+            return self._responder(429, {'sucesso': False, 'erro': 'fila cheia, tente de novo em instantes'})
+
+        if not trabalho.pronto.wait(max(0.0, trabalho.restante())):
+            trabalho.abandonado.set()
+            with self._lock:
+                self.abandonados += 1
+            return self._responder(504, {'sucesso': False, 'url': opcoes['url'],
+                                         'erro': f"prazo de {opcoes['timeout']:g} s esgotado"})
+
+        resultado = trabalho.resultado
+        if resultado['sucesso']:
+            if self.cache_resultados is not None and opcoes['cache']:
+                self.cache_resultados.guardar(opcoes, resultado)
+            return self._responder(200, dict(resultado, resultado_em_cache=False))
+        if resultado['tipo_erro'] == TempoEsgotado.__name__:
+            return self._responder(504, resultado)
+        return self._responder(502, resultado)
+
+    def _responder(self, codigo, corpo):
+        with self._lock:
+            self.respostas[codigo] += 1
+        return codigo, corpo
+
+    def _contar(self, resultado):
+        with self._lock:
+            self.resultados[resultado] += 1
+
+    def _trabalhar(self):
+        while True:
+            trabalho = self._pendentes.get()
+            if trabalho is None:
+                return
+            if trabalho.abandonado.is_set():
+                continue
+            with self._lock:
+                self.ocupados += 1
+            try:
+                trabalho.resultado = self._executar(trabalho)
+            finally:
+                with self._lock:
+                    self.ocupados -= 1
+            trabalho.pronto.set()
+
+    def _executar(self, trabalho):
+        opcoes = trabalho.opcoes
+        metricas = MetricasExtracao(opcoes['url'])
+        resultado = {
+            'url': opcoes['url'],
+            'sucesso': False,
+            'status': None,
+            'erro': None,
+            'tipo_erro': None,
+        }
+        try:
+            with coletando(metricas):
+                trabalho._verificar_prazo()
+                response, corpo = _baixar_com_prazo(self.cliente, trabalho)
+                with corpo:
+                    trabalho._verificar_prazo()
+                    if opcoes['modo_saida'] == MODO_ARTEFATOS:
+                        resultado['artefatos'] = artefatos_corpo(corpo).como_dict()
+                        html = None
+                    else:
+                        html = conteudo_saida(corpo, opcoes['modo_saida'], opcoes['parser'],
+                                               opcoes['seletor'], opcoes['xpath'])
+                        if html is None:
+                            html = decodificar_corpo(corpo)
+                    resultado.update({
+                        'url_final': response.url,
+                        'status': response.status_code,
+                        'bytes': corpo.tamanho,
+                        'codificacao': corpo.codificacao(),
+                        'caminho_codificacao': corpo.caminho_codificacao,
+                        'origem_cache': getattr(response, 'origem_cache', None),
+                        'html': html,
+                    })
+            resultado['sucesso'] = True
+        except Exception as e:
+            resultado['tipo_erro'] = type(e).__name__
+            resultado['erro'] = 'prazo esgotado' if isinstance(e, TempoEsgotado) else str(e)[:200]
+            response = getattr(e, 'response', None)
+            if response is not None:
+                resultado['status'] = response.status_code
+
+        metricas.finalizar(resultado['sucesso'], resultado['tipo_erro'])
+        resultado['duracao'] = round(metricas.duracao, 6)
+        resultado['fases'] = metricas.como_dict()['fases']
+        resultado['tentativas'] = metricas.tentativas
+        with self._lock:
+            self.recentes.append(metricas)
+        self._contar('sucesso' if resultado['sucesso'] else resultado['tipo_erro'])
+        publicar(metricas)
+        return resultado
+
+    def metricas_texto(self):
+        """Contadores, ocupação e percentis recentes no formato de texto do Prometheus"""
+        with self._lock:
+            respostas = dict(self.respostas)
+            resultados = dict(self.resultados)
+            ocupados = self.ocupados
+            abandonados = self.abandonados
+            recentes = list(self.recentes)
+
+        linhas = [
+            '# TYPE extrator_respostas_total counter',
+            *(f'extrator_respostas_total{{codigo="{codigo}"}} {total}' for codigo, total in sorted(respostas.items())),
+            '# TYPE extrator_extracoes_total counter',
+            *(f'extrator_extracoes_total{{resultado="{nome}"}} {total}' for nome, total in sorted(resultados.items())),
+            '# TYPE extrator_pedidos_abandonados_total counter',
+            f'extrator_pedidos_abandonados_total {abandonados}',
+            '# TYPE extrator_fila gauge',
+            f'extrator_fila {self._pendentes.qsize()}',
+            '# TYPE extrator_fila_capacidade gauge',
+            f'extrator_fila_capacidade {self._pendentes.maxsize}',
+            '# TYPE extrator_workers_ocupados gauge',
+            f'extrator_workers_ocupados {ocupados}',
+            '# TYPE extrator_workers gauge',
+            f'extrator_workers {self.workers}',
+            '# TYPE extrator_uptime_segundos gauge',
+            f'extrator_uptime_segundos {time.monotonic() - self.inicio:.3f}',
+        ]
+
+        pool = self.cliente.estatisticas()
+        linhas += [
+            '# TYPE extrator_conexoes_abertas_total counter',
+            f"extrator_conexoes_abertas_total {pool['conexoes_abertas']}",
+            '# TYPE extrator_conexoes_reutilizadas_total counter',
+            f"extrator_conexoes_reutilizadas_total {pool['conexoes_reutilizadas']}",
+        ]
+        if self.cache_resultados is not None:
+            linhas += [
+                '# TYPE extrator_cache_resultados_total counter',
+                f'extrator_cache_resultados_total{{resultado="acerto"}} {self.cache_resultados.acertos}',
+                f'extrator_cache_resultados_total{{resultado="falha"}} {self.cache_resultados.falhas}',
+                '# TYPE extrator_cache_resultados_itens gauge',
+                f'extrator_cache_resultados_itens {len(self.cache_resultados)}',
+            ]
+        if self.cliente.cache is not None:
+            cache = self.cliente.cache.estatisticas()
+            linhas.append('# TYPE extrator_cache_http_total counter')
+            linhas += [f'extrator_cache_http_total{{resultado="{nome}"}} {cache[nome]}'
+                       for nome in ('acertos', 'revalidados', 'falhas')]
+
+        agregado = agregar_metricas(recentes)
+        if agregado:
+            linhas.append('# TYPE extrator_fase_segundos summary')
+            for fase, linha in agregado.items():
+                for p in (50, 90, 99):
+                    linhas.append(f'extrator_fase_segundos{{fase="{fase}",quantile="{p / 100}"}} {linha[f"p{p}"]:.6f}')
+                linhas.append(f'extrator_fase_segundos_count{{fase="{fase}"}} {linha["amostras"]}')
+        return '\n'.join(linhas) + '\n'
+
+    def fechar(self):
+        """Encerra as threads de trabalho e o cliente HTTP"""
+        for _ in self._threads:
+            try:
+                self._pendentes.put(None, timeout=1)
+            except queue.Full:
+                break
+        self.cliente.fechar()
+
+def _baixar_com_prazo(cliente, trabalho):
+    """Baixa a URL do trabalho respeitando o prazo (timeout de rede, leitura por blocos e retentativas)"""
+    restante = trabalho.restante()
+    if restante <= 0:
+        raise TempoEsgotado()
+    try:
+        return cliente.baixar(trabalho.opcoes['url'], progresso=trabalho._verificar_prazo,
+                              timeout=min(restante, cliente.timeout), prazo=trabalho.prazo)
+    except requests.exceptions.Timeout:
+        if trabalho.restante() <= 0:
+            raise TempoEsgotado()
+        raise
+
+class _ManipuladorHTTP(BaseHTTPRequestHandler):
+    """Rotas do servidor; o ServicoExtracao fica em self.server.servico"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ExtratorHTML/1.0'
+
+    def setup(self):
+        super().setup()
+        # Headers e corpo saem em write() separados: com o Nagle ligado, o ACK
+        # atrasado do cliente somaria ~40 ms a cada resposta
+        if self.connection.family in (socket.AF_INET, socket.AF_INET6):
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != '/extract':
+            self._enviar_json(404, {'erro': 'rota não encontrada'})
+            return
+        cabecalho = self.headers.get('Content-Length')
+        if cabecalho is None:
+            self.close_connection = True
+            self._enviar_json(411, {'sucesso': False, 'erro': 'informe Content-Length'})
+            return
+        try:
+            tamanho = int(cabecalho)
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            # Sem um tamanho válido não dá para saber onde o corpo termina
+            self.close_connection = True
+            self._enviar_json(400, {'sucesso': False, 'erro': 'Content-Length inválido'})
+            return
+        if tamanho > LIMITE_PEDIDO:
+            self.close_connection = True
+            self._enviar_json(413, {'erro': f'pedido maior que {LIMITE_PEDIDO:,} bytes'})
+            return
+        try:
+            dados = json.loads(self.rfile.read(tamanho) or b'null')
+        except ValueError:
+            self._enviar_json(400, {'sucesso': False, 'erro': 'JSON inválido'})
+            return
+        codigo, resposta = self.server.servico.extrair(dados)
+        headers = {'Retry-After': '1'} if codigo == 429 else None
+        self._enviar_json(codigo, resposta, headers)
+
+    def do_GET(self):
+        rota = self.path.split('?', 1)[0]
+        if rota == '/metrics':
+            self._enviar(200, self.server.servico.metricas_texto().encode('utf-8'),
+                         'text/plain; version=0.0.4; charset=utf-8')
+        elif rota == '/health':
+            self._enviar_json(200, {'ok': True})
+        else:
+            self._enviar_json(404, {'erro': 'rota não encontrada'})
+
+    def _enviar_json(self, codigo, corpo, headers=None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self._enviar(codigo, dados, 'application/json; charset=utf-8', headers)
+
+    def _enviar(self, codigo, dados, content_type, headers=None):
+        self.send_response(codigo)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(dados)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def address_string(self):
+        # Em socket Unix o endereço do cliente é uma string vazia
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            print(f"🛰️ {self.address_string()} {formato % args}")
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def remover_socket_unix(caminho):
+    """
+    Apaga o arquivo de socket Unix em ``caminho``, se for mesmo um socket
+
+    Returns:
+        bool: True se um socket foi apagado (False se não havia nada ou se o
+        caminho é outra coisa, que fica intacta)
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(caminho).st_mode):
+            return False
+        os.remove(caminho)
+    except FileNotFoundError:
+        return False
+    return True
+
+def criar_servidor(endereco, servico, verboso=False):
+    """
+    Abre o servidor HTTP em 'host:porta' ou 'unix:/caminho/do.sock'
+
+    Returns:
+        socketserver.BaseServer: Servidor pronto para serve_forever()
+
+    Raises:
+        ValueError: Endereço inválido, socket Unix indisponível no sistema ou
+            caminho do socket ocupado por algo que não é socket
+    """
+    if endereco.startswith(PREFIXO_UNIX):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("socket Unix não é suportado neste sistema")
+        caminho = endereco[len(PREFIXO_UNIX):]
+        # Só apaga o socket que sobrou de uma execução anterior, nunca um arquivo comum
+        if not remover_socket_unix(caminho) and os.path.exists(caminho):
+            raise ValueError(f"{caminho!r} já existe e não é um socket Unix")
+        servidor = _ServidorUnix(caminho, _ManipuladorHTTP)
+    else:
+        host, _, porta = endereco.rpartition(':')
+        try:
+            porta = int(porta)
+        except ValueError:
+            raise ValueError(f"endereço inválido: {endereco!r} (use host:porta ou unix:/caminho)")
+        servidor = ThreadingHTTPServer((host or '127.0.0.1', porta), _ManipuladorHTTP)
+    servidor.servico = servico
+    servidor.verboso = verboso
+    return servidor
+
+def descrever_endereco(servidor):
+    """Endereço em que o servidor está ouvindo, para mostrar no console"""
+    if isinstance(servidor.server_address, str):
+        return f"{PREFIXO_UNIX}{servidor.server_address}"
+    host, porta = servidor.server_address[:2]
+    return f"http://{host}:{porta}"
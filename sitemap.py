@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Sitemaps
+Lê sitemaps, índices de sitemaps e listas de URLs (XML, texto ou .gz) aos
+poucos com o iterparse do lxml, pulando o que não mudou desde uma data, e
+entrega as URLs conforme aparecem para os workers de extração
+"""
+
+import gzip
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from rastreador import ConjuntoUrls
+
+PROFUNDIDADE_MAXIMA_PADRAO = 5
+
+TIPO_URL = 'url'
+TIPO_SITEMAP = 'sitemap'
+
+_ASSINATURA_GZIP = b'\x1f\x8b'
+
+def interpretar_lastmod(texto):
+    """
+    Converte um <lastmod> (datas W3C: '2024', '2024-05', '2024-05-17',
+    '2024-05-17T10:30:00+03:00', 'Z' no fim...) em datetime com fuso
+
+    Datas sem fuso são tratadas como UTC.
+
+    Returns:
+        datetime: Data com fuso, ou None se vazia ou inválida
+    """
+    texto = (texto or '').strip()
+    if len(texto) == 4:
+        texto += '-01-01'
+    elif len(texto) == 7:
+        texto += '-01'
+    try:
+        data = datetime.fromisoformat(texto.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return data
+
+def interpretar_desde(texto):
+    """
+    Converte o corte de --since em datetime com fuso
+
+    Aceita uma data (como no <lastmod>) ou uma idade: '36h' e '7d' valem
+    "agora menos 36 horas / 7 dias".
+
+    Raises:
+        ValueError: Nem data nem intervalo válido
+    """
+    data = interpretar_lastmod(texto)
+    if data is not None:
+        return data
+    from monitoramento import interpretar_intervalo
+
+    try:
+        segundos = interpretar_intervalo(texto)
+    except ValueError:
+        raise ValueError(f"Data inválida: '{texto}' (use 2024-05-17, 2024-05-17T10:00:00Z, 36h ou 7d)")
+    return datetime.now(timezone.utc) - timedelta(seconds=segundos)
+
+def _descompactar(arquivo):
+    """O próprio arquivo, ou um leitor gzip se o conteúdo estiver compactado"""
+    inicio = arquivo.read(2)
+    arquivo.seek(0)
+    if inicio == _ASSINATURA_GZIP:
+        return gzip.GzipFile(fileobj=arquivo, mode='rb')
+    return arquivo
+
+def _nome_local(tag):
+    # Comentários e instruções de processamento têm tag não textual
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+def entradas_sitemap(arquivo):
+    """
+    Gera as entradas de um sitemap sem montar o documento inteiro
+
+    Cada <url>/<sitemap> é limpo logo depois de lido, junto com os irmãos
+    anteriores, então a memória não cresce com o tamanho do arquivo. Um
+    arquivo que não começa com '<' é lido como lista de URLs (uma por linha),
+    o formato texto aceito pelo protocolo de sitemaps.
+
+    Args:
+        arquivo: Arquivo binário (XML, texto ou gzip de um dos dois)
+
+    Yields:
+        tuple: (tipo, url, lastmod) com tipo TIPO_URL ou TIPO_SITEMAP e
+        lastmod datetime ou None
+    """
+    arquivo = _descompactar(arquivo)
+    inicio = arquivo.read(512)
+    arquivo.seek(0)
+    if not inicio.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+        for linha in arquivo:
+            linha = linha.decode('utf-8', errors='replace').strip()
+            if linha and not linha.startswith('#'):
+                yield TIPO_URL, linha, None
+        return
+
+    from lxml import etree
+
+    # Só os fins de <url>/<sitemap> (com ou sem namespace) chegam ao Python;
+    # sem entidades externas nem rede, porque o XML vem de terceiros
+    contexto = etree.iterparse(arquivo, events=('end',), tag=('{*}url', '{*}sitemap'),
+                               resolve_entities=False, no_network=True, recover=True)
+    for _, elemento in contexto:
+        # Só filhos diretos: <image:loc>, <video:loc>... ficam um nível abaixo
+        # (percorrer os filhos sai mais barato que findtext com '{*}')
+        loc = lastmod = None
+        for filho in elemento:
+            nome = _nome_local(filho.tag)
+            if nome == 'loc':
+                loc = (filho.text or '').strip()
+            elif nome == 'lastmod':
+                lastmod = filho.text
+        if loc:
+            yield _nome_local(elemento.tag), loc, interpretar_lastmod(lastmod)
+        elemento.clear()
+        while elemento.getprevious() is not None:
+            del elemento.getparent()[0]
+    del contexto
+
+class LeitorSitemap:
+    """
+    URLs de uma ou mais fontes (sitemap, índice de sitemaps ou lista de URLs)
+
+    Índices são seguidos até ``profundidade_maxima`` níveis, cada sitemap é
+    baixado uma vez e cada URL sai uma vez só (comparada como escrita no
+    sitemap, que já traz as URLs canônicas). Com ``desde``, entradas e
+    sitemaps com <lastmod> anterior são pulados (sem lastmod, a entrada
+    passa). Um sitemap que falha é contado em ``erros`` e os demais seguem.
+    """
+
+    def __init__(self, cliente=None, desde=None, profundidade_maxima=PROFUNDIDADE_MAXIMA_PADRAO):
+        """
+        Args:
+            cliente (ClienteHTTP): Cliente para baixar os sitemaps (None = compartilhado)
+            desde (datetime): Pular o que não mudou desde essa data (sem fuso = UTC)
+            profundidade_maxima (int): Níveis de índices de sitemaps seguidos
+        """
+        if desde is not None and desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        self.cliente = cliente
+        self.desde = desde
+        self.profundidade_maxima = profundidade_maxima
+        self.contadores = Counter()
+        self.erros = []
+        self.duracao = 0.0
+
+    def urls(self, fontes):
+        """
+        Gera as URLs das fontes conforme os sitemaps são lidos
+
+        Args:
+            fontes (list): URLs ou caminhos locais de sitemaps / listas de URLs
+
+        Yields:
+            str: URLs novas (ainda não entregues) e alteradas desde ``desde``
+        """
+        entregues = ConjuntoUrls()
+        lidos = set()
+        inicio = time.perf_counter()
+        try:
+            for fonte in fontes:
+                yield from self._ler(fonte, 0, entregues, lidos)
+        finally:
+            self.duracao = time.perf_counter() - inicio
+
+    def _ler(self, fonte, profundidade, entregues, lidos):
+        if fonte in lidos:
+            return
+        lidos.add(fonte)
+        if profundidade > self.profundidade_maxima:
+            self.contadores['fundos_demais'] += 1
+            return
+        try:
+            with self._abrir(fonte) as arquivo:
+                self.contadores['sitemaps'] += 1
+                for tipo, url, lastmod in entradas_sitemap(arquivo):
+                    antiga = self.desde is not None and lastmod is not None and lastmod < self.desde
+                    if tipo == TIPO_SITEMAP:
+                        if antiga:
+                            self.contadores['sitemaps_sem_mudanca'] += 1
+                        else:
+                            yield from self._ler(url, profundidade + 1, entregues, lidos)
+                    elif antiga:
+                        self.contadores['sem_mudanca'] += 1
+                    elif not entregues.adicionar(url):
+                        self.contadores['repetidas'] += 1
+                    else:
+                        self.contadores['urls'] += 1
+                        yield url
+        except Exception as e:
+            self.contadores['erros'] += 1
+            self.erros.append((fonte, f"{type(e).__name__}: {str(e)[:200]}"))
+
+    @contextmanager
+    def _abrir(self, fonte):
+        """Arquivo binário da fonte: baixada em stream (RAM/disco) ou aberta do disco"""
+        if not fonte.startswith(('http://', 'https://')):
+            with open(fonte, 'rb') as arquivo:
+                yield arquivo
+            return
+        from cliente_http import obter_cliente_padrao
+
+        cliente = self.cliente or obter_cliente_padrao()
+        _, corpo = cliente.baixar(fonte)
+        with corpo:
+            yield corpo.abrir()
+
+def mostrar_resumo_sitemap(leitor):
+    """Mostra no console o que a leitura dos sitemaps encontrou"""
+    contadores = leitor.contadores
+    print(f"🗺️ Sitemaps: {contadores['sitemaps']:,} lido(s) em {leitor.duracao:.2f} s | "
+          f"{contadores['urls']:,} URLs | {contadores['sem_mudanca']:,} sem mudança | "
+          f"{contadores['repetidas']:,} repetidas")
+    if contadores['sitemaps_sem_mudanca']:
+        print(f"⏭️ {contadores['sitemaps_sem_mudanca']:,} sitemap(s) sem mudança não foram baixados")
+    if contadores['fundos_demais']:
+        print(f"⚠️ {contadores['fundos_demais']:,} sitemap(s) além da profundidade máxima ignorados")
+    for fonte, erro in leitor.erros:
+        print(f"❌ Sitemap {fonte}: {erro}")
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+🌐 Extrator de HTML - Visualizador
+Widget Tk que mostra documentos de muitos MB carregando no Text só as
+linhas visíveis (mais uma margem), com índice de linhas calculado fora da
+thread da interface, e barra de busca (Ctrl+F) que procura numa thread e
+destaca só as ocorrências visíveis
+"""
+
+import queue
+import re
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_left, bisect_right
+from tkinter import ttk
+
+# Caracteres por bloco na contagem de palavras
+BLOCO_CONTAGEM = 1024 * 1024
+# Ocorrências guardadas por busca; acima disso a contagem aparece como "N+"
+LIMITE_OCORRENCIAS = 1_000_000
+# Ocorrências encontradas entre uma verificação de cancelamento e outra
+LOTE_CANCELAMENTO = 4096
+# Destaques aplicados de uma vez na parte visível (uma tela não mostra mais que isso)
+LIMITE_DESTAQUES = 2000
+# Espera (ms) depois da última tecla antes de buscar
+ATRASO_BUSCA_MS = 200
+# Intervalo (ms) em que a barra de busca confere se a thread terminou
+INTERVALO_BUSCA_MS = 30
+
+def indexar_linhas(texto):
+    """
+    Posição inicial de cada linha do texto
+
+    Feito para rodar na thread de trabalho: percorre o texto com str.find,
+    sem criar a lista de linhas.
+
+    Returns:
+        array: Início (em caracteres) de cada linha
+    """
+    inicios = array('q', [0])
+    posicao = texto.find('\n')
+    while posicao != -1:
+        inicios.append(posicao + 1)
+        posicao = texto.find('\n', posicao + 1)
+    if len(inicios) > 1 and inicios[-1] == len(texto):
+        # Texto terminado em '\n' não tem uma linha vazia depois
+        inicios.pop()
+    return inicios
+
+def contar_palavras(texto, bloco=BLOCO_CONTAGEM):
+    """
+    Mesmo resultado de ``len(texto.split())`` com memória limitada
+
+    O split() é feito em blocos de ~1 MB; uma palavra cortada na divisa de
+    dois blocos é descontada para não contar duas vezes.
+    """
+    total = 0
+    anterior_fim_palavra = False
+    for inicio in range(0, len(texto), bloco):
+        trecho = texto[inicio:inicio + bloco]
+        total += len(trecho.split())
+        if anterior_fim_palavra and not trecho[0].isspace():
+            total -= 1
+        anterior_fim_palavra = not trecho[-1].isspace()
+    return total
+
+class Ocorrencias:
+    """Início e tamanho (em caracteres) de cada resultado de uma busca, em ordem"""
+
+    def __init__(self):
+        self.inicios = array('q')
+        self.tamanhos = array('q')
+        # True se a busca parou em LIMITE_OCORRENCIAS
+        self.incompleta = False
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def adicionar(self, inicio, tamanho):
+        self.inicios.append(inicio)
+        self.tamanhos.append(tamanho)
+
+def buscar_ocorrencias(documento, termo, regex=False, maiusculas=False, limite=LIMITE_OCORRENCIAS,
+                       cancelado=None):
+    """
+    Procura ``termo`` no documento inteiro
+
+    Feito para rodar na thread de trabalho. Sem regex e diferenciando
+    maiúsculas, usa str.find (o caminho mais rápido); nos demais casos, o
+    módulo re. Com regex, ^ e $ valem por linha; resultados vazios (como os
+    de 'x*') são ignorados.
+
+    Args:
+        documento (str): Texto onde procurar
+        termo (str): Texto ou expressão regular
+        regex (bool): Interpretar o termo como expressão regular
+        maiusculas (bool): Diferenciar maiúsculas de minúsculas
+        limite (int): Parar depois de tantas ocorrências
+        cancelado (callable): Consultado de tempos em tempos; se devolver
+            True, a busca é abandonada
+
+    Returns:
+        Ocorrencias: Resultados em ordem, ou None se a busca foi cancelada
+
+    Raises:
+        re.error: Expressão regular inválida
+    """
+    ocorrencias = Ocorrencias()
+    if not termo:
+        return ocorrencias
+
+    if not regex and maiusculas:
+        tamanho = len(termo)
+        posicao = documento.find(termo)
+        while posicao != -1:
+            ocorrencias.adicionar(posicao, tamanho)
+            if len(ocorrencias) >= limite:
+                ocorrencias.incompleta = True
+                break
+            if cancelado is not None and len(ocorrencias) % LOTE_CANCELAMENTO == 0 and cancelado():
+                return None
+            posicao = documento.find(termo, posicao + tamanho)
+        return ocorrencias
+
+    opcoes = re.MULTILINE if regex else 0
+    if not maiusculas:
+        opcoes |= re.IGNORECASE
+    padrao = re.compile(termo if regex else re.escape(termo), opcoes)
+    # Conta também os resultados vazios: 'x*' acha um em cada posição
+    for vistos, encontrado in enumerate(padrao.finditer(documento), 1):
+        if cancelado is not None and vistos % LOTE_CANCELAMENTO == 0 and cancelado():
+            return None
+        inicio, fim = encontrado.span()
+        if fim == inicio:
+            continue
+        ocorrencias.adicionar(inicio, fim - inicio)
+        if len(ocorrencias) >= limite:
+            ocorrencias.incompleta = True
+            break
+    return ocorrencias
+
+class VisualizadorHTML(ttk.Frame):
+    """
+    Visualizador somente leitura com janela de linhas
+
+    O documento inteiro fica em uma string com o índice de linhas; o Text
+    recebe só a janela em volta da parte visível. A barra de rolagem vertical
+    representa o documento todo e a janela é trocada conforme a rolagem.
+    """
+
+    # Linhas extras carregadas acima e abaixo da parte visível
+    MARGEM = 300
+
+    def __init__(self, master, **opcoes_texto):
+        super().__init__(master)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.texto = tk.Text(self, wrap=tk.NONE, state='disabled', **opcoes_texto)
+        self.texto.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.barra_vertical = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._ao_usar_barra)
+        self.barra_vertical.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        barra_horizontal = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.texto.xview)
+        barra_horizontal.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.texto.configure(xscrollcommand=barra_horizontal.set, yscrollcommand=self._ao_rolar_texto)
+
+        self._fonte = tkfont.Font(root=self, font=self.texto.cget('font'))
+        self._documento = ''
+        self._inicios = array('q', [0])
+        self._janela = (0, 0)
+        self._topo = 0
+        self._recentrar_agendado = False
+        self._ocorrencias = None
+        self._atual = None
+        self._destaque_agendado = False
+
+        self.texto.tag_configure('busca', background='#fff3a3')
+        self.texto.tag_configure('busca_atual', background='#ffb347')
+        self.texto.tag_raise('busca_atual', 'busca')
+
+        for evento in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.texto.bind(evento, self._ao_rolar_mouse)
+        self.texto.bind('<Prior>', lambda e: self._rolar(-self._linhas_visiveis()))
+        self.texto.bind('<Next>', lambda e: self._rolar(self._linhas_visiveis()))
+        self.texto.bind('<Control-Home>', lambda e: self.ir_para_linha(0))
+        self.texto.bind('<Control-End>', lambda e: self.ir_para_linha(self.total_linhas))
+        self.texto.bind('<Configure>', lambda e: self._mostrar(self._topo))
+
+    @property
+    def total_linhas(self):
+        return len(self._inicios) if self._documento else 0
+
+    @property
+    def documento(self):
+        """Texto completo do documento carregado"""
+        return self._documento
+
+    def carregar(self, documento, inicios=None):
+        """
+        Mostra um novo documento a partir da primeira linha
+
+        Args:
+            documento (str): Texto completo
+            inicios (array): Resultado de indexar_linhas() (None = calcula aqui)
+        """
+        self._documento = documento
+        self._inicios = inicios if inicios is not None else indexar_linhas(documento)
+        self._janela = (0, 0)
+        self._topo = 0
+        self._ocorrencias = None
+        self._atual = None
+        self._mostrar(0)
+
+    def limpar(self):
+        self.carregar('', array('q', [0]))
+
+    def ir_para_linha(self, linha):
+        """Rola até a linha (começando em 0)"""
+        self._mostrar(linha)
+
+    def mostrar_ocorrencias(self, ocorrencias):
+        """
+        Passa a destacar as ocorrências de uma busca (None = nenhuma)
+
+        Só as que caem nas linhas visíveis recebem destaque no Text; as
+        demais são destacadas quando a rolagem chega nelas.
+        """
+        self._ocorrencias = ocorrencias
+        self._atual = None
+        self._destacar_visiveis()
+
+    @property
+    def ocorrencia_atual(self):
+        """Índice da ocorrência destacada como atual (None = nenhuma)"""
+        return self._atual
+
+    def ocorrencia_a_partir_do_topo(self):
+        """Índice da primeira ocorrência na linha do topo ou depois dela (volta à primeira no fim)"""
+        if not self._ocorrencias:
+            return None
+        indice = bisect_left(self._ocorrencias.inicios, self._inicios[self._topo])
+        return indice if indice < len(self._ocorrencias) else 0
+
+    def ir_para_ocorrencia(self, indice):
+        """Centraliza a ocorrência ``indice`` (destacada como atual) na tela"""
+        inicio = self._ocorrencias.inicios[indice]
+        linha, coluna = self._linha_coluna(inicio)
+        self._atual = indice
+        self._mostrar(linha - self._linhas_visiveis() // 2)
+        # Rola na horizontal até a ocorrência (a linha já está na tela)
+        self.texto.see(f'{linha - self._janela[0] + 1}.{coluna}')
+
+    def _linha_coluna(self, posicao):
+        """Linha (do documento) e coluna de uma posição em caracteres"""
+        linha = bisect_right(self._inicios, posicao) - 1
+        return linha, posicao - self._inicios[linha]
+
+    def _indice_texto(self, posicao):
+        """Índice do Text ('linha.coluna') para uma posição do documento, preso à janela carregada"""
+        inicio, fim = self._janela
+        linha, coluna = self._linha_coluna(posicao)
+        if linha < inicio:
+            return '1.0'
+        if linha >= fim:
+            return tk.END
+        return f'{linha - inicio + 1}.{coluna}'
+
+    def _destacar_visiveis(self):
+        """Troca os destaques da busca pelos das linhas visíveis agora"""
+        self._destaque_agendado = False
+        self.texto.tag_remove('busca', '1.0', tk.END)
+        self.texto.tag_remove('busca_atual', '1.0', tk.END)
+        ocorrencias = self._ocorrencias
+        if not ocorrencias or not self.total_linhas:
+            return
+        primeira = self._topo
+        ultima = min(self.total_linhas, self._topo + self._linhas_visiveis() + 1)
+        comeco = self._inicios[primeira]
+        final = self._inicios[ultima] if ultima < len(self._inicios) else len(self._documento)
+
+        indice = bisect_left(ocorrencias.inicios, comeco)
+        # Uma ocorrência de várias linhas pode começar acima e continuar na tela
+        if indice > 0 and ocorrencias.inicios[indice - 1] + ocorrencias.tamanhos[indice - 1] > comeco:
+            indice -= 1
+        limite = min(len(ocorrencias), indice + LIMITE_DESTAQUES)
+        while indice < limite and ocorrencias.inicios[indice] < final:
+            inicio = ocorrencias.inicios[indice]
+            fim = inicio + ocorrencias.tamanhos[indice]
+            tag = 'busca_atual' if indice == self._atual else 'busca'
+            self.texto.tag_add(tag, self._indice_texto(inicio), self._indice_texto(fim))
+            indice += 1
+
+    def _agendar_destaque(self):
+        if self._ocorrencias and not self._destaque_agendado:
+            self._destaque_agendado = True
+            self.after_idle(self._destacar_visiveis)
+
+    def _linhas_visiveis(self):
+        altura = self.texto.winfo_height()
+        if altura <= 1:
+            altura = int(self.texto.cget('height')) * self._fonte.metrics('linespace')
+        return max(1, altura // max(1, self._fonte.metrics('linespace')))
+
+    def _trecho(self, inicio, fim):
+        """Texto das linhas [inicio, fim) do documento"""
+        comeco = self._inicios[inicio]
+        final = self._inicios[fim] if fim < len(self._inicios) else len(self._documento)
+        return self._documento[comeco:final]
+
+    def _mostrar(self, topo):
+        """Põe a linha ``topo`` no alto, trocando a janela do Text se preciso"""
+        total = self.total_linhas
+        visiveis = self._linhas_visiveis()
+        topo = max(0, min(topo, max(0, total - visiveis)))
+        self._topo = topo
+
+        inicio, fim = self._janela
+        if total and not (inicio <= topo and topo + visiveis <= fim and (fim - topo >= self.MARGEM // 2 or fim == total)
+                          and (topo - inicio >= self.MARGEM // 2 or inicio == 0)):
+            inicio = max(0, topo - self.MARGEM)
+            fim = min(total, topo + visiveis + self.MARGEM)
+            self.texto.configure(state='normal')
+            self.texto.delete('1.0', tk.END)
+            self.texto.insert('1.0', self._trecho(inicio, fim))
+            self.texto.configure(state='disabled')
+            self._janela = (inicio, fim)
+        elif not total:
+            self.texto.configure(state='normal')
+            self.texto.delete('1.0', tk.END)
+            self.texto.configure(state='disabled')
+            self._janela = (0, 0)
+
+        self.texto.yview(f'{topo - self._janela[0] + 1}.0')
+        self._atualizar_barra()
+        if self._ocorrencias:
+            self._destacar_visiveis()
+
+    def _atualizar_barra(self):
+        total = self.total_linhas
+        if not total:
+            self.barra_vertical.set(0.0, 1.0)
+            return
+        visiveis = self._linhas_visiveis()
+        self.barra_vertical.set(self._topo / total, min(1.0, (self._topo + visiveis) / total))
+
+    def _rolar(self, linhas):
+        self._mostrar(self._topo + linhas)
+        return 'break'
+
+    def _ao_rolar_mouse(self, evento):
+        if getattr(evento, 'num', None) == 4:
+            passo = -3
+        elif getattr(evento, 'num', None) == 5:
+            passo = 3
+        else:
+            passo = -3 if evento.delta > 0 else 3
+        return self._rolar(passo)
+
+    def _ao_usar_barra(self, acao, quantidade, unidade=None):
+        if acao == 'moveto':
+            self._mostrar(int(float(quantidade) * self.total_linhas))
+        elif acao == 'scroll':
+            passo = self._linhas_visiveis() if unidade == 'pages' else 1
+            self._rolar(int(quantidade) * passo)
+
+    def _ao_rolar_texto(self, primeiro, ultimo):
+        """O Text rolou sozinho (setas, seleção com o mouse): acompanha a janela"""
+        linha_local = int(self.texto.index('@0,0').split('.')[0]) - 1
+        self._topo = self._janela[0] + linha_local
+        self._atualizar_barra()
+        self._agendar_destaque()
+        inicio, fim = self._janela
+        perto_do_fim = fim < self.total_linhas and fim - self._topo < self._linhas_visiveis() * 2
+        perto_do_inicio = inicio > 0 and self._topo - inicio < self._linhas_visiveis()
+        if (perto_do_fim or perto_do_inicio) and not self._recentrar_agendado:
+            self._recentrar_agendado = True
+            self.after_idle(self._recentrar)
+
+    def _recentrar(self):
+        self._recentrar_agendado = False
+        self._janela = (0, 0)
+        self._mostrar(self._topo)
+
+class BarraBusca(ttk.Frame):
+    """
+    Barra de busca (Ctrl+F) de um VisualizadorHTML
+
+    A busca roda numa thread própria, sobre o documento inteiro; a thread
+    não toca no Tk: devolve as ocorrências por uma fila que a barra confere
+    com after(). Cada nova busca cancela a anterior (contador de geração).
+    Pular entre ocorrências usa o índice de linhas do visualizador (bisect),
+    sem percorrer o texto.
+    """
+
+    def __init__(self, master, visualizador):
+        super().__init__(master, padding=(0, 5, 0, 0))
+        self.visualizador = visualizador
+        self.termo = tk.StringVar()
+        self.regex = tk.BooleanVar(value=False)
+        self.maiusculas = tk.BooleanVar(value=False)
+
+        ttk.Label(self, text="🔍").grid(row=0, column=0, padx=(0, 5))
+        self.campo = ttk.Entry(self, textvariable=self.termo, width=40)
+        self.campo.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.columnconfigure(1, weight=1)
+        ttk.Checkbutton(self, text="Regex", variable=self.regex,
+                        command=self.buscar).grid(row=0, column=2, padx=(10, 0))
+        ttk.Checkbutton(self, text="Aa", variable=self.maiusculas,
+                        command=self.buscar).grid(row=0, column=3, padx=(5, 0))
+        ttk.Button(self, text="▲", width=3, command=self.anterior).grid(row=0, column=4, padx=(10, 0))
+        ttk.Button(self, text="▼", width=3, command=self.proxima).grid(row=0, column=5, padx=(2, 0))
+        self.contagem = ttk.Label(self, text="", width=24)
+        self.contagem.grid(row=0, column=6, padx=(10, 0))
+        ttk.Button(self, text="✖", width=3, command=self.esconder).grid(row=0, column=7, padx=(5, 0))
+
+        self.campo.bind('<Return>', lambda e: self.proxima())
+        self.campo.bind('<Shift-Return>', lambda e: self.anterior())
+        self.campo.bind('<Escape>', lambda e: self.esconder())
+        self.termo.trace_add('write', self._agendar_busca)
+
+        self._ocorrencias = None
+        self._geracao = 0
+        self._lancada = 0
+        self._recebida = 0
+        self._resultados = queue.Queue()
+        self._conferindo = False
+        self._busca_agendada = None
+
+    def mostrar(self):
+        """Mostra a barra com o foco no campo (Ctrl+F)"""
+        self.grid()
+        self.campo.focus_set()
+        self.campo.select_range(0, tk.END)
+        if self.termo.get() and self._ocorrencias is None:
+            self.buscar()
+        return 'break'
+
+    def esconder(self):
+        """Esconde a barra e tira os destaques"""
+        self._cancelar()
+        self._ocorrencias = None
+        self.grid_remove()
+        self.visualizador.mostrar_ocorrencias(None)
+        self.visualizador.texto.focus_set()
+        return 'break'
+
+    def documento_trocado(self):
+        """O visualizador carregou outro documento: refaz a busca se a barra estiver aberta"""
+        self._cancelar()
+        self._ocorrencias = None
+        if self.winfo_ismapped() and self.termo.get():
+            self.buscar()
+        else:
+            self.contagem.configure(text="", foreground='')
+
+    def proxima(self):
+        return self._pular(1)
+
+    def anterior(self):
+        return self._pular(-1)
+
+    def _pular(self, passo):
+        if self._ocorrencias is None:
+            self.buscar()
+        elif len(self._ocorrencias):
+            atual = self.visualizador.ocorrencia_atual
+            if atual is None:
+                indice = self.visualizador.ocorrencia_a_partir_do_topo()
+            else:
+                indice = (atual + passo) % len(self._ocorrencias)
+            self._ir_para(indice)
+        return 'break'
+
+    def buscar(self):
+        """Começa uma busca com o termo e as opções atuais"""
+        self._cancelar()
+        termo = self.termo.get()
+        if not termo:
+            self._ocorrencias = None
+            self.visualizador.mostrar_ocorrencias(None)
+            self.contagem.configure(text="", foreground='')
+            return
+        self.contagem.configure(text="⏳ Buscando...", foreground='')
+        self._lancada = self._geracao
+        threading.Thread(
+            target=self._buscar_em_segundo_plano,
+            args=(self._geracao, self.visualizador.documento, termo, self.regex.get(), self.maiusculas.get()),
+            daemon=True,
+        ).start()
+        if not self._conferindo:
+            self._conferindo = True
+            self.after(INTERVALO_BUSCA_MS, self._conferir_resultados)
+
+    def _cancelar(self):
+        """Descarta a busca agendada e a que estiver rodando"""
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+            self._busca_agendada = None
+        self._geracao += 1
+
+    def _agendar_busca(self, *_):
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.after(ATRASO_BUSCA_MS, self._busca_digitada)
+
+    def _busca_digitada(self):
+        self._busca_agendada = None
+        self.buscar()
+
+    def _buscar_em_segundo_plano(self, geracao, documento, termo, regex, maiusculas):
+        """Roda na thread de busca: nada de Tk aqui"""
+        try:
+            ocorrencias = buscar_ocorrencias(documento, termo, regex, maiusculas,
+                                             cancelado=lambda: geracao != self._geracao)
+            erro = None
+        except re.error as e:
+            ocorrencias, erro = None, str(e)
+        self._resultados.put((geracao, ocorrencias, erro))
+
+    def _conferir_resultados(self):
+        while True:
+            try:
+                geracao, ocorrencias, erro = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            # Uma busca antiga pode terminar depois da atual: só a mais recente conta
+            if geracao == self._lancada:
+                self._recebida = geracao
+            if geracao == self._geracao:
+                self._aplicar(ocorrencias, erro)
+        # Continua esperando só pela busca mais recente, se ela não foi cancelada
+        if self._lancada == self._geracao and self._recebida != self._lancada:
+            self.after(INTERVALO_BUSCA_MS, self._conferir_resultados)
+        else:
+            self._conferindo = False
+
+    def _aplicar(self, ocorrencias, erro):
+        if erro is not None:
+            self._ocorrencias = None
+            self.visualizador.mostrar_ocorrencias(None)
+            self.contagem.configure(text=f"⚠️ Regex inválida: {erro}", foreground='red')
+            return
+        if ocorrencias is None:
+            return
+        self._ocorrencias = ocorrencias
+        self.visualizador.mostrar_ocorrencias(ocorrencias)
+        if len(ocorrencias):
+            self._ir_para(self.visualizador.ocorrencia_a_partir_do_topo())
+        else:
+            self.contagem.configure(text="Nenhuma ocorrência", foreground='red')
+
+    def _ir_para(self, indice):
+        self.visualizador.ir_para_ocorrencia(indice)
+        total = f"{len(self._ocorrencias):,}" + ("+" if self._ocorrencias.incompleta else "")
+        self.contagem.configure(text=f"{indice + 1:,} de {total}", foreground='')